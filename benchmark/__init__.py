@@ -0,0 +1,12 @@
+"""
+Benchmark do Sistema Fiado.
+
+Gera lojas sintéticas em escalas configuráveis e mede o tempo dos métodos
+públicos do Database, gravando um arquivo de resultados comparável entre versões:
+
+    python -m benchmark --escala 100k --saida resultados_1.0.8.json
+    python -m benchmark --escala 100k --comparar resultados_1.0.7.json
+"""
+
+from .gerador import ESCALAS, gerar_loja
+from .executar import executar_benchmark, comparar_resultados
@@ -0,0 +1,44 @@
+import sys
+import json
+import argparse
+
+from .gerador import ESCALAS
+from .executar import log, executar_benchmark, comparar_resultados
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do banco de dados do Sistema Fiado")
+    parser.add_argument('--escala', choices=sorted(ESCALAS), default='1k',
+                        help="Quantidade de vendas geradas (padrão: 1k)")
+    parser.add_argument('--semente', type=int, default=42, help="Semente dos dados sintéticos")
+    parser.add_argument('--wal', action='store_true', help="Usar o modo WAL do banco")
+    parser.add_argument('--saida', help="Arquivo JSON de resultados (padrão: benchmark_<versão>_<escala>.json)")
+    parser.add_argument('--comparar', help="Arquivo de resultados anterior para comparação")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Variação aceita antes de apontar regressão (padrão: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    resultado = executar_benchmark(args.escala, args.semente, args.wal)
+    saida = args.saida or f"benchmark_{resultado['versao_sistema']}_{args.escala}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    log(f"Resultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            anterior = json.load(f)
+        if anterior.get('escala') != resultado['escala']:
+            log(f"ALERTA: comparando escalas diferentes ({anterior.get('escala')} x {resultado['escala']})")
+        regressoes = 0
+        log(f"Comparação com a versão {anterior.get('versao_sistema')}:")
+        for nome, antes, depois, variacao in comparar_resultados(resultado, anterior):
+            marcador = ""
+            if variacao > args.tolerancia:
+                marcador = "  <-- REGRESSÃO"
+                regressoes += 1
+            log(f"  {nome}: {antes:.2f} ms -> {depois:.2f} ms ({variacao:+.0%}){marcador}")
+        if regressoes:
+            log(f"{regressoes} operação(ões) mais lentas que a tolerância")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
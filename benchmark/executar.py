@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import platform
+import statistics
+import tempfile
+from datetime import datetime
+
+from .gerador import ESCALAS, gerar_loja
+
+def log(message):
+    print(f"[BENCHMARK] {message}")
+
+def versao_sistema():
+    """Versão lida do marcador do main.py (a mesma usada pelo sync_version.py)"""
+    caminho = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                if linha.startswith('# VERSAO_SISTEMA ='):
+                    return linha.split('=')[1].strip().strip("'\"")
+    except Exception:
+        pass
+    return 'desconhecida'
+
+def abrir_banco_temporario(modo_wal=False):
+    """Cria um Database vazio em uma pasta temporária"""
+    # O Database sempre usa %LOCALAPPDATA%/Sistema Fiado
+    os.environ['LOCALAPPDATA'] = tempfile.mkdtemp(prefix='benchmark_fiado_')
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from database import Database
+    db = Database(modo_wal=modo_wal, backup_automatico=False)
+    # As repetições medem as consultas, não o cache de resultados
+    db.cache_resultados.habilitado = False
+    return db
+
+def operacoes(db, pasta):
+    """
+    Lista (nome, chamada, repetições) com os métodos públicos do Database
+
+    Operações que gravam arquivos ou alteram dados rodam uma única vez.
+    """
+    cliente_maior = db.conn.execute(
+        "SELECT cliente_id FROM saldos_clientes ORDER BY quantidade_vendas DESC LIMIT 1"
+    ).fetchone()[0]
+    cliente_medio = db.conn.execute(
+        "SELECT cliente_id FROM saldos_clientes ORDER BY quantidade_vendas DESC LIMIT 1 OFFSET "
+        "(SELECT COUNT(*) / 2 FROM saldos_clientes)"
+    ).fetchone()[0]
+    nome_cliente = db.obter_cliente(cliente_medio)[1]
+    venda_id = db.conn.execute("SELECT MAX(id) FROM vendas").fetchone()[0]
+    hoje = datetime.now()
+    um_mes = (hoje.replace(day=1)).strftime("%Y-%m-%d")
+    um_ano = hoje.replace(year=hoje.year - 1).strftime("%Y-%m-%d")
+    fim = hoje.strftime("%Y-%m-%d 23:59:59")
+
+    return [
+        ('listar_clientes', lambda: db.listar_clientes(), 5),
+        ('listar_clientes_paginado', lambda: db.listar_clientes_paginado(limite=50), 20),
+        ('obter_cliente', lambda: db.obter_cliente(cliente_medio), 50),
+        ('obter_id_cliente', lambda: db.obter_id_cliente(nome_cliente), 50),
+        ('listar_vendas_cliente (maior cliente)', lambda: db.listar_vendas_cliente(cliente_maior), 5),
+        ('listar_vendas_cliente_paginado (maior cliente)', lambda: db.listar_vendas_cliente_paginado(cliente_maior, limite=50), 20),
+        ('obter_total_vendas_cliente', lambda: db.obter_total_vendas_cliente(cliente_maior), 50),
+        ('obter_ultima_venda', lambda: db.obter_ultima_venda(cliente_maior), 50),
+        ('cliente_tem_vendas', lambda: db.cliente_tem_vendas(cliente_medio), 50),
+        ('gerar_relatorio_vendas (mês)', lambda: db.gerar_relatorio_vendas(um_mes, fim), 5),
+        ('gerar_relatorio_vendas (ano)', lambda: db.gerar_relatorio_vendas(um_ano, fim), 3),
+        ('gerar_relatorio_vendas_paginado (ano)', lambda: db.gerar_relatorio_vendas_paginado(um_ano, fim, limite=50), 20),
+        ('gerar_relatorio_clientes_devedores', lambda: db.gerar_relatorio_clientes_devedores(), 5),
+        ('obter_clientes_com_pagamentos_pendentes', lambda: db.obter_clientes_com_pagamentos_pendentes(), 5),
+        ('contar_pendencias', lambda: db.contar_pendencias(), 20),
+        ('contar_clientes', lambda: db.contar_clientes(), 20),
+        ('calcular_total_vendas', lambda: db.calcular_total_vendas(), 5),
+        ('obter_totais_periodo (ano)', lambda: db.obter_totais_periodo(um_ano, fim), 20),
+        ('obter_produtos_mais_vendidos (ano)', lambda: db.obter_produtos_mais_vendidos(um_ano, fim), 20),
+        ('obter_serie_vendas (mês)', lambda: db.obter_serie_vendas(um_ano, fim, 'mes'), 20),
+        ('contar_produtos_vendidos', lambda: db.contar_produtos_vendidos(), 5),
+        ('listar_produtos_registrados', lambda: db.listar_produtos_registrados(), 3),
+        ('obter_vendas_excluidas', lambda: db.obter_vendas_excluidas(), 3),
+        ('obter_vendas_excluidas_paginado', lambda: db.obter_vendas_excluidas_paginado(limite=50), 20),
+        ('obter_historico_notificacoes', lambda: db.obter_historico_notificacoes(dias=3650), 3),
+        ('verificar_saldos_clientes', lambda: db.verificar_saldos_clientes(), 1),
+        ('obter_saldo_cliente (maior cliente)', lambda: db.obter_saldo_cliente(cliente_maior), 50),
+        ('obter_saldo_cliente em uma data (maior cliente)', lambda: db.obter_saldo_cliente(cliente_maior, um_ano), 50),
+        ('gerar_relatorio_idade_dividas', lambda: db.gerar_relatorio_idade_dividas(), 5),
+        ('obter_clientes_com_pagamentos_pendentes (90 dias)', lambda: db.obter_clientes_com_pagamentos_pendentes(dias_minimos=90), 5),
+        ('verificar_contas_clientes', lambda: db.verificar_contas_clientes(), 1),
+        ('adicionar_venda', lambda: db.adicionar_venda(cliente_medio, "BENCHMARK", 1, 9.99), 50),
+        ('adicionar_vendas_lote (100 itens)', lambda: db.adicionar_vendas_lote(cliente_medio, [("BENCHMARK", 1, 9.99)] * 100), 10),
+        ('atualizar_venda', lambda: db.atualizar_venda(venda_id, "BENCHMARK", 2, 9.99), 50),
+        ('reconstruir_saldos_clientes', lambda: db.reconstruir_saldos_clientes(), 1),
+        ('registrar_pagamento', lambda: db.registrar_pagamento(cliente_medio, 1.00), 50),
+        ('reconstruir_contas_clientes', lambda: db.reconstruir_contas_clientes(), 1),
+        ('exportar_dados_csv', lambda: db.exportar_dados_csv(os.path.join(pasta, 'exportacao.csv')), 1),
+        ('exportar_dados_colunar', lambda: db.exportar_dados_colunar(os.path.join(pasta, 'colunar')), 1),
+        ('fazer_backup', lambda: db.fazer_backup(os.path.join(pasta, 'backup_benchmark.db')), 1),
+        ('fazer_backup_automatico', lambda: db.fazer_backup_automatico(), 1),
+    ]
+
+def medir(chamada, repeticoes):
+    """Executa a chamada e retorna as estatísticas de tempo (ms) e linhas do último resultado"""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = chamada()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    linhas = None
+    if isinstance(resultado, list):
+        linhas = len(resultado)
+    elif isinstance(resultado, tuple) and len(resultado) == 2 and isinstance(resultado[0], list):
+        linhas = len(resultado[0])
+    return {
+        'repeticoes': repeticoes,
+        'mediana_ms': round(statistics.median(tempos), 3),
+        'minimo_ms': round(min(tempos), 3),
+        'maximo_ms': round(max(tempos), 3),
+        'linhas': linhas,
+    }
+
+def executar_benchmark(escala='1k', semente=42, modo_wal=False):
+    """
+    Gera a loja sintética e mede todas as operações
+
+    Returns:
+        dict com os resultados (formato do arquivo de saída)
+    """
+    quantidade_vendas = ESCALAS[escala]
+    db = abrir_banco_temporario(modo_wal)
+    pasta = os.path.join(os.environ['LOCALAPPDATA'], 'Sistema Fiado')
+    try:
+        log(f"Gerando loja sintética com {quantidade_vendas} vendas...")
+        inicio = time.perf_counter()
+        quantidades = gerar_loja(db, quantidade_vendas, semente)
+        tempo_geracao = time.perf_counter() - inicio
+        log(f"Dados gerados em {tempo_geracao:.1f}s: {quantidades}")
+
+        resultados = {}
+        for nome, chamada, repeticoes in operacoes(db, pasta):
+            resultados[nome] = medir(chamada, repeticoes)
+            log(f"{nome}: {resultados[nome]['mediana_ms']:.2f} ms")
+
+        return {
+            'versao_sistema': versao_sistema(),
+            'escala': escala,
+            'semente': semente,
+            'modo_wal': modo_wal,
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'registros': quantidades,
+            'tamanho_banco': os.path.getsize(db.database_path),
+            'geracao_s': round(tempo_geracao, 2),
+            'resultados': resultados,
+        }
+    finally:
+        db.fechar()
+
+def comparar_resultados(atual, anterior, tolerancia=0.2):
+    """
+    Compara dois resultados pela mediana de cada operação
+
+    Returns:
+        Lista de (operação, mediana anterior, mediana atual, variação) para as
+        operações presentes nos dois, com variação = atual / anterior - 1
+    """
+    comparacao = []
+    for nome, dados in atual['resultados'].items():
+        dados_anteriores = anterior['resultados'].get(nome)
+        if not dados_anteriores or not dados_anteriores['mediana_ms']:
+            continue
+        variacao = dados['mediana_ms'] / dados_anteriores['mediana_ms'] - 1
+        comparacao.append((nome, dados_anteriores['mediana_ms'], dados['mediana_ms'], variacao))
+    return comparacao
@@ -0,0 +1,147 @@
+import random
+from datetime import datetime, timedelta
+
+from normalizacao import normalizar_nome, telefone_e164
+
+# Quantidade de vendas de cada escala
+ESCALAS = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+PRODUTOS = [
+    "ARROZ 5KG", "FEIJÃO 1KG", "AÇÚCAR 1KG", "CAFÉ 500G", "LEITE 1L", "PÃO FRANCÊS",
+    "ÓLEO DE SOJA", "MACARRÃO", "FARINHA DE TRIGO", "SAL 1KG", "OVOS (DÚZIA)",
+    "MANTEIGA", "QUEIJO MUSSARELA", "PRESUNTO", "REFRIGERANTE 2L", "CERVEJA LATA",
+    "SABÃO EM PÓ", "DETERGENTE", "PAPEL HIGIÊNICO", "CREME DENTAL", "SABONETE",
+    "BISCOITO", "CHOCOLATE", "SALGADINHO", "ÁGUA MINERAL", "CARNE MOÍDA KG",
+    "FRANGO KG", "LINGUIÇA KG", "BANANA KG", "TOMATE KG", "CEBOLA KG", "BATATA KG",
+]
+
+NOMES = ["Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Hugo",
+         "Isabela", "João", "Karina", "Lucas", "Mariana", "Nicolas", "Olívia", "Pedro",
+         "Rafaela", "Sérgio", "Tatiane", "Vinícius"]
+SOBRENOMES = ["Silva", "Santos", "Oliveira", "Souza", "Lima", "Pereira", "Costa",
+              "Rodrigues", "Almeida", "Nascimento", "Araújo", "Fernandes", "Gomes"]
+
+# Vendas gravadas por executemany (um commit por lote)
+TAMANHO_LOTE = 10_000
+
+def _data(aleatorio, inicio, segundos):
+    return (inicio + timedelta(seconds=aleatorio.randrange(segundos))).strftime("%Y-%m-%d %H:%M:%S")
+
+def gerar_loja(db, quantidade_vendas, semente=42, anos=3, progresso=None):
+    """
+    Preenche um Database vazio com dados sintéticos
+
+    Proporções aproximadas de uma loja real: um cliente para cada 20 vendas,
+    um pagamento para cada 10 vendas, 5% das vendas no histórico de exclusões e
+    três notificações por cliente. Vendas e pagamentos são gravados em ordem de
+    data, como no uso normal do sistema.
+
+    Args:
+        db: Database recém-criado (vazio)
+        quantidade_vendas: Número de vendas a gerar
+        semente: Semente do gerador aleatório (mesma semente, mesmos dados)
+        anos: Período coberto pelas datas das vendas
+        progresso: Função chamada com a porcentagem concluída (opcional)
+
+    Returns:
+        dict com a quantidade de registros gerados por tabela
+    """
+    aleatorio = random.Random(semente)
+    fim = datetime.now().replace(microsecond=0)
+    inicio = fim - timedelta(days=365 * anos)
+    segundos = int((fim - inicio).total_seconds())
+    conexao = db.conn
+
+    quantidade_clientes = max(50, quantidade_vendas // 20)
+    clientes = []
+    for i in range(quantidade_clientes):
+        nome = f"{aleatorio.choice(NOMES)} {aleatorio.choice(SOBRENOMES)} {i + 1}"
+        telefone = f"(11) 9{aleatorio.randrange(1000, 9999)}-{aleatorio.randrange(1000, 9999)}"
+        clientes.append((nome, telefone, "", _data(aleatorio, inicio, segundos),
+                         normalizar_nome(nome), telefone_e164(telefone)))
+    conexao.executemany('''
+        INSERT INTO clientes (nome, telefone, nota, data_cadastro, nome_normalizado, telefone_e164)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', clientes)
+    conexao.commit()
+    ids_clientes = [linha[0] for linha in conexao.execute("SELECT id FROM clientes")]
+
+    # Poucos clientes concentram muitas vendas, como em uma loja de bairro
+    pesos = [1 / (posicao + 1) ** 0.8 for posicao in range(len(ids_clientes))]
+    precos = {produto: aleatorio.randrange(150, 5000) for produto in PRODUTOS}
+
+    geradas = 0
+    pagamentos = 0
+    while geradas < quantidade_vendas:
+        tamanho = min(TAMANHO_LOTE, quantidade_vendas - geradas)
+        # Cada lote cobre o trecho seguinte do período
+        inicio_lote = inicio + timedelta(seconds=segundos * geradas // quantidade_vendas)
+        segundos_lote = max(1, segundos * tamanho // quantidade_vendas)
+        compradores = aleatorio.choices(ids_clientes, weights=pesos, k=tamanho)
+        lote = []
+        for cliente_id in compradores:
+            produto = aleatorio.choice(PRODUTOS)
+            quantidade = aleatorio.choice((1, 1, 1, 2, 2, 3, 5))
+            preco = precos[produto]
+            lote.append((cliente_id, produto, quantidade, preco, preco * quantidade,
+                         _data(aleatorio, inicio_lote, segundos_lote)))
+        lote.sort(key=lambda venda: venda[5])
+        conexao.executemany('''
+            INSERT INTO vendas (cliente_id, produto, quantidade, valor_unitario, valor_total, data_venda)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', lote)
+
+        # Pagamentos do mesmo trecho, de parte do valor comprado
+        pagos = sorted(
+            ((venda[0], max(100, venda[4] * aleatorio.randrange(3, 9)), venda[5])
+             for venda in aleatorio.sample(lote, len(lote) // 10)),
+            key=lambda pagamento: pagamento[2]
+        )
+        conexao.executemany('''
+            INSERT INTO pagamentos (cliente_id, valor, data_pagamento, forma)
+            VALUES (?, ?, ?, 'dinheiro')
+        ''', pagos)
+        pagamentos += len(pagos)
+        conexao.commit()
+        geradas += tamanho
+        if progresso:
+            progresso(int(geradas * 90 / quantidade_vendas))
+
+    nomes_clientes = dict(conexao.execute("SELECT id, nome FROM clientes"))
+    excluidas = []
+    for venda_id in range(1, quantidade_vendas // 20 + 1):
+        cliente_id = aleatorio.choice(ids_clientes)
+        produto = aleatorio.choice(PRODUTOS)
+        data_venda = _data(aleatorio, inicio, segundos)
+        excluidas.append((venda_id, cliente_id, nomes_clientes[cliente_id], produto, 1,
+                          precos[produto], data_venda, data_venda))
+    conexao.executemany('''
+        INSERT INTO vendas_excluidas
+        (venda_id, cliente_id, cliente_nome, produto, quantidade, valor_total, data_venda, data_exclusao)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', excluidas)
+
+    notificacoes = [
+        (cliente_id, aleatorio.randrange(1000, 100000), "benchmark", 'enviada',
+         aleatorio.choice(('sistema', 'whatsapp')), _data(aleatorio, inicio, segundos))
+        for cliente_id in ids_clientes for _ in range(3)
+    ]
+    conexao.executemany('''
+        INSERT INTO notificacoes_pagamento (cliente_id, valor_pendente, observacao, status, tipo, data_notificacao)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', notificacoes)
+    conexao.commit()
+    if progresso:
+        progresso(100)
+
+    return {
+        'clientes': len(ids_clientes),
+        'vendas': quantidade_vendas,
+        'pagamentos': pagamentos,
+        'vendas_excluidas': len(excluidas),
+        'notificacoes_pagamento': len(notificacoes),
+    }
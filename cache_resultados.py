@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+
+class CacheResultados:
+    """
+    Cache LRU de resultados de consultas, invalidado pela versão dos dados
+
+    Cada resultado é guardado com a versão dos dados em que foi lido. Toda escrita
+    incrementa a versão (incrementar_versao), o que torna obsoletos todos os
+    resultados anteriores sem precisar saber quais tabelas cada consulta usa.
+    O tamanho é limitado em entradas e em linhas (soma de len() das listas).
+    """
+    def __init__(self, max_entradas=128, max_linhas=200_000):
+        """
+        Args:
+            max_entradas: Quantidade máxima de resultados guardados
+            max_linhas: Soma máxima das linhas dos resultados guardados; um
+                        resultado maior que isso sozinho não é guardado
+        """
+        self.max_entradas = max_entradas
+        self.max_linhas = max_linhas
+        # Desligado, todas as chamadas vão ao banco (usado pelo benchmark)
+        self.habilitado = True
+        self.versao = 0
+        self._entradas = OrderedDict()  # chave -> (versão, resultado, linhas)
+        self._linhas = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+
+    def incrementar_versao(self):
+        """Chamado após cada escrita confirmada: os resultados guardados ficam obsoletos"""
+        with self._lock:
+            self.versao += 1
+            # Nenhuma entrada antiga pode mais ser usada: liberar a memória já
+            self._entradas.clear()
+            self._linhas = 0
+
+    def obter(self, chave):
+        """
+        Returns:
+            tuple (encontrado, resultado)
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] != self.versao:
+                self.falhas += 1
+                return False, None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return True, entrada[1]
+
+    def guardar(self, chave, versao, resultado):
+        """Guarda um resultado lido na versão informada (ignorado se a versão já mudou)"""
+        linhas = len(resultado) if isinstance(resultado, list) else 1
+        if linhas > self.max_linhas:
+            return
+        with self._lock:
+            if versao != self.versao:
+                return
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._linhas -= anterior[2]
+            self._entradas[chave] = (versao, resultado, linhas)
+            self._linhas += linhas
+            while len(self._entradas) > self.max_entradas or self._linhas > self.max_linhas:
+                _, (_, _, linhas_removidas) = self._entradas.popitem(last=False)
+                self._linhas -= linhas_removidas
+                self.descartes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._linhas = 0
+            self.acertos = self.falhas = self.descartes = 0
+
+    def estatisticas(self):
+        """Contadores do cache (para o painel de diagnóstico)"""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'versao': self.versao,
+                'entradas': len(self._entradas),
+                'linhas': self._linhas,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'descartes': self.descartes,
+                'taxa_acertos': self.acertos / consultas if consultas else 0.0,
+            }
@@ -1,12 +1,189 @@
 import sqlite3
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
+import re
 import shutil
-from PySide6.QtCore import QTimer
+import threading
+import functools
+from contextlib import contextmanager
+from pathlib import Path
+from PySide6.QtCore import QTimer, QObject, Signal
 import sys
 
+from instrumentacao import INSTRUMENTACAO, instrumentado
+from cache_resultados import CacheResultados
+from motor_banco import EscritorSerializado, PoolLeitura, aplicar_pragmas_wal
+from repositorio_backup import RepositorioBackup
+from dinheiro import Dinheiro, centavos_para_texto
+from normalizacao import normalizar_nome, telefone_e164, limites_periodo, padronizar_data
+from migracoes import MIGRACOES, VERSAO_ATUAL, ErroMigracao
+from eventos import (BarramentoEventos, ClienteAdicionado, ClienteAlterado, ClienteExcluido,
+                     VendaAdicionada, VendasAdicionadas, VendaAlterada, VendaExcluida,
+                     VendasClienteExcluidas, HistoricoExclusoesLimpo, NotificacaoRegistrada,
+                     PagamentoRegistrado, PagamentoExcluido, BancoRecarregado)
+
+def escrita(metodo):
+    """
+    Marca um método que altera o banco de dados.
+    No modo WAL, o método é executado na thread de escrita serializada.
+    O tempo de cada chamada (incluindo a espera na fila) é registrado na instrumentação.
+    """
+    nome = f"Database.{metodo.__name__}"
+    @functools.wraps(metodo)
+    def wrapper(self, *args, **kwargs):
+        escritor = self.escritor
+        try:
+            # Sem motor WAL, já na thread de escrita ou dentro de transacao(): executar aqui
+            if escritor is None or escritor.na_thread_escritora() or self._em_transacao():
+                return INSTRUMENTACAO.executar(nome, metodo, self, *args, **kwargs)
+            return INSTRUMENTACAO.executar(
+                nome, escritor.executar,
+                lambda conexao: self._executar_com_conexao(conexao, metodo, args, kwargs)
+            )
+        finally:
+            # Dentro de transacao() o cache só é invalidado no commit final
+            if not self._em_transacao():
+                self.cache_resultados.incrementar_versao()
+    return wrapper
+
+def leitura(metodo):
+    """
+    Marca um método que apenas consulta o banco de dados.
+    No modo WAL, o método usa uma conexão do pool de leitura.
+    O tempo e as linhas retornadas são registrados na instrumentação.
+    """
+    nome = f"Database.{metodo.__name__}"
+    @functools.wraps(metodo)
+    def wrapper(self, *args, **kwargs):
+        # Já existe uma conexão associada (chamada aninhada ou thread de escrita)
+        if getattr(self._local, 'conn', None) is not None or self.pool_leitura is None:
+            return INSTRUMENTACAO.executar(nome, metodo, self, *args, **kwargs)
+        with self.pool_leitura.emprestar() as conexao:
+            return INSTRUMENTACAO.executar(nome, self._executar_com_conexao, conexao, metodo, args, kwargs)
+    return wrapper
+
+def em_cache(metodo):
+    """
+    Guarda o resultado de um método de leitura no cache do Database, por (método, argumentos).
+    Qualquer escrita invalida o cache (ver CacheResultados). Use acima de @leitura.
+    """
+    @functools.wraps(metodo)
+    def wrapper(self, *args, **kwargs):
+        cache = self.cache_resultados
+        # Dentro de transacao() as leituras veem dados ainda não confirmados
+        if not cache.habilitado or self._em_transacao():
+            return metodo(self, *args, **kwargs)
+        chave = (metodo.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            encontrado, resultado = cache.obter(chave)
+        except TypeError:
+            # Argumento não hashable (ex.: lista): sem cache
+            return metodo(self, *args, **kwargs)
+        if not encontrado:
+            versao = cache.versao
+            resultado = metodo(self, *args, **kwargs)
+            cache.guardar(chave, versao, resultado)
+        # Cópia da lista: quem chama pode alterá-la sem afetar o cache
+        return list(resultado) if isinstance(resultado, list) else resultado
+    return wrapper
+
+class BackupEmSegundoPlano(QObject):
+    """
+    Executa um backup em uma thread separada, emitindo o progresso.
+    Sem caminho de destino, grava um snapshot no repositório de backups.
+    """
+    progresso = Signal(int)  # porcentagem concluída
+    concluido = Signal(bool, str)  # sucesso, mensagem
+    
+    def __init__(self, db, caminho_destino=None):
+        super().__init__()
+        self.db = db
+        self.caminho_destino = caminho_destino
+        # (sucesso, mensagem) depois de concluído
+        self.resultado = None
+        self.thread = threading.Thread(target=self._executar, name="BackupBanco", daemon=True)
+    
+    def iniciar(self):
+        """Inicia o backup em segundo plano"""
+        self.thread.start()
+        return self
+    
+    def em_andamento(self):
+        return self.thread.is_alive()
+    
+    def aguardar(self):
+        """Espera o backup terminar e retorna (sucesso, mensagem)"""
+        self.thread.join()
+        return self.resultado
+    
+    def _executar(self):
+        if self.caminho_destino:
+            sucesso, mensagem = self.db.fazer_backup(self.caminho_destino, progresso=self.progresso.emit)
+        else:
+            sucesso, mensagem = self.db.fazer_backup_automatico(progresso=self.progresso.emit)
+        self.resultado = (sucesso, mensagem)
+        self.concluido.emit(sucesso, mensagem)
+
+class ExportacaoEmSegundoPlano(QObject):
+    """Executa a exportação CSV em uma thread separada, emitindo o progresso"""
+    progresso = Signal(int)  # porcentagem concluída
+    concluido = Signal(bool, str)  # sucesso, mensagem
+    
+    def __init__(self, db, caminho):
+        super().__init__()
+        self.db = db
+        self.caminho = caminho
+        self.thread = threading.Thread(target=self._executar, name="ExportacaoCSV", daemon=True)
+    
+    def iniciar(self):
+        """Inicia a exportação em segundo plano"""
+        self.thread.start()
+        return self
+    
+    def em_andamento(self):
+        return self.thread.is_alive()
+    
+    def _executar(self):
+        sucesso, mensagem = self.db.exportar_dados_csv(self.caminho, progresso=self.progresso.emit)
+        self.concluido.emit(sucesso, mensagem)
+
 class Database:
-    def __init__(self):
+    # Índices secundários gerenciados pelo sistema (nome -> definição)
+    INDICES = {
+        'idx_vendas_cliente_data': 'vendas (cliente_id, data_venda)',
+        'idx_vendas_data': 'vendas (data_venda)',
+        'idx_vendas_produto': 'vendas (produto, quantidade, valor_total)',
+        'idx_vendas_excluidas_cliente_data': 'vendas_excluidas (cliente_id, data_exclusao)',
+        'idx_vendas_excluidas_data': 'vendas_excluidas (data_exclusao)',
+        'idx_notificacoes_cliente_data': 'notificacoes_pagamento (cliente_id, data_notificacao)',
+        'idx_notificacoes_data': 'notificacoes_pagamento (data_notificacao)',
+        'idx_clientes_nome': 'clientes (nome)',
+        'idx_saldos_clientes_total': 'saldos_clientes (total)',
+    }
+    
+    # Quantidade padrão de linhas por página nas consultas paginadas
+    LIMITE_PAGINA = 50
+    
+    # Tamanho do pool de conexões de leitura no modo WAL
+    TAMANHO_POOL_LEITURA = 3
+    # Instruções SQL preparadas mantidas em cache por conexão
+    INSTRUCOES_EM_CACHE = 256
+    # Linhas lidas por fetchmany e buffer do arquivo na exportação CSV
+    LOTE_EXPORTACAO = 2000
+    BUFFER_EXPORTACAO = 1024 * 1024
+    # Páginas copiadas por passo no backup online (entre passos as escritas continuam)
+    PAGINAS_POR_PASSO_BACKUP = 256
+    # Busca textual sem diferença de maiúsculas e acentos ("joao" encontra "João")
+    TOKENIZADOR_BUSCA = "unicode61 remove_diacritics 2"
+    
+    def __init__(self, modo_wal=False, backup_automatico=True):
+        """
+        Args:
+            modo_wal: Usa journal WAL, uma thread dedicada para escritas e um pool
+                      de conexões de leitura (padrão: False, modo tradicional)
+            backup_automatico: Inicia o timer de backup automático (padrão: True).
+                               Com False, chame configurar_backup_automatico() depois.
+        """
         # Sempre usar %LOCALAPPDATA%/Sistema Fiado para o banco de dados
         db_dir = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'Sistema Fiado')
         os.makedirs(db_dir, exist_ok=True)
@@ -16,23 +193,239 @@ class Database:
         if not os.path.exists(self.backups_dir):
             os.makedirs(self.backups_dir)
             print(f"Pasta backups criada em: {self.backups_dir}")
-        self.conn = sqlite3.connect(self.database_path)
+        # Repositório de backups automáticos (incremental, deduplicado e comprimido)
+        self.repositorio_backup = RepositorioBackup(os.path.join(self.backups_dir, 'repositorio'))
+        self.modo_wal = modo_wal
+        self.escritor = None
+        self.pool_leitura = None
+        self.leitura_concorrente = False
+        # Eventos de alteração para as telas (publicados após cada commit)
+        self.eventos = BarramentoEventos()
+        # Resultados de consultas repetidas (descartados a cada escrita)
+        self.cache_resultados = CacheResultados()
+        # Conexão associada à thread atual (thread de escrita ou leitura do pool)
+        self._local = threading.local()
+        self.conn = self._abrir_conexao()
+        # Backup em segundo plano em andamento (se houver)
+        self.backup_em_andamento = None
         # Cache para estrutura das tabelas
         self.cache_estrutura = {}
         # Flag para controlar mensagens
         self.mostrou_info_valor_unitario = False
-        self.criar_tabelas()
-        # Verificar e atualizar estrutura se necessário
-        self.verificar_e_atualizar_estrutura()
-        # Verificar tabela de vendas excluídas
-        self.verificar_tabela_vendas_excluidas()
-        # Verificar tabela de notificações
-        self.verificar_tabela_notificacoes()
+        # Criar/atualizar o esquema (apenas as migrações ainda não aplicadas)
+        self.aplicar_migracoes()
+        # Iniciar thread de escrita e pool de leitura (modo WAL)
+        if self.modo_wal:
+            self._iniciar_motor_wal()
         # Configurar backup automático
-        self.configurar_backup_automatico()
+        self.backup_timer = None
+        if backup_automatico:
+            self.configurar_backup_automatico()
+    
+    @property
+    def conn(self):
+        """Conexão em uso pela thread atual (ou a conexão principal)"""
+        conexao = getattr(self._local, 'conn', None)
+        return conexao if conexao is not None else self._conn
+    
+    @conn.setter
+    def conn(self, conexao):
+        self._conn = conexao
+    
+    @instrumentado('Database.aplicar_migracoes')
+    def aplicar_migracoes(self):
+        """
+        Aplica as migrações de migracoes.py ainda não aplicadas a este banco
+        
+        Cada migração e o novo user_version são gravados em uma única transação:
+        uma migração que falha não deixa o esquema pela metade.
+        
+        Returns:
+            int: Versão do esquema após as migrações
+            
+        Raises:
+            ErroMigracao: Se uma migração falhar (as anteriores continuam aplicadas)
+        """
+        versao = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if versao > VERSAO_ATUAL:
+            print(f"ALERTA: Banco de dados na versão {versao}, mais nova que a do sistema ({VERSAO_ATUAL})")
+            return versao
+        
+        for numero, descricao, migracao in MIGRACOES:
+            if numero <= versao:
+                continue
+            print(f"INFO: Aplicando migração {numero}: {descricao}")
+            try:
+                # Os métodos chamados pelas migrações confirmam com _confirmar(),
+                # que dentro de transacao() deixa o commit para o fim do bloco
+                with self.transacao():
+                    migracao(self)
+                    self.conn.execute(f"PRAGMA user_version = {numero}")
+            except Exception as e:
+                print(f"ERRO ao aplicar migração {numero} ({descricao}): {e}")
+                raise ErroMigracao(numero, descricao, e) from e
+            finally:
+                self.cache_estrutura.clear()
+            versao = numero
+        return versao
+    
+    def _abrir_conexao(self, somente_leitura=False):
+        """Abre uma nova conexão com o banco de dados"""
+        if somente_leitura:
+            uri = f"{Path(self.database_path).as_uri()}?mode=ro"
+            conexao = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                                      detect_types=sqlite3.PARSE_COLNAMES,
+                                      cached_statements=self.INSTRUCOES_EM_CACHE)
+        else:
+            # A conexão de escrita pode ser emprestada a outra thread por transacao(),
+            # sempre com a thread de escrita parada
+            conexao = sqlite3.connect(self.database_path, check_same_thread=False,
+                                      detect_types=sqlite3.PARSE_COLNAMES,
+                                      cached_statements=self.INSTRUCOES_EM_CACHE)
+        if self.modo_wal:
+            aplicar_pragmas_wal(conexao)
+        return conexao
+    
+    def _executar_com_conexao(self, conexao, metodo, args, kwargs):
+        """Executa um método usando a conexão informada na thread atual"""
+        anterior = getattr(self._local, 'conn', None)
+        self._local.conn = conexao
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            self._local.conn = anterior
+    
+    def _em_transacao(self):
+        """Indica se a thread atual está dentro de um bloco transacao()"""
+        return getattr(self._local, 'eventos_pendentes', None) is not None
+    
+    @contextmanager
+    def transacao(self):
+        """
+        Agrupa várias escritas em uma única transação, com um único commit
+        
+        Dentro do bloco os métodos @escrita não fazem commit e os eventos só são
+        publicados depois do commit final. Uma exceção no bloco, ou um método que
+        falhe e desfaça suas alterações, desfaz tudo. No modo WAL, a thread de
+        escrita fica reservada para o bloco. Blocos aninhados fazem parte do externo.
+        
+            with db.transacao():
+                db.adicionar_cliente(...)
+                db.adicionar_vendas_lote(...)
+        
+        Yields:
+            Conexão usada pela transação
+        """
+        if self._em_transacao():
+            yield self.conn
+            return
+        if self.escritor and not self.escritor.na_thread_escritora():
+            with self.escritor.reservar() as conexao:
+                with self._transacao_na_conexao(conexao):
+                    yield conexao
+        else:
+            with self._transacao_na_conexao(self.conn):
+                yield self.conn
+    
+    @contextmanager
+    def _transacao_na_conexao(self, conexao):
+        anterior = getattr(self._local, 'conn', None)
+        self._local.conn = conexao
+        self._local.eventos_pendentes = []
+        self._local.transacao_falhou = False
+        try:
+            if not conexao.in_transaction:
+                conexao.execute("BEGIN IMMEDIATE")
+            yield
+            if self._local.transacao_falhou:
+                raise RuntimeError("Uma operação da transação falhou; nenhuma alteração foi gravada")
+            conexao.commit()
+            self.cache_resultados.incrementar_versao()
+            eventos = self._local.eventos_pendentes
+        except BaseException:
+            if conexao.in_transaction:
+                conexao.rollback()
+            raise
+        finally:
+            self._local.conn = anterior
+            self._local.eventos_pendentes = None
+        for evento in eventos:
+            self.eventos.publicar(evento)
+    
+    def _confirmar(self):
+        """Commit de um método @escrita (adiado até o fim do bloco dentro de transacao())"""
+        if not self._em_transacao():
+            self.conn.commit()
+    
+    def _desfazer(self):
+        """Rollback de um método @escrita; dentro de transacao() desfaz o bloco inteiro no final"""
+        if self._em_transacao():
+            self._local.transacao_falhou = True
+        else:
+            self.conn.rollback()
+    
+    def _publicar(self, evento):
+        """Publica um evento de alteração após o commit (ou no fim de transacao())"""
+        if self._em_transacao():
+            self._local.eventos_pendentes.append(evento)
+        else:
+            self.eventos.publicar(evento)
+    
+    def _iniciar_motor_wal(self):
+        """Ativa o journal WAL e inicia a thread de escrita e o pool de leitura"""
+        modo = self._conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if modo.lower() != 'wal':
+            print(f"ALERTA: Não foi possível ativar o modo WAL (modo atual: {modo})")
+        aplicar_pragmas_wal(self._conn)
+        self.escritor = EscritorSerializado(self._abrir_conexao)
+        self._abrir_pool_leitura()
+        print("INFO: Banco de dados em modo WAL com thread de escrita dedicada")
+    
+    def _abrir_pool_leitura(self):
+        self.pool_leitura = PoolLeitura(
+            lambda: self._abrir_conexao(somente_leitura=True),
+            self.TAMANHO_POOL_LEITURA
+        )
+    
+    def habilitar_leitura_concorrente(self):
+        """
+        Permite chamar os métodos de leitura de outras threads também no modo tradicional
+        
+        Os métodos @leitura passam a usar o pool de conexões somente-leitura
+        (no modo WAL isso já acontece). As escritas continuam na thread principal.
+        """
+        self.leitura_concorrente = True
+        if self.pool_leitura is None:
+            self._abrir_pool_leitura()
+    
+    def _reiniciar_conexoes_auxiliares(self):
+        """Recria a thread de escrita e/ou o pool de leitura após reabrir a conexão principal"""
+        if self.modo_wal:
+            if not self.escritor:
+                self._iniciar_motor_wal()
+        elif self.leitura_concorrente and self.pool_leitura is None:
+            self._abrir_pool_leitura()
+    
+    def _parar_motor_wal(self):
+        """Encerra a thread de escrita e fecha o pool de leitura"""
+        if self.escritor:
+            self.escritor.encerrar()
+            self.escritor = None
+        if self.pool_leitura:
+            self.pool_leitura.fechar()
+            self.pool_leitura = None
+    
+    def fechar(self):
+        """Encerra o motor WAL (se ativo) e fecha a conexão principal"""
+        self._parar_motor_wal()
+        if self._conn:
+            self._conn.close()
+            self._conn = None
     
     def configurar_backup_automatico(self):
         """Configura o backup automático para ser executado periodicamente"""
+        if self.backup_timer is not None:
+            return
         # Criar timer para backup automático (a cada 6 horas)
         self.backup_timer = QTimer()
         self.backup_timer.timeout.connect(self.executar_backup_automatico)
@@ -40,24 +433,79 @@ class Database:
         self.backup_timer.start(21600000)
         
     def executar_backup_automatico(self):
-        """Executa o backup automático e limpa backups antigos"""
+        """Inicia o backup automático em segundo plano e limpa backups antigos ao final"""
         try:
-            # Fazer o backup
-            sucesso, mensagem = self.fazer_backup_automatico()
+            if self.backup_em_andamento and self.backup_em_andamento.em_andamento():
+                print("Backup automático ignorado: já existe um backup em andamento")
+                return
             
-            if sucesso:
-                print(f"Backup automático realizado com sucesso: {mensagem}")
-                # Limpar backups antigos (manter apenas os últimos 7 dias)
-                self.limpar_backups_antigos()
-            else:
-                print(f"Erro no backup automático: {mensagem}")
+            # Fazer o backup sem bloquear a interface
+            self.backup_em_andamento = self.iniciar_backup_em_segundo_plano()
+            self.backup_em_andamento.concluido.connect(self._backup_automatico_concluido)
                 
         except Exception as e:
             print(f"Erro ao executar backup automático: {str(e)}")
     
+    def backup_ao_fechar(self):
+        """
+        Backup automático feito ao fechar o sistema
+        
+        Se o backup automático em segundo plano ainda estiver gravando, espera por
+        ele e usa o seu resultado, em vez de disputar o repositório de backups e
+        gravar um segundo snapshot logo em seguida.
+        
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        backup = self.backup_em_andamento
+        if backup and backup.em_andamento():
+            print("Aguardando o backup automático em andamento...")
+            return backup.aguardar()
+        return self.fazer_backup_automatico()
+    
+    def _backup_automatico_concluido(self, sucesso, mensagem):
+        """Finaliza o backup automático executado em segundo plano"""
+        if sucesso:
+            print(f"Backup automático realizado com sucesso: {mensagem}")
+            # Aplicar a política de retenção dos backups
+            self.limpar_backups_antigos()
+        else:
+            print(f"Erro no backup automático: {mensagem}")
+    
+    def caminho_backup_automatico(self):
+        """Retorna o caminho de um novo arquivo de backup na pasta de backups"""
+        # Garantir que a pasta de backups existe
+        if not os.path.exists(self.backups_dir):
+            os.makedirs(self.backups_dir)
+            print(f"Pasta backups criada em: {self.backups_dir}")
+        
+        # Gera nome do arquivo com timestamp
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return os.path.join(self.backups_dir, f"backup_{timestamp}.db")
+    
+    def iniciar_backup_em_segundo_plano(self, caminho_destino=None):
+        """
+        Inicia um backup online em uma thread separada
+        
+        Args:
+            caminho_destino: Arquivo de destino (padrão: snapshot no repositório de backups)
+            
+        Returns:
+            BackupEmSegundoPlano já iniciado; conecte-se aos sinais progresso/concluido
+        """
+        return BackupEmSegundoPlano(self, caminho_destino).iniciar()
+    
+    @instrumentado('Database.limpar_backups_antigos')
     def limpar_backups_antigos(self):
-        """Remove backups mais antigos que 7 dias"""
+        """
+        Aplica a política de retenção do repositório de backups (avô-pai-filho)
+        e remove backups completos antigos (backup_*.db) com mais de 7 dias
+        """
         try:
+            snapshots_removidos, blocos_removidos = self.repositorio_backup.aplicar_retencao()
+            if snapshots_removidos:
+                print(f"Retenção de backups: {snapshots_removidos} snapshots e {blocos_removidos} blocos removidos")
+            
             backup_dir = self.backups_dir
             if not os.path.exists(backup_dir):
                 return
@@ -77,6 +525,17 @@ class Database:
         except Exception as e:
             print(f"Erro ao limpar backups antigos: {str(e)}")
     
+    @instrumentado('Database.listar_backups')
+    def listar_backups(self):
+        """
+        Lista os snapshots do repositório de backups, do mais recente para o mais antigo
+        
+        Returns:
+            Lista de tuplas (id, criado_em, tamanho, bytes_novos); o ID pode ser
+            passado para restaurar_backup
+        """
+        return self.repositorio_backup.listar_snapshots()
+    
     def criar_tabelas(self):
         cursor = self.conn.cursor()
         
@@ -98,8 +557,8 @@ class Database:
             cliente_id INTEGER,
             produto TEXT NOT NULL,
             quantidade INTEGER NOT NULL,
-            valor_unitario REAL NOT NULL,
-            valor_total REAL NOT NULL,
+            valor_unitario INTEGER NOT NULL,
+            valor_total INTEGER NOT NULL,
             data_venda TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (cliente_id) REFERENCES clientes (id)
         )
@@ -114,14 +573,14 @@ class Database:
             cliente_nome TEXT,
             produto TEXT NOT NULL,
             quantidade INTEGER NOT NULL,
-            valor_total REAL NOT NULL,
+            valor_total INTEGER NOT NULL,
             data_venda TEXT,
             data_exclusao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (cliente_id) REFERENCES clientes (id)
         )
         ''')
         
-        self.conn.commit()
+        self._confirmar()
     
     def verificar_estrutura_tabela(self, nome_tabela):
         """
@@ -162,7 +621,7 @@ class Database:
                 # SQLite não permite CURRENT_TIMESTAMP em ALTER TABLE,
                 # então adicionamos a coluna sem valor padrão
                 cursor.execute("ALTER TABLE clientes ADD COLUMN data_cadastro TEXT")
-                self.conn.commit()
+                self._confirmar()
                 print("Coluna data_cadastro adicionada à tabela clientes")
                 # Atualizar o cache
                 self.cache_estrutura.pop('clientes', None)
@@ -195,7 +654,7 @@ class Database:
                 # Renomear tabela temporária
                 cursor.execute("ALTER TABLE clientes_temp RENAME TO clientes")
                 
-                self.conn.commit()
+                self._confirmar()
                 print("Coluna 'notas' renomeada para 'nota'")
                 # Atualizar o cache
                 self.cache_estrutura.pop('clientes', None)
@@ -204,10 +663,135 @@ class Database:
         
         # Verificar estrutura da tabela vendas uma única vez
         # Apenas chamar para garantir que está em cache
-        self.verificar_estrutura_tabela('vendas')
+        colunas_vendas = self.verificar_estrutura_tabela('vendas')
+        
+        # Valores monetários antigos (REAL em reais) devem ser convertidos para centavos
+        tipo_valor_total = next((col[2] for col in colunas_vendas if col[1] == 'valor_total'), '')
+        if tipo_valor_total.upper() != 'INTEGER':
+            self.migrar_valores_para_centavos()
         
         cursor.close()
     
+    def migrar_valores_para_centavos(self):
+        """
+        Converte as colunas monetárias de REAL (reais) para INTEGER (centavos)
+        
+        As tabelas vendas, vendas_excluidas e notificacoes_pagamento são recriadas
+        com as colunas monetárias em INTEGER, em uma única transação. A coluna antiga
+        'preco' é convertida para 'valor_unitario'. A tabela saldos_clientes é
+        removida para ser recriada e recalculada em centavos.
+        """
+        cursor = self.conn.cursor()
+        try:
+            print("INFO: Convertendo valores monetários para centavos...")
+            colunas_vendas = [col[1] for col in self.verificar_estrutura_tabela('vendas')]
+            # Versões antigas guardavam o valor unitário em 'preco' ou 'valor'
+            coluna_unitario = next((col for col in ('valor_unitario', 'preco', 'valor') if col in colunas_vendas), None)
+            if coluna_unitario:
+                expressao_unitario = f"CAST(ROUND({coluna_unitario} * 100) AS INTEGER)"
+            else:
+                expressao_unitario = "CAST(ROUND(valor_total * 100 / MAX(quantidade, 1)) AS INTEGER)"
+            
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            tabelas = {linha[0] for linha in cursor.fetchall()}
+            
+            # Preservar o contador AUTOINCREMENT (ids de vendas excluídas não podem ser reutilizados)
+            sequencias = {}
+            if 'sqlite_sequence' in tabelas:
+                cursor.execute("SELECT name, seq FROM sqlite_sequence")
+                sequencias = dict(cursor.fetchall())
+            
+            if not self.conn.in_transaction:
+                cursor.execute("BEGIN")
+            
+            cursor.execute('''
+            CREATE TABLE vendas_centavos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cliente_id INTEGER,
+                produto TEXT NOT NULL,
+                quantidade INTEGER NOT NULL,
+                valor_unitario INTEGER NOT NULL,
+                valor_total INTEGER NOT NULL,
+                data_venda TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+            )
+            ''')
+            cursor.execute(f'''
+            INSERT INTO vendas_centavos (id, cliente_id, produto, quantidade, valor_unitario, valor_total, data_venda)
+            SELECT id, cliente_id, produto, quantidade, {expressao_unitario},
+                   CAST(ROUND(valor_total * 100) AS INTEGER), data_venda
+            FROM vendas
+            ''')
+            cursor.execute("DROP TABLE vendas")
+            cursor.execute("ALTER TABLE vendas_centavos RENAME TO vendas")
+            
+            if 'vendas_excluidas' in tabelas:
+                cursor.execute('''
+                CREATE TABLE vendas_excluidas_centavos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    venda_id INTEGER,
+                    cliente_id INTEGER,
+                    cliente_nome TEXT,
+                    produto TEXT NOT NULL,
+                    quantidade INTEGER NOT NULL,
+                    valor_total INTEGER NOT NULL,
+                    data_venda TEXT,
+                    data_exclusao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+                )
+                ''')
+                cursor.execute('''
+                INSERT INTO vendas_excluidas_centavos
+                    (id, venda_id, cliente_id, cliente_nome, produto, quantidade, valor_total, data_venda, data_exclusao)
+                SELECT id, venda_id, cliente_id, cliente_nome, produto, quantidade,
+                       CAST(ROUND(valor_total * 100) AS INTEGER), data_venda, data_exclusao
+                FROM vendas_excluidas
+                ''')
+                cursor.execute("DROP TABLE vendas_excluidas")
+                cursor.execute("ALTER TABLE vendas_excluidas_centavos RENAME TO vendas_excluidas")
+            
+            if 'notificacoes_pagamento' in tabelas:
+                colunas_notificacoes = [col[1] for col in cursor.execute("PRAGMA table_info(notificacoes_pagamento)").fetchall()]
+                coluna_tipo = 'tipo' if 'tipo' in colunas_notificacoes else "'sistema'"
+                cursor.execute('''
+                CREATE TABLE notificacoes_pagamento_centavos (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cliente_id INTEGER NOT NULL,
+                    data_notificacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    status TEXT DEFAULT 'pendente',
+                    valor_pendente INTEGER,
+                    observacao TEXT,
+                    tipo TEXT DEFAULT 'sistema',
+                    FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+                )
+                ''')
+                cursor.execute(f'''
+                INSERT INTO notificacoes_pagamento_centavos
+                    (id, cliente_id, data_notificacao, status, valor_pendente, observacao, tipo)
+                SELECT id, cliente_id, data_notificacao, status,
+                       CAST(ROUND(valor_pendente * 100) AS INTEGER), observacao, {coluna_tipo}
+                FROM notificacoes_pagamento
+                ''')
+                cursor.execute("DROP TABLE notificacoes_pagamento")
+                cursor.execute("ALTER TABLE notificacoes_pagamento_centavos RENAME TO notificacoes_pagamento")
+            
+            # Saldos em reais: será recriada e recalculada em centavos
+            cursor.execute("DROP TABLE IF EXISTS saldos_clientes")
+            
+            for tabela, seq in sequencias.items():
+                cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq, tabela))
+            
+            self._confirmar()
+            self.cache_estrutura.clear()
+            print("INFO: Valores monetários convertidos para centavos com sucesso")
+        except Exception as e:
+            self._desfazer()
+            self.cache_estrutura.clear()
+            print(f"ERRO ao converter valores monetários para centavos: {e}")
+            raise
+        finally:
+            cursor.close()
+    
     def verificar_tabela_vendas_excluidas(self):
         """Verifica se a tabela de vendas excluídas existe e está correta"""
         try:
@@ -227,13 +811,13 @@ class Database:
                     cliente_nome TEXT,
                     produto TEXT NOT NULL,
                     quantidade INTEGER NOT NULL,
-                    valor_total REAL NOT NULL,
+                    valor_total INTEGER NOT NULL,
                     data_venda TEXT,
                     data_exclusao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (cliente_id) REFERENCES clientes (id)
                 )
                 ''')
-                self.conn.commit()
+                self._confirmar()
                 print("INFO: Tabela vendas_excluidas criada com sucesso")
             else:
                 # Verificar estrutura da tabela
@@ -252,6 +836,7 @@ class Database:
             cursor.close()
         except Exception as e:
             print(f"ERRO ao verificar tabela vendas_excluidas: {e}")
+            raise
     
     def verificar_tabela_notificacoes(self):
         """Verifica se a tabela de notificações de pagamentos pendentes existe e a cria se necessário"""
@@ -270,13 +855,13 @@ class Database:
                     cliente_id INTEGER NOT NULL,
                     data_notificacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                     status TEXT DEFAULT 'pendente',
-                    valor_pendente REAL,
+                    valor_pendente INTEGER,
                     observacao TEXT,
                     tipo TEXT DEFAULT 'sistema',
                     FOREIGN KEY (cliente_id) REFERENCES clientes (id)
                 )
                 ''')
-                self.conn.commit()
+                self._confirmar()
                 print("INFO: Tabela notificacoes_pagamento criada com sucesso")
             else:
                 # Verificar se a coluna 'tipo' existe na tabela
@@ -286,55 +871,1479 @@ class Database:
                 if 'tipo' not in colunas:
                     print("ALERTA: Coluna 'tipo' não encontrada na tabela notificacoes_pagamento. Adicionando...")
                     cursor.execute("ALTER TABLE notificacoes_pagamento ADD COLUMN tipo TEXT DEFAULT 'sistema'")
-                    self.conn.commit()
+                    self._confirmar()
                     print("INFO: Coluna 'tipo' adicionada com sucesso na tabela notificacoes_pagamento")
             
             cursor.close()
         except Exception as e:
             print(f"ERRO ao verificar tabela notificacoes_pagamento: {e}")
+            raise
     
-    def adicionar_cliente(self, nome, telefone, notas=""):
+    def verificar_tabela_saldos_clientes(self):
+        """
+        Verifica se a tabela saldos_clientes e seus triggers existem, criando-os se necessário.
+        
+        A tabela guarda uma linha por cliente com vendas (total, quantidade de vendas e data
+        da última venda) e é mantida pelos triggers a cada INSERT/UPDATE/DELETE em vendas,
+        para que os relatórios não precisem agregar a tabela vendas inteira.
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='saldos_clientes'")
+            tabela_existe = cursor.fetchone() is not None
+            
+            if not tabela_existe:
+                print("ALERTA: Tabela saldos_clientes não existe. Criando...")
+                cursor.execute('''
+                CREATE TABLE saldos_clientes (
+                    cliente_id INTEGER PRIMARY KEY,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    quantidade_vendas INTEGER NOT NULL DEFAULT 0,
+                    ultima_venda TEXT,
+                    FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+                )
+                ''')
+            
+            # Nova venda: soma no saldo do cliente
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_saldos_vendas_insert
+            AFTER INSERT ON vendas
+            WHEN NEW.cliente_id IS NOT NULL
+            BEGIN
+                INSERT INTO saldos_clientes (cliente_id, total, quantidade_vendas, ultima_venda)
+                VALUES (NEW.cliente_id, NEW.valor_total, 1, NEW.data_venda)
+                ON CONFLICT(cliente_id) DO UPDATE SET
+                    total = total + excluded.total,
+                    quantidade_vendas = quantidade_vendas + 1,
+                    ultima_venda = CASE
+                        WHEN ultima_venda IS NULL OR excluded.ultima_venda > ultima_venda
+                        THEN excluded.ultima_venda ELSE ultima_venda END;
+            END
+            ''')
+            
+            # Venda excluída: subtrai do saldo e remove a linha quando não sobrar venda
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_saldos_vendas_delete
+            AFTER DELETE ON vendas
+            WHEN OLD.cliente_id IS NOT NULL
+            BEGIN
+                UPDATE saldos_clientes SET
+                    total = total - OLD.valor_total,
+                    quantidade_vendas = quantidade_vendas - 1,
+                    ultima_venda = (SELECT MAX(data_venda) FROM vendas WHERE cliente_id = OLD.cliente_id)
+                WHERE cliente_id = OLD.cliente_id;
+                DELETE FROM saldos_clientes
+                WHERE cliente_id = OLD.cliente_id AND quantidade_vendas <= 0;
+            END
+            ''')
+            
+            # Venda alterada: desfaz os valores antigos e aplica os novos
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_saldos_vendas_update
+            AFTER UPDATE OF cliente_id, valor_total, data_venda ON vendas
+            BEGIN
+                UPDATE saldos_clientes SET
+                    total = total - OLD.valor_total,
+                    quantidade_vendas = quantidade_vendas - 1
+                WHERE cliente_id = OLD.cliente_id;
+                INSERT INTO saldos_clientes (cliente_id, total, quantidade_vendas)
+                SELECT NEW.cliente_id, NEW.valor_total, 1
+                WHERE NEW.cliente_id IS NOT NULL
+                ON CONFLICT(cliente_id) DO UPDATE SET
+                    total = total + excluded.total,
+                    quantidade_vendas = quantidade_vendas + 1;
+                UPDATE saldos_clientes SET
+                    ultima_venda = (SELECT MAX(data_venda) FROM vendas WHERE cliente_id = saldos_clientes.cliente_id)
+                WHERE cliente_id IN (OLD.cliente_id, NEW.cliente_id);
+                DELETE FROM saldos_clientes
+                WHERE cliente_id = OLD.cliente_id AND quantidade_vendas <= 0;
+            END
+            ''')
+            
+            self._confirmar()
+            cursor.close()
+            
+            # Tabela recém-criada: preencher a partir das vendas já existentes
+            if not tabela_existe:
+                self.reconstruir_saldos_clientes()
+                print("INFO: Tabela saldos_clientes criada com sucesso")
+        except Exception as e:
+            print(f"ERRO ao verificar tabela saldos_clientes: {e}")
+            raise
+    
+    @escrita
+    def reconstruir_saldos_clientes(self):
+        """
+        Recalcula a tabela saldos_clientes inteira a partir da tabela vendas
+        
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
         cursor = self.conn.cursor()
-        cursor.execute('''
-        INSERT INTO clientes (nome, telefone, nota)
-        VALUES (?, ?, ?)
-        ''', (nome, telefone, notas))
-        self.conn.commit()
-        return cursor.lastrowid
+        try:
+            cursor.execute("DELETE FROM saldos_clientes")
+            cursor.execute('''
+            INSERT INTO saldos_clientes (cliente_id, total, quantidade_vendas, ultima_venda)
+            SELECT cliente_id, SUM(valor_total), COUNT(*), MAX(data_venda)
+            FROM vendas
+            WHERE cliente_id IS NOT NULL
+            GROUP BY cliente_id
+            ''')
+            quantidade = cursor.rowcount
+            self._confirmar()
+            self._publicar(BancoRecarregado())
+            return True, f"Saldos de {quantidade} clientes reconstruídos com sucesso!"
+        except Exception as e:
+            self._desfazer()
+            print(f"ERRO ao reconstruir saldos dos clientes: {e}")
+            return False, f"Erro ao reconstruir saldos: {str(e)}"
+        finally:
+            cursor.close()
     
-    def listar_clientes(self):
+    @leitura
+    def verificar_saldos_clientes(self):
+        """
+        Compara a tabela saldos_clientes com a agregação direta da tabela vendas
+        
+        Returns:
+            Lista de tuplas (cliente_id, total_saldo, total_vendas, qtd_saldo, qtd_vendas)
+            com os clientes divergentes. Lista vazia significa que os saldos estão corretos.
+        """
         cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM clientes ORDER BY nome')
-        return cursor.fetchall()
+        try:
+            cursor.execute('''
+            WITH agregado AS (
+                SELECT cliente_id, SUM(valor_total) AS total, COUNT(*) AS quantidade,
+                       MAX(data_venda) AS ultima_venda
+                FROM vendas
+                WHERE cliente_id IS NOT NULL
+                GROUP BY cliente_id
+            ),
+            comparacao AS (
+                SELECT s.cliente_id, s.total AS total_saldo, a.total AS total_vendas,
+                       s.quantidade_vendas AS qtd_saldo, a.quantidade AS qtd_vendas,
+                       s.ultima_venda AS ultima_saldo, a.ultima_venda AS ultima_vendas
+                FROM saldos_clientes s
+                LEFT JOIN agregado a ON a.cliente_id = s.cliente_id
+                UNION ALL
+                SELECT a.cliente_id, NULL, a.total, NULL, a.quantidade, NULL, a.ultima_venda
+                FROM agregado a
+                WHERE a.cliente_id NOT IN (SELECT cliente_id FROM saldos_clientes)
+            )
+            SELECT cliente_id, total_saldo, total_vendas, qtd_saldo, qtd_vendas
+            FROM comparacao
+            WHERE total_saldo IS NULL OR total_vendas IS NULL
+               OR total_saldo != total_vendas
+               OR qtd_saldo != qtd_vendas
+               OR ultima_saldo IS NOT ultima_vendas
+            ORDER BY cliente_id
+            ''')
+            divergencias = cursor.fetchall()
+            if divergencias:
+                print(f"ALERTA: {len(divergencias)} clientes com saldo divergente em saldos_clientes")
+            return divergencias
+        finally:
+            cursor.close()
     
-    def adicionar_venda(self, cliente_id, produto, quantidade, valor_unitario):
-        valor_total = quantidade * valor_unitario
+    # Tabelas de resumo diário: (tabela, coluna de agrupamento, colunas do índice secundário)
+    TABELAS_RESUMO = (
+        # Histórico de um cliente sem percorrer todos os dias
+        ('resumo_diario_clientes', 'cliente_id', 'cliente_id, dia'),
+        # Totais e ranking por produto lidos só do índice
+        ('resumo_diario_produtos', 'produto', 'produto, quantidade_itens, total, quantidade_vendas'),
+    )
+    
+    def verificar_tabelas_resumo(self):
+        """
+        Cria as tabelas de resumo diário de vendas e seus triggers
+        
+        resumo_diario_clientes e resumo_diario_produtos guardam, por dia e por
+        cliente/produto, o total, a quantidade de itens e a quantidade de vendas.
+        São mantidas pelos triggers a cada INSERT/UPDATE/DELETE em vendas, como
+        saldos_clientes, e respondem os relatórios por período lendo uma linha
+        por dia em vez de todas as vendas.
+        """
         cursor = self.conn.cursor()
+        try:
+            for tabela, coluna, colunas_indice in self.TABELAS_RESUMO:
+                tipo = 'INTEGER' if coluna == 'cliente_id' else 'TEXT'
+                cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {tabela} (
+                    dia TEXT NOT NULL,
+                    {coluna} {tipo} NOT NULL,
+                    total INTEGER NOT NULL DEFAULT 0,
+                    quantidade_itens INTEGER NOT NULL DEFAULT 0,
+                    quantidade_vendas INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (dia, {coluna})
+                ) WITHOUT ROWID
+                ''')
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{tabela}_{coluna} ON {tabela} ({colunas_indice})")
+                
+                # Somar (NEW) ou subtrair (OLD) uma venda do resumo do dia
+                def somar(linha):
+                    return f'''
+                    INSERT INTO {tabela} (dia, {coluna}, total, quantidade_itens, quantidade_vendas)
+                    SELECT date({linha}.data_venda), {linha}.{coluna}, {linha}.valor_total, {linha}.quantidade, 1
+                    WHERE {linha}.{coluna} IS NOT NULL
+                    ON CONFLICT(dia, {coluna}) DO UPDATE SET
+                        total = total + excluded.total,
+                        quantidade_itens = quantidade_itens + excluded.quantidade_itens,
+                        quantidade_vendas = quantidade_vendas + 1;
+                    '''
+                
+                def subtrair(linha):
+                    return f'''
+                    UPDATE {tabela} SET
+                        total = total - {linha}.valor_total,
+                        quantidade_itens = quantidade_itens - {linha}.quantidade,
+                        quantidade_vendas = quantidade_vendas - 1
+                    WHERE dia = date({linha}.data_venda) AND {coluna} = {linha}.{coluna};
+                    DELETE FROM {tabela}
+                    WHERE dia = date({linha}.data_venda) AND {coluna} = {linha}.{coluna}
+                      AND quantidade_vendas <= 0;
+                    '''
+                
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_insert
+                AFTER INSERT ON vendas
+                BEGIN {somar('NEW')} END
+                ''')
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_delete
+                AFTER DELETE ON vendas
+                BEGIN {subtrair('OLD')} END
+                ''')
+                cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{tabela}_update
+                AFTER UPDATE OF cliente_id, produto, quantidade, valor_total, data_venda ON vendas
+                BEGIN {subtrair('OLD')} {somar('NEW')} END
+                ''')
+            self._confirmar()
+        except Exception as e:
+            print(f"ERRO ao criar tabelas de resumo: {e}")
+            raise
+        finally:
+            cursor.close()
+        self.reconstruir_resumos()
+    
+    @escrita
+    def reconstruir_resumos(self):
+        """
+        Recalcula as tabelas de resumo diário a partir da tabela vendas
         
-        # Verificando a estrutura da tabela para determinar o nome correto da coluna
-        colunas = [col[1] for col in self.verificar_estrutura_tabela('vendas')]
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        try:
+            with self.transacao():
+                cursor = self.conn.cursor()
+                for tabela, coluna, _ in self.TABELAS_RESUMO:
+                    cursor.execute(f"DELETE FROM {tabela}")
+                    cursor.execute(f'''
+                    INSERT INTO {tabela} (dia, {coluna}, total, quantidade_itens, quantidade_vendas)
+                    SELECT date(data_venda), {coluna}, SUM(valor_total), SUM(quantidade), COUNT(*)
+                    FROM vendas
+                    WHERE {coluna} IS NOT NULL
+                    GROUP BY date(data_venda), {coluna}
+                    ''')
+                self._publicar(BancoRecarregado())
+            return True, "Resumos de vendas reconstruídos com sucesso!"
+        except Exception as e:
+            print(f"ERRO ao reconstruir resumos de vendas: {e}")
+            return False, f"Erro ao reconstruir resumos: {str(e)}"
+    
+    @leitura
+    def verificar_resumos(self):
+        """
+        Compara as tabelas de resumo com a agregação direta da tabela vendas
         
-        # Se tiver coluna preco, usa preco; senão, tenta valor_unitario
-        if 'preco' in colunas:
-            cursor.execute('''
-            INSERT INTO vendas (cliente_id, produto, quantidade, preco, valor_total)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (cliente_id, produto, quantidade, valor_unitario, valor_total))
-        elif 'valor_unitario' in colunas:
-            cursor.execute('''
-            INSERT INTO vendas (cliente_id, produto, quantidade, valor_unitario, valor_total)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (cliente_id, produto, quantidade, valor_unitario, valor_total))
-        else:
-            raise ValueError("Estrutura de tabela incompatível: não encontrada coluna para valor unitário")
-            
-        self.conn.commit()
-        return cursor.lastrowid
+        Returns:
+            Lista de tuplas (tabela, dia, chave) com as linhas divergentes (vazia se corretas)
+        """
+        cursor = self.conn.cursor()
+        divergencias = []
+        try:
+            for tabela, coluna, _ in self.TABELAS_RESUMO:
+                cursor.execute(f'''
+                WITH agregado AS (
+                    SELECT date(data_venda) AS dia, {coluna} AS chave, SUM(valor_total) AS total,
+                           SUM(quantidade) AS itens, COUNT(*) AS vendas
+                    FROM vendas WHERE {coluna} IS NOT NULL
+                    GROUP BY 1, 2
+                ),
+                resumo AS (
+                    SELECT dia, {coluna} AS chave, total, quantidade_itens AS itens,
+                           quantidade_vendas AS vendas
+                    FROM {tabela}
+                )
+                SELECT dia, chave FROM (SELECT * FROM agregado EXCEPT SELECT * FROM resumo)
+                UNION
+                SELECT dia, chave FROM (SELECT * FROM resumo EXCEPT SELECT * FROM agregado)
+                ''')
+                divergencias.extend((tabela, dia, chave) for dia, chave in cursor.fetchall())
+            if divergencias:
+                print(f"ALERTA: {len(divergencias)} linhas divergentes nas tabelas de resumo")
+            return divergencias
+        finally:
+            cursor.close()
     
-    def listar_vendas_cliente(self, cliente_id):
+    @staticmethod
+    def _filtro_dias(data_inicio, data_fim):
+        """Filtro por dia das tabelas de resumo (datas com ou sem horário)"""
+        filtros = []
+        params = []
+        if data_inicio:
+            filtros.append("dia >= date(?)")
+            params.append(data_inicio)
+        if data_fim:
+            filtros.append("dia <= date(?)")
+            params.append(data_fim)
+        return filtros, params
+    
+    @staticmethod
+    def _filtro_periodo(coluna, data_inicio, data_fim):
+        """
+        Filtro de período sobre uma coluna de data, como intervalo semiaberto
+        (coluna >= inicio AND coluna < fim), para que a consulta use o índice da coluna
+        
+        Returns:
+            tuple: (lista de condições SQL, lista de parâmetros)
+        """
+        inicio, fim = limites_periodo(data_inicio, data_fim)
+        filtros = []
+        params = []
+        if inicio:
+            filtros.append(f"{coluna} >= ?")
+            params.append(inicio)
+        if fim:
+            filtros.append(f"{coluna} < ?")
+            params.append(fim)
+        return filtros, params
+    
+    @em_cache
+    @leitura
+    def obter_totais_periodo(self, data_inicio=None, data_fim=None, cliente_id=None):
+        """
+        Totais de vendas de um período, lidos das tabelas de resumo diário
+        
+        Args:
+            data_inicio, data_fim: Período, dias inclusive (opcional)
+            cliente_id: Apenas as vendas deste cliente (opcional)
+            
+        Returns:
+            tuple: (valor total como Dinheiro, quantidade de itens, quantidade de vendas)
+        """
+        filtros, params = self._filtro_dias(data_inicio, data_fim)
+        tabela = 'resumo_diario_produtos'
+        if cliente_id is not None:
+            tabela = 'resumo_diario_clientes'
+            filtros.append("cliente_id = ?")
+            params.append(cliente_id)
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
         cursor = self.conn.cursor()
-        cursor.execute("""
-            SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_total, v.data_venda 
+        try:
+            cursor.execute(f'''
+            SELECT COALESCE(SUM(total), 0) AS "total [dinheiro]",
+                   COALESCE(SUM(quantidade_itens), 0), COALESCE(SUM(quantidade_vendas), 0)
+            FROM {tabela} {where}
+            ''', params)
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+    
+    @em_cache
+    @leitura
+    def obter_produtos_mais_vendidos(self, data_inicio=None, data_fim=None, limite=10):
+        """
+        Produtos mais vendidos (em quantidade) de um período
+        
+        Returns:
+            Lista de tuplas (produto, quantidade de itens, valor total como Dinheiro)
+        """
+        filtros, params = self._filtro_dias(data_inicio, data_fim)
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'''
+            SELECT produto, SUM(quantidade_itens) AS itens, SUM(total) AS "total [dinheiro]"
+            FROM resumo_diario_produtos {where}
+            GROUP BY produto
+            ORDER BY itens DESC, produto
+            LIMIT ?
+            ''', params + [limite])
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    # Agrupamentos aceitos por obter_serie_vendas (prefixo de 'AAAA-MM-DD')
+    AGRUPAMENTOS_SERIE = {'dia': 10, 'mes': 7, 'ano': 4}
+    
+    @em_cache
+    @leitura
+    def obter_serie_vendas(self, data_inicio=None, data_fim=None, agrupamento='dia', cliente_id=None):
+        """
+        Série temporal de vendas para gráficos de tendência
+        
+        Args:
+            data_inicio, data_fim: Período, dias inclusive (opcional)
+            agrupamento: 'dia', 'mes' ou 'ano'
+            cliente_id: Apenas as vendas deste cliente (opcional)
+            
+        Returns:
+            Lista de tuplas (período 'AAAA[-MM[-DD]]', valor total como Dinheiro,
+            quantidade de vendas) em ordem cronológica; períodos sem vendas não aparecem
+        """
+        if agrupamento not in self.AGRUPAMENTOS_SERIE:
+            raise ValueError(f"Agrupamento inválido: {agrupamento}")
+        tamanho = self.AGRUPAMENTOS_SERIE[agrupamento]
+        filtros, params = self._filtro_dias(data_inicio, data_fim)
+        tabela = 'resumo_diario_produtos'
+        if cliente_id is not None:
+            tabela = 'resumo_diario_clientes'
+            filtros.append("cliente_id = ?")
+            params.append(cliente_id)
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'''
+            SELECT substr(dia, 1, {tamanho}) AS periodo, SUM(total) AS "total [dinheiro]",
+                   SUM(quantidade_vendas)
+            FROM {tabela} {where}
+            GROUP BY periodo
+            ORDER BY periodo
+            ''', params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    # Um checkpoint de saldo a cada INTERVALO_CHECKPOINT_SALDO lançamentos do cliente
+    INTERVALO_CHECKPOINT_SALDO = 64
+    
+    def verificar_tabelas_lancamentos(self):
+        """
+        Cria as tabelas de pagamentos e do livro de lançamentos, com seus triggers
+        
+        Cada venda e cada pagamento gera um lançamento (venda: +valor, pagamento:
+        -valor) em lancamentos. O livro só recebe linhas novas: uma venda ou um
+        pagamento excluído/alterado gera um estorno com o valor oposto, datado no
+        momento da alteração. A partir dele os triggers mantêm:
+        - contas_clientes: saldo devedor atual de cada cliente (vendas - pagamentos);
+        - checkpoints_saldo: o saldo acumulado de cada cliente a cada
+          INTERVALO_CHECKPOINT_SALDO lançamentos, em ordem de data, para que
+          obter_saldo_cliente em uma data some poucos lançamentos.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='lancamentos'")
+            livro_novo = cursor.fetchone() is None
+            
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS pagamentos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cliente_id INTEGER NOT NULL,
+                valor INTEGER NOT NULL CHECK (valor > 0),
+                data_pagamento TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                forma TEXT,
+                observacao TEXT,
+                FOREIGN KEY (cliente_id) REFERENCES clientes (id)
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lancamentos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cliente_id INTEGER NOT NULL,
+                data_lancamento TEXT NOT NULL,
+                tipo TEXT NOT NULL,
+                referencia_id INTEGER NOT NULL,
+                valor INTEGER NOT NULL
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS contas_clientes (
+                cliente_id INTEGER PRIMARY KEY,
+                saldo INTEGER NOT NULL DEFAULT 0,
+                lancamentos_desde_checkpoint INTEGER NOT NULL DEFAULT 0,
+                ultimo_lancamento TEXT
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS checkpoints_saldo (
+                cliente_id INTEGER NOT NULL,
+                data_lancamento TEXT NOT NULL,
+                lancamento_id INTEGER NOT NULL,
+                saldo INTEGER NOT NULL,
+                PRIMARY KEY (cliente_id, data_lancamento, lancamento_id)
+            ) WITHOUT ROWID
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_pagamentos_cliente_data ON pagamentos (cliente_id, data_pagamento)")
+            # Soma dos lançamentos de um cliente em um período lida só do índice
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_lancamentos_cliente_data "
+                           "ON lancamentos (cliente_id, data_lancamento, valor)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_contas_clientes_saldo ON contas_clientes (saldo)")
+            
+            if livro_novo:
+                # Vendas já existentes entram no livro antes dos triggers (contas e
+                # checkpoints são calculados de uma vez em reconstruir_contas_clientes)
+                cursor.execute('''
+                INSERT INTO lancamentos (cliente_id, data_lancamento, tipo, referencia_id, valor)
+                SELECT cliente_id, COALESCE(data_venda, CURRENT_TIMESTAMP), 'venda', id, valor_total
+                FROM vendas
+                WHERE cliente_id IS NOT NULL
+                ORDER BY data_venda, id
+                ''')
+            
+            # Lançamentos de vendas e pagamentos. Todas as datas do livro estão em UTC:
+            # as de vendas e pagamentos (CURRENT_TIMESTAMP ou padronizar_data) e a
+            # dos estornos, que entram no momento da alteração
+            def lancar(cliente, data, tipo, referencia, valor):
+                return f'''
+                    INSERT INTO lancamentos (cliente_id, data_lancamento, tipo, referencia_id, valor)
+                    SELECT {cliente}, {data}, '{tipo}', {referencia}, {valor}
+                    WHERE {cliente} IS NOT NULL;
+                '''
+            
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_lancamentos_vendas_insert
+            AFTER INSERT ON vendas
+            BEGIN
+                {lancar('NEW.cliente_id', 'COALESCE(NEW.data_venda, CURRENT_TIMESTAMP)', 'venda', 'NEW.id', 'NEW.valor_total')}
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_lancamentos_vendas_delete
+            AFTER DELETE ON vendas
+            BEGIN
+                {lancar('OLD.cliente_id', 'CURRENT_TIMESTAMP', 'estorno_venda', 'OLD.id', '-OLD.valor_total')}
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_lancamentos_vendas_update
+            AFTER UPDATE OF cliente_id, valor_total ON vendas
+            WHEN OLD.cliente_id IS NOT NEW.cliente_id OR OLD.valor_total IS NOT NEW.valor_total
+            BEGIN
+                {lancar('OLD.cliente_id', 'CURRENT_TIMESTAMP', 'estorno_venda', 'OLD.id', '-OLD.valor_total')}
+                {lancar('NEW.cliente_id', 'CURRENT_TIMESTAMP', 'venda', 'NEW.id', 'NEW.valor_total')}
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_lancamentos_pagamentos_insert
+            AFTER INSERT ON pagamentos
+            BEGIN
+                {lancar('NEW.cliente_id', 'COALESCE(NEW.data_pagamento, CURRENT_TIMESTAMP)', 'pagamento', 'NEW.id', '-NEW.valor')}
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_lancamentos_pagamentos_delete
+            AFTER DELETE ON pagamentos
+            BEGIN
+                {lancar('OLD.cliente_id', 'CURRENT_TIMESTAMP', 'estorno_pagamento', 'OLD.id', 'OLD.valor')}
+            END
+            ''')
+            
+            # Novo lançamento: atualiza o saldo atual e os checkpoints
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_contas_lancamentos_insert
+            AFTER INSERT ON lancamentos
+            BEGIN
+                -- Lançamento com data retroativa: corrige os checkpoints posteriores a ele
+                UPDATE checkpoints_saldo SET saldo = saldo + NEW.valor
+                WHERE cliente_id = NEW.cliente_id
+                  AND (data_lancamento, lancamento_id) > (NEW.data_lancamento, NEW.id);
+                
+                INSERT INTO contas_clientes (cliente_id, saldo, lancamentos_desde_checkpoint, ultimo_lancamento)
+                VALUES (NEW.cliente_id, NEW.valor, 1, NEW.data_lancamento)
+                ON CONFLICT(cliente_id) DO UPDATE SET
+                    saldo = saldo + excluded.saldo,
+                    lancamentos_desde_checkpoint = lancamentos_desde_checkpoint + 1,
+                    ultimo_lancamento = MAX(COALESCE(ultimo_lancamento, ''), excluded.ultimo_lancamento);
+                
+                -- A cada N lançamentos, se este for o último em ordem de data, o saldo
+                -- atual é o saldo acumulado até ele
+                INSERT INTO checkpoints_saldo (cliente_id, data_lancamento, lancamento_id, saldo)
+                SELECT cliente_id, NEW.data_lancamento, NEW.id, saldo
+                FROM contas_clientes
+                WHERE cliente_id = NEW.cliente_id
+                  AND lancamentos_desde_checkpoint >= {self.INTERVALO_CHECKPOINT_SALDO}
+                  AND ultimo_lancamento = NEW.data_lancamento;
+                UPDATE contas_clientes SET lancamentos_desde_checkpoint = 0
+                WHERE cliente_id = NEW.cliente_id
+                  AND EXISTS (SELECT 1 FROM checkpoints_saldo
+                              WHERE cliente_id = NEW.cliente_id AND data_lancamento = NEW.data_lancamento
+                                AND lancamento_id = NEW.id);
+            END
+            ''')
+            self._confirmar()
+        except Exception as e:
+            print(f"ERRO ao criar tabelas de pagamentos e lançamentos: {e}")
+            raise
+        finally:
+            cursor.close()
+        if livro_novo:
+            self.reconstruir_contas_clientes()
+    
+    @escrita
+    def reconstruir_contas_clientes(self):
+        """
+        Recalcula contas_clientes e checkpoints_saldo a partir do livro de lançamentos
+        
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        intervalo = self.INTERVALO_CHECKPOINT_SALDO
+        try:
+            with self.transacao():
+                cursor = self.conn.cursor()
+                cursor.execute("DELETE FROM contas_clientes")
+                cursor.execute("DELETE FROM checkpoints_saldo")
+                cursor.execute('''
+                INSERT INTO checkpoints_saldo (cliente_id, data_lancamento, lancamento_id, saldo)
+                SELECT cliente_id, data_lancamento, id, saldo
+                FROM (
+                    SELECT cliente_id, data_lancamento, id,
+                           SUM(valor) OVER (PARTITION BY cliente_id ORDER BY data_lancamento, id) AS saldo,
+                           ROW_NUMBER() OVER (PARTITION BY cliente_id ORDER BY data_lancamento, id) AS posicao
+                    FROM lancamentos
+                )
+                WHERE posicao % ? = 0
+                ''', (intervalo,))
+                cursor.execute('''
+                INSERT INTO contas_clientes (cliente_id, saldo, lancamentos_desde_checkpoint, ultimo_lancamento)
+                SELECT cliente_id, SUM(valor), COUNT(*) % ?, MAX(data_lancamento)
+                FROM lancamentos
+                GROUP BY cliente_id
+                ''', (intervalo,))
+                quantidade = cursor.rowcount
+                self._publicar(BancoRecarregado())
+            return True, f"Contas de {quantidade} clientes reconstruídas com sucesso!"
+        except Exception as e:
+            print(f"ERRO ao reconstruir contas dos clientes: {e}")
+            return False, f"Erro ao reconstruir contas: {str(e)}"
+    
+    @leitura
+    def verificar_contas_clientes(self):
+        """
+        Confere o livro de lançamentos com as vendas e pagamentos atuais, e o saldo
+        de contas_clientes com a soma do livro
+        
+        Returns:
+            Lista de tuplas (cliente_id, saldo_conta, saldo_livro, vendas_menos_pagamentos)
+            com os clientes divergentes. Lista vazia significa que os saldos estão corretos.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+            WITH livro AS (
+                SELECT cliente_id, SUM(valor) AS saldo FROM lancamentos GROUP BY cliente_id
+            ),
+            movimento AS (
+                SELECT cliente_id, SUM(valor) AS saldo FROM (
+                    SELECT cliente_id, valor_total AS valor FROM vendas WHERE cliente_id IS NOT NULL
+                    UNION ALL
+                    SELECT cliente_id, -valor FROM pagamentos
+                )
+                GROUP BY cliente_id
+            ),
+            clientes_envolvidos AS (
+                SELECT cliente_id FROM livro
+                UNION SELECT cliente_id FROM movimento
+                UNION SELECT cliente_id FROM contas_clientes
+            )
+            SELECT e.cliente_id, COALESCE(c.saldo, 0), COALESCE(l.saldo, 0), COALESCE(m.saldo, 0)
+            FROM clientes_envolvidos e
+            LEFT JOIN contas_clientes c ON c.cliente_id = e.cliente_id
+            LEFT JOIN livro l ON l.cliente_id = e.cliente_id
+            LEFT JOIN movimento m ON m.cliente_id = e.cliente_id
+            WHERE COALESCE(c.saldo, 0) != COALESCE(l.saldo, 0)
+               OR COALESCE(l.saldo, 0) != COALESCE(m.saldo, 0)
+            ORDER BY e.cliente_id
+            ''')
+            divergencias = cursor.fetchall()
+            
+            # Cada checkpoint deve ser o saldo acumulado do livro até ele
+            cursor.execute('''
+            SELECT k.cliente_id
+            FROM checkpoints_saldo k
+            WHERE k.saldo != (SELECT SUM(l.valor) FROM lancamentos l
+                              WHERE l.cliente_id = k.cliente_id
+                                AND (l.data_lancamento, l.id) <= (k.data_lancamento, k.lancamento_id))
+            ''')
+            com_checkpoint_errado = {linha[0] for linha in cursor.fetchall()}
+            ja_listados = {linha[0] for linha in divergencias}
+            divergencias.extend((cliente_id, None, None, None)
+                                for cliente_id in sorted(com_checkpoint_errado - ja_listados))
+            if divergencias:
+                print(f"ALERTA: {len(divergencias)} clientes com saldo divergente no livro de lançamentos")
+            return divergencias
+        finally:
+            cursor.close()
+    
+    @leitura
+    def obter_saldo_cliente(self, cliente_id, data=None):
+        """
+        Saldo devedor de um cliente: vendas menos pagamentos
+        
+        Com data, o saldo ao final daquele dia (ou daquele instante, se tiver
+        horário): parte do último checkpoint anterior e soma só os lançamentos
+        entre ele e a data, duas buscas em índice.
+        
+        Args:
+            cliente_id: ID do cliente
+            data: Data do saldo (opcional; sem ela, o saldo atual)
+            
+        Returns:
+            Dinheiro: Saldo (negativo se o cliente tiver crédito)
+        """
+        cursor = self.conn.cursor()
+        try:
+            if data is None:
+                cursor.execute('SELECT saldo AS "saldo [dinheiro]" FROM contas_clientes WHERE cliente_id = ?',
+                               (cliente_id,))
+                linha = cursor.fetchone()
+                return linha[0] if linha else Dinheiro(0)
+            
+            fim = limites_periodo(None, data)[1]
+            cursor.execute('''
+            SELECT data_lancamento, lancamento_id, saldo
+            FROM checkpoints_saldo
+            WHERE cliente_id = ? AND data_lancamento < ?
+            ORDER BY data_lancamento DESC, lancamento_id DESC
+            LIMIT 1
+            ''', (cliente_id, fim))
+            data_checkpoint, id_checkpoint, saldo = cursor.fetchone() or ('', 0, 0)
+            cursor.execute('''
+            SELECT COALESCE(SUM(valor), 0)
+            FROM lancamentos
+            WHERE cliente_id = ? AND (data_lancamento, id) > (?, ?) AND data_lancamento < ?
+            ''', (cliente_id, data_checkpoint, id_checkpoint, fim))
+            return Dinheiro(saldo + cursor.fetchone()[0])
+        finally:
+            cursor.close()
+    
+    @escrita
+    def registrar_pagamento(self, cliente_id, valor, data_pagamento=None, forma=None, observacao=None):
+        """
+        Registra um pagamento de um cliente, abatendo do saldo devedor
+        
+        Args:
+            cliente_id: ID do cliente
+            valor: Valor pago em reais (maior que zero)
+            data_pagamento: Data do pagamento em UTC, como CURRENT_TIMESTAMP; datetime
+                            com fuso é convertido (opcional; padrão: agora)
+            forma: Forma de pagamento ('dinheiro', 'pix', ...) (opcional)
+            observacao: Observação (opcional)
+            
+        Returns:
+            int: ID do pagamento
+            
+        Raises:
+            ValueError: Se o valor não for maior que zero
+        """
+        valor = Dinheiro.de_reais(valor)
+        if valor.centavos <= 0:
+            raise ValueError("O valor do pagamento deve ser maior que zero")
+        data_pagamento = padronizar_data(data_pagamento) if data_pagamento else None
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+            INSERT INTO pagamentos (cliente_id, valor, data_pagamento, forma, observacao)
+            VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?)
+            ''', (cliente_id, valor, data_pagamento, forma, observacao))
+            pagamento_id = cursor.lastrowid
+            self._confirmar()
+            self._publicar(PagamentoRegistrado(cliente_id, pagamento_id))
+            return pagamento_id
+        except Exception:
+            self._desfazer()
+            raise
+        finally:
+            cursor.close()
+    
+    @escrita
+    def quitar_conta(self, cliente_id, forma=None, observacao=None):
+        """
+        Quita a conta do cliente registrando um pagamento do saldo devedor atual
+        
+        As vendas continuam registradas (não vão para o histórico de exclusões).
+        
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        saldo = self.obter_saldo_cliente(cliente_id)
+        if saldo.centavos <= 0:
+            return False, "O cliente não possui saldo devedor"
+        try:
+            self.registrar_pagamento(cliente_id, saldo, forma=forma,
+                                     observacao=observacao or "Quitação da conta")
+            return True, f"Conta quitada: pagamento de R$ {saldo} registrado."
+        except Exception as e:
+            print(f"ERRO ao quitar conta do cliente {cliente_id}: {e}")
+            return False, f"Erro ao quitar conta: {str(e)}"
+    
+    @escrita
+    def excluir_pagamento(self, pagamento_id):
+        """
+        Exclui um pagamento lançado por engano (o livro recebe um estorno)
+        
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT cliente_id FROM pagamentos WHERE id = ?", (pagamento_id,))
+            linha = cursor.fetchone()
+            if not linha:
+                return False, "Pagamento não encontrado"
+            cursor.execute("DELETE FROM pagamentos WHERE id = ?", (pagamento_id,))
+            self._confirmar()
+            self._publicar(PagamentoExcluido(linha[0], pagamento_id))
+            return True, "Pagamento excluído com sucesso."
+        except Exception as e:
+            self._desfazer()
+            print(f"ERRO ao excluir pagamento {pagamento_id}: {e}")
+            return False, f"Erro ao excluir pagamento: {str(e)}"
+        finally:
+            cursor.close()
+    
+    @leitura
+    def listar_pagamentos_cliente(self, cliente_id):
+        """
+        Pagamentos de um cliente, do mais recente ao mais antigo
+        
+        Returns:
+            Lista de tuplas (id, valor, data_pagamento, forma, observacao)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+            SELECT id, valor AS "valor [dinheiro]", data_pagamento, forma, observacao
+            FROM pagamentos
+            WHERE cliente_id = ?
+            ORDER BY data_pagamento DESC, id DESC
+            ''', (cliente_id,))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    def criar_indices(self):
+        """Cria os índices secundários definidos em INDICES que ainda não existem"""
+        try:
+            cursor = self.conn.cursor()
+            for nome, definicao in self.INDICES.items():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {nome} ON {definicao}")
+            self._confirmar()
+            cursor.close()
+        except Exception as e:
+            print(f"ERRO ao criar índices: {e}")
+            raise
+
+    def verificar_indice_busca(self):
+        """
+        Cria o índice de busca textual (FTS5) de clientes e produtos e seus triggers
+
+        busca_clientes indexa nome, telefone e nota de cada cliente (rowid = id do
+        cliente); o telefone entra também só com os dígitos. busca_produtos indexa
+        os produtos distintos de produtos_busca, que conta as vendas de cada produto.
+        As duas tabelas FTS não guardam cópia do texto (content='') e são mantidas
+        pelos triggers a cada alteração em clientes e vendas.
+
+        Se o SQLite não tiver o módulo FTS5, nada é criado e as buscas usam LIKE.
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS busca_clientes USING fts5(
+                nome, telefone, nota,
+                content='', tokenize='{self.TOKENIZADOR_BUSCA}', prefix='1 2 3'
+            )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"ALERTA: Busca textual indisponível, usando LIKE ({e})")
+            cursor.close()
+            return
+
+        try:
+            cursor.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS busca_produtos USING fts5(
+                produto,
+                content='', tokenize='{self.TOKENIZADOR_BUSCA}', prefix='1 2 3'
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS produtos_busca (
+                id INTEGER PRIMARY KEY,
+                produto TEXT NOT NULL UNIQUE,
+                quantidade_vendas INTEGER NOT NULL DEFAULT 0
+            )
+            ''')
+
+            # Texto indexado de um cliente; a remoção de uma tabela FTS sem conteúdo
+            # exige os mesmos valores da inserção, por isso a expressão é única
+            def valores_cliente(linha):
+                digitos = f"COALESCE({linha}.telefone, '')"
+                for caractere in ('(', ')', ' ', '-', '+', '.'):
+                    digitos = f"replace({digitos}, '{caractere}', '')"
+                return (f"{linha}.id, COALESCE({linha}.nome, ''), "
+                        f"COALESCE({linha}.telefone, '') || ' ' || {digitos}, COALESCE({linha}.nota, '')")
+
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_clientes_insert
+            AFTER INSERT ON clientes
+            BEGIN
+                INSERT INTO busca_clientes (rowid, nome, telefone, nota)
+                VALUES ({valores_cliente('NEW')});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_clientes_delete
+            AFTER DELETE ON clientes
+            BEGIN
+                INSERT INTO busca_clientes (busca_clientes, rowid, nome, telefone, nota)
+                VALUES ('delete', {valores_cliente('OLD')});
+            END
+            ''')
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_clientes_update
+            AFTER UPDATE OF nome, telefone, nota ON clientes
+            BEGIN
+                INSERT INTO busca_clientes (busca_clientes, rowid, nome, telefone, nota)
+                VALUES ('delete', {valores_cliente('OLD')});
+                INSERT INTO busca_clientes (rowid, nome, telefone, nota)
+                VALUES ({valores_cliente('NEW')});
+            END
+            ''')
+
+            # Produtos: contagem de vendas por produto; o produto sai da busca
+            # quando a última venda dele é excluída
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_vendas_insert
+            AFTER INSERT ON vendas
+            WHEN NEW.produto IS NOT NULL
+            BEGIN
+                INSERT INTO produtos_busca (produto, quantidade_vendas) VALUES (NEW.produto, 1)
+                ON CONFLICT(produto) DO UPDATE SET quantidade_vendas = quantidade_vendas + 1;
+            END
+            ''')
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_vendas_delete
+            AFTER DELETE ON vendas
+            WHEN OLD.produto IS NOT NULL
+            BEGIN
+                UPDATE produtos_busca SET quantidade_vendas = quantidade_vendas - 1
+                WHERE produto = OLD.produto;
+                DELETE FROM produtos_busca WHERE produto = OLD.produto AND quantidade_vendas <= 0;
+            END
+            ''')
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_vendas_update
+            AFTER UPDATE OF produto ON vendas
+            WHEN OLD.produto IS NOT NEW.produto
+            BEGIN
+                UPDATE produtos_busca SET quantidade_vendas = quantidade_vendas - 1
+                WHERE produto = OLD.produto;
+                DELETE FROM produtos_busca WHERE produto = OLD.produto AND quantidade_vendas <= 0;
+                INSERT INTO produtos_busca (produto, quantidade_vendas)
+                SELECT NEW.produto, 1 WHERE NEW.produto IS NOT NULL
+                ON CONFLICT(produto) DO UPDATE SET quantidade_vendas = quantidade_vendas + 1;
+            END
+            ''')
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_produtos_insert
+            AFTER INSERT ON produtos_busca
+            BEGIN
+                INSERT INTO busca_produtos (rowid, produto) VALUES (NEW.id, NEW.produto);
+            END
+            ''')
+            cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_busca_produtos_delete
+            AFTER DELETE ON produtos_busca
+            BEGIN
+                INSERT INTO busca_produtos (busca_produtos, rowid, produto)
+                VALUES ('delete', OLD.id, OLD.produto);
+            END
+            ''')
+
+            # Preencher com os dados já existentes
+            cursor.execute("INSERT INTO busca_clientes (busca_clientes) VALUES ('delete-all')")
+            cursor.execute(f'''
+            INSERT INTO busca_clientes (rowid, nome, telefone, nota)
+            SELECT {valores_cliente('c')} FROM clientes c
+            ''')
+            cursor.execute("DELETE FROM produtos_busca")
+            cursor.execute('''
+            INSERT INTO produtos_busca (produto, quantidade_vendas)
+            SELECT produto, COUNT(*) FROM vendas WHERE produto IS NOT NULL GROUP BY produto
+            ''')
+            self._confirmar()
+            self.cache_estrutura.pop('busca_clientes', None)
+        except Exception as e:
+            print(f"ERRO ao criar índice de busca: {e}")
+            raise
+        finally:
+            cursor.close()
+
+    def verificar_colunas_normalizadas(self):
+        """
+        Cria e preenche as colunas clientes.nome_normalizado e clientes.telefone_e164
+        
+        Os valores vêm de normalizacao.py e são gravados por adicionar_cliente e
+        atualizar_cliente; aqui são calculados para os clientes já existentes.
+        Os índices permitem localizar um cliente (ou um possível duplicado) pelo
+        nome ou telefone sem percorrer a tabela.
+        """
+        cursor = self.conn.cursor()
+        try:
+            colunas = [col[1] for col in self.verificar_estrutura_tabela('clientes')]
+            for coluna in ('nome_normalizado', 'telefone_e164'):
+                if coluna not in colunas:
+                    cursor.execute(f"ALTER TABLE clientes ADD COLUMN {coluna} TEXT")
+                    print(f"INFO: Coluna {coluna} adicionada à tabela clientes")
+            self.cache_estrutura.pop('clientes', None)
+            
+            cursor.execute("SELECT id, nome, telefone FROM clientes")
+            valores = [
+                (normalizar_nome(nome), telefone_e164(telefone), cliente_id)
+                for cliente_id, nome, telefone in cursor.fetchall()
+            ]
+            cursor.executemany(
+                "UPDATE clientes SET nome_normalizado = ?, telefone_e164 = ? WHERE id = ?", valores
+            )
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_clientes_nome_normalizado ON clientes (nome_normalizado)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_clientes_telefone_e164 ON clientes (telefone_e164) "
+                           "WHERE telefone_e164 IS NOT NULL")
+            self._confirmar()
+        except Exception as e:
+            print(f"ERRO ao criar colunas normalizadas de clientes: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    # Colunas de data: (tabela, coluna). Todas gravadas como 'AAAA-MM-DD HH:MM:SS'
+    COLUNAS_DATA = (
+        ('vendas', 'data_venda'),
+        ('vendas_excluidas', 'data_venda'),
+        ('vendas_excluidas', 'data_exclusao'),
+        ('notificacoes_pagamento', 'data_notificacao'),
+        ('clientes', 'data_cadastro'),
+    )
+    # Colunas de data validadas por triggers (verificar_triggers_datas)
+    COLUNAS_DATA_VALIDADAS = COLUNAS_DATA + (
+        ('pagamentos', 'data_pagamento'),
+        ('lancamentos', 'data_lancamento'),
+    )
+    
+    def padronizar_datas(self):
+        """
+        Garante que as colunas de COLUNAS_DATA fiquem no formato 'AAAA-MM-DD HH:MM:SS'
+        
+        Nesse formato a ordem do texto é a ordem cronológica, então um filtro
+        "data >= inicio AND data < fim" (ver _filtro_periodo) é uma busca por
+        intervalo no índice da coluna, sem converter cada linha. Aqui são
+        convertidos os valores já gravados em outro formato aceito pelo SQLite
+        (ex.: '2024-05-31T14:30' ou com frações de segundo); os novos vêm de
+        CURRENT_TIMESTAMP ou passam por normalizacao.padronizar_data, e os
+        triggers de verificar_triggers_datas recusam qualquer outro formato.
+        """
+        cursor = self.conn.cursor()
+        try:
+            for tabela, coluna in self.COLUNAS_DATA:
+                # Valores que o SQLite não reconhece como data (datetime() nulo) ficam como estão
+                cursor.execute(f"UPDATE {tabela} SET {coluna} = datetime({coluna}) "
+                               f"WHERE {coluna} <> datetime({coluna})")
+                if cursor.rowcount > 0:
+                    print(f"INFO: {cursor.rowcount} datas padronizadas em {tabela}.{coluna}")
+            self._confirmar()
+        except Exception as e:
+            print(f"ERRO ao padronizar colunas de data: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    def verificar_triggers_datas(self):
+        """
+        Cria triggers que recusam datas fora do formato 'AAAA-MM-DD HH:MM:SS'
+        nas colunas de COLUNAS_DATA_VALIDADAS
+        
+        Um valor em outro formato (ex.: '2024-05-31T14:30' ou '31/05/2024') não
+        seria encontrado pelos filtros de _filtro_periodo, que comparam o texto.
+        Os triggers só recusam a escrita (BEFORE ... RAISE), sem alterar a linha,
+        para não mudar a ordem em que os triggers de saldos e resumos a veem.
+        Datas nulas são aceitas.
+        """
+        cursor = self.conn.cursor()
+        try:
+            for tabela, coluna in self.COLUNAS_DATA_VALIDADAS:
+                # Valores gravados antes da validação (mesma conversão de padronizar_datas)
+                cursor.execute(f"UPDATE {tabela} SET {coluna} = datetime({coluna}) "
+                               f"WHERE {coluna} <> datetime({coluna})")
+                for sufixo, evento in (('insert', 'INSERT'), ('update', f'UPDATE OF {coluna}')):
+                    cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_formato_{tabela}_{coluna}_{sufixo}
+                    BEFORE {evento} ON {tabela}
+                    WHEN NEW.{coluna} IS NOT datetime(NEW.{coluna})
+                    BEGIN
+                        SELECT RAISE(ABORT, '{tabela}.{coluna} fora do formato AAAA-MM-DD HH:MM:SS');
+                    END
+                    ''')
+            self._confirmar()
+        except Exception as e:
+            print(f"ERRO ao criar a validação das colunas de data: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    @leitura
+    def buscar_cliente_duplicado(self, nome, telefone, ignorar_id=None):
+        """
+        Procura um cliente já cadastrado com o mesmo nome ou telefone
+        
+        Nomes são comparados sem acentos/maiúsculas e telefones no formato E.164,
+        então "(11) 91234-5678" e "11912345678" são o mesmo número.
+        
+        Args:
+            nome: Nome do cliente
+            telefone: Telefone do cliente
+            ignorar_id: ID a desconsiderar (o próprio cliente, ao editar)
+            
+        Returns:
+            tuple (id, nome, telefone) do cliente encontrado ou None
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+            SELECT id, nome, telefone FROM clientes
+            WHERE (nome_normalizado = ? OR telefone_e164 = ?) AND id IS NOT ?
+            ORDER BY telefone_e164 IS ? DESC, id
+            LIMIT 1
+            ''', (normalizar_nome(nome), telefone_e164(telefone), ignorar_id, telefone_e164(telefone)))
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+    
+    @leitura
+    def listar_clientes_duplicados(self):
+        """
+        Lista grupos de clientes com o mesmo nome normalizado ou o mesmo telefone
+        
+        Returns:
+            Lista de tuplas (criterio, valor, ids separados por vírgula)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute('''
+            SELECT 'telefone', telefone_e164, group_concat(id)
+            FROM clientes WHERE telefone_e164 IS NOT NULL
+            GROUP BY telefone_e164 HAVING COUNT(*) > 1
+            UNION ALL
+            SELECT 'nome', nome_normalizado, group_concat(id)
+            FROM clientes
+            GROUP BY nome_normalizado HAVING COUNT(*) > 1
+            ''')
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+    
+    def busca_textual_disponivel(self):
+        """Indica se o índice FTS5 de busca existe neste banco"""
+        return bool(self.verificar_estrutura_tabela('busca_clientes'))
+
+    @staticmethod
+    def _consulta_prefixos(texto):
+        """
+        Converte o texto digitado em uma consulta FTS5 de prefixos
+
+        "ana sil" vira '"ana"* "sil"*': todas as palavras, cada uma como início de
+        palavra. Aspas evitam que o texto seja lido como sintaxe do FTS5.
+        """
+        palavras = re.findall(r'\w+', texto or '')
+        return ' '.join(f'"{palavra}"*' for palavra in palavras)
+
+    @leitura
+    def buscar_clientes(self, texto, limite=20):
+        """
+        Busca clientes por início de palavra do nome, telefone ou nota (para type-ahead)
+
+        Não diferencia maiúsculas nem acentos: "joao" encontra "João". No
+        telefone, "9123" e "11912" encontram "(11) 91234-5678".
+
+        Args:
+            texto: Texto digitado
+            limite: Quantidade máxima de resultados
+
+        Returns:
+            Lista de tuplas (id, nome, telefone), as mais relevantes primeiro
+        """
+        consulta = self._consulta_prefixos(texto)
+        if not consulta:
+            return []
+        cursor = self.conn.cursor()
+        try:
+            if self.busca_textual_disponivel():
+                # Peso maior para o nome que para telefone e nota
+                cursor.execute('''
+                SELECT c.id, c.nome, c.telefone
+                FROM busca_clientes b
+                JOIN clientes c ON c.id = b.rowid
+                WHERE busca_clientes MATCH ?
+                ORDER BY bm25(busca_clientes, 10.0, 5.0, 1.0), c.nome
+                LIMIT ?
+                ''', (consulta, limite))
+            else:
+                filtros = []
+                params = []
+                for palavra in re.findall(r'\w+', texto):
+                    filtros.append("(nome LIKE ? OR telefone LIKE ? OR nota LIKE ?)")
+                    params.extend([f"%{palavra}%"] * 3)
+                cursor.execute(f'''
+                SELECT id, nome, telefone FROM clientes
+                WHERE {" AND ".join(filtros)}
+                ORDER BY nome
+                LIMIT ?
+                ''', params + [limite])
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"Erro ao buscar clientes: {str(e)}")
+            return []
+        finally:
+            cursor.close()
+
+    @leitura
+    def buscar_produtos(self, texto, limite=20):
+        """
+        Busca produtos já vendidos por início de palavra (sem diferenciar acentos)
+
+        Args:
+            texto: Texto digitado
+            limite: Quantidade máxima de resultados
+
+        Returns:
+            Lista de tuplas (produto, quantidade de vendas), os mais vendidos primeiro
+        """
+        consulta = self._consulta_prefixos(texto)
+        if not consulta:
+            return []
+        cursor = self.conn.cursor()
+        try:
+            if self.busca_textual_disponivel():
+                cursor.execute('''
+                SELECT p.produto, p.quantidade_vendas
+                FROM busca_produtos b
+                JOIN produtos_busca p ON p.id = b.rowid
+                WHERE busca_produtos MATCH ?
+                ORDER BY p.quantidade_vendas DESC, p.produto
+                LIMIT ?
+                ''', (consulta, limite))
+            else:
+                filtros = []
+                params = []
+                for palavra in re.findall(r'\w+', texto):
+                    filtros.append("produto LIKE ?")
+                    params.append(f"%{palavra}%")
+                cursor.execute(f'''
+                SELECT produto, COUNT(*) AS quantidade_vendas FROM vendas
+                WHERE {" AND ".join(filtros)}
+                GROUP BY produto
+                ORDER BY quantidade_vendas DESC, produto
+                LIMIT ?
+                ''', params + [limite])
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"Erro ao buscar produtos: {str(e)}")
+            return []
+        finally:
+            cursor.close()
+
+    @leitura
+    def analisar_plano_consulta(self, sql, params=()):
+        """
+        Executa EXPLAIN QUERY PLAN para uma consulta
+        
+        Args:
+            sql: Consulta SQL a ser analisada
+            params: Parâmetros da consulta (opcional)
+            
+        Returns:
+            tuple: (lista com o detalhe de cada passo do plano,
+                    lista com os passos que varrem uma tabela inteira sem índice)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            passos = [linha[3] for linha in cursor.fetchall()]
+        finally:
+            cursor.close()
+        
+        # "SCAN tabela" sem "USING ... INDEX" é uma varredura completa da tabela.
+        # Varreduras de subconsultas/CTEs materializadas não contam.
+        varreduras = [
+            passo for passo in passos
+            if passo.startswith('SCAN ')
+            and 'INDEX' not in passo
+            and 'CONSTANT ROW' not in passo
+            and not passo.startswith(('SCAN SUBQUERY', 'SCAN (subquery'))
+        ]
+        return passos, varreduras
+    
+    @leitura
+    def consultar_pagina(self, sql, params, coluna_ordem, coluna_id, apos, limite,
+                          indice_ordem, indice_id, decrescente=True):
+        """
+        Executa uma consulta paginada por chave (keyset) em vez de OFFSET
+        
+        A página seguinte começa logo após a última linha da anterior, comparando
+        a dupla (coluna_ordem, coluna_id) com o token. Com um índice nessas colunas
+        o custo de cada página não depende de quantas páginas já foram lidas.
+        
+        Args:
+            sql: Consulta base terminando em uma cláusula WHERE (sem ORDER BY)
+            params: Parâmetros da consulta base
+            coluna_ordem, coluna_id: Colunas da ordenação (a segunda desempata)
+            apos: Tupla (valor_ordem, id) da última linha da página anterior, ou None
+            limite: Quantidade máxima de linhas na página
+            indice_ordem, indice_id: Posição dessas colunas nas linhas retornadas
+            decrescente: Ordena do maior para o menor (padrão: True)
+            
+        Returns:
+            tuple: (linhas da página, token da próxima página ou None se acabou)
+        
+        As colunas de ordenação vêm do código (nunca da entrada do usuário).
+        """
+        limite = int(limite or self.LIMITE_PAGINA)
+        params = list(params)
+        if apos is not None:
+            operador = '<' if decrescente else '>'
+            sql += f" AND ({coluna_ordem}, {coluna_id}) {operador} (?, ?)"
+            params.extend(apos)
+        direcao = 'DESC' if decrescente else 'ASC'
+        sql += f" ORDER BY {coluna_ordem} {direcao}, {coluna_id} {direcao} LIMIT ?"
+        # Uma linha a mais indica se existe próxima página
+        params.append(limite + 1)
+        
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            linhas = cursor.fetchall()
+        finally:
+            cursor.close()
+        
+        if len(linhas) <= limite:
+            return linhas, None
+        linhas = linhas[:limite]
+        ultima = linhas[-1]
+        return linhas, (ultima[indice_ordem], ultima[indice_id])
+    
+    @leitura
+    def contar_linhas_consulta(self, sql, params=()):
+        """
+        Conta as linhas que uma consulta base de consultar_pagina retornaria
+        
+        Returns:
+            int: Quantidade de linhas (0 em caso de erro)
+        """
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM ({sql})", list(params))
+            return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Erro ao contar linhas da consulta: {e}")
+            return 0
+        finally:
+            cursor.close()
+    
+    @escrita
+    def adicionar_cliente(self, nome, telefone, notas=""):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        INSERT INTO clientes (nome, telefone, nota, nome_normalizado, telefone_e164)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (nome, telefone, notas, normalizar_nome(nome), telefone_e164(telefone)))
+        self._confirmar()
+        self._publicar(ClienteAdicionado(cursor.lastrowid))
+        return cursor.lastrowid
+    
+    @leitura
+    def listar_clientes(self):
+        cursor = self.conn.cursor()
+        cursor.execute('SELECT * FROM clientes ORDER BY nome')
+        return cursor.fetchall()
+    
+    @leitura
+    def listar_clientes_paginado(self, after_nome=None, after_id=None, limite=None):
+        """
+        Lista os clientes em ordem alfabética, uma página por vez
+        
+        Args:
+            after_nome, after_id: Token retornado pela página anterior (opcional)
+            limite: Linhas por página (padrão: LIMITE_PAGINA)
+            
+        Returns:
+            tuple: (clientes da página, token (nome, id) da próxima página ou None)
+        """
+        apos = (after_nome, after_id) if after_id is not None else None
+        return self.consultar_pagina(
+            "SELECT id, nome, telefone, nota, data_cadastro FROM clientes WHERE 1=1", [],
+            'nome', 'id', apos, limite, indice_ordem=1, indice_id=0, decrescente=False
+        )
+    
+    @escrita
+    def adicionar_venda(self, cliente_id, produto, quantidade, valor_unitario):
+        # Valores gravados em centavos inteiros: o total é exato
+        valor_unitario = Dinheiro.de_reais(valor_unitario)
+        valor_total = valor_unitario * int(quantidade)
+        cursor = self.conn.cursor()
+        # A estrutura é garantida pelas migrações: SQL fixo, reaproveitado do cache de instruções
+        cursor.execute('''
+        INSERT INTO vendas (cliente_id, produto, quantidade, valor_unitario, valor_total)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (cliente_id, produto, quantidade, valor_unitario, valor_total))
+        self._confirmar()
+        self._publicar(VendaAdicionada(cliente_id, cursor.lastrowid))
+        return cursor.lastrowid
+    
+    @escrita
+    def adicionar_vendas_lote(self, cliente_id, itens):
+        """
+        Grava várias vendas de um cliente com um único executemany e um único commit
+        
+        Args:
+            cliente_id: ID do cliente
+            itens: Sequência de (produto, quantidade, valor_unitario) ou
+                   (produto, quantidade, valor_unitario, data_venda); data_venda em
+                   UTC, como CURRENT_TIMESTAMP (ver normalizacao.padronizar_data).
+                   Sem data_venda (ou com None) a venda recebe a data atual
+            
+        Returns:
+            list: IDs das vendas criadas, na ordem dos itens
+        """
+        linhas = []
+        for item in itens:
+            produto, quantidade, valor_unitario = item[:3]
+            data_venda = padronizar_data(item[3]) if len(item) > 3 and item[3] else None
+            valor_unitario = Dinheiro.de_reais(valor_unitario)
+            linhas.append((cliente_id, produto, quantidade, valor_unitario,
+                           valor_unitario * int(quantidade), data_venda))
+        if not linhas:
+            return []
+        
+        with self.transacao():
+            cursor = self.conn.cursor()
+            # AUTOINCREMENT: os IDs novos são maiores que qualquer ID já usado, e a
+            # transação impede outras escritas entre o executemany e a consulta
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'vendas'")
+            ultimo_id = cursor.fetchone()[0]
+            cursor.executemany('''
+            INSERT INTO vendas (cliente_id, produto, quantidade, valor_unitario, valor_total, data_venda)
+            VALUES (?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            ''', linhas)
+            cursor.execute("SELECT id FROM vendas WHERE id > ? ORDER BY id", (ultimo_id,))
+            ids = [linha[0] for linha in cursor.fetchall()]
+            self._publicar(VendasAdicionadas(cliente_id, tuple(ids)))
+        return ids
+    
+    @leitura
+    def listar_vendas_cliente(self, cliente_id):
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_total AS "valor_total [dinheiro]", v.data_venda 
             FROM vendas v 
             JOIN clientes c ON v.cliente_id = c.id 
             WHERE v.cliente_id = ? 
@@ -344,6 +2353,32 @@ class Database:
         cursor.close()
         return vendas
     
+    @leitura
+    def listar_vendas_cliente_paginado(self, cliente_id, after_data_venda=None, after_id=None, limite=None):
+        """
+        Lista as vendas de um cliente da mais recente para a mais antiga, uma página por vez
+        
+        Args:
+            cliente_id: ID do cliente
+            after_data_venda, after_id: Token retornado pela página anterior (opcional)
+            limite: Linhas por página (padrão: LIMITE_PAGINA)
+            
+        Returns:
+            tuple: (vendas da página no formato de listar_vendas_cliente,
+                    token (data_venda, id) da próxima página ou None)
+        """
+        sql = """
+            SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_total AS "valor_total [dinheiro]", v.data_venda 
+            FROM vendas v 
+            JOIN clientes c ON v.cliente_id = c.id 
+            WHERE v.cliente_id = ?
+        """
+        apos = (after_data_venda, after_id) if after_id is not None else None
+        return self.consultar_pagina(
+            sql, [cliente_id], 'v.data_venda', 'v.id', apos, limite, indice_ordem=5, indice_id=0
+        )
+    
+    @escrita
     def registrar_exclusao_venda(self, venda_id):
         """
         Registra a exclusão de uma venda na tabela de histórico
@@ -374,7 +2409,7 @@ class Database:
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (venda[0], venda[1], venda[2], venda[3], venda[4], venda[5], venda[6]))
             
-            self.conn.commit()
+            self._confirmar()
             print(f"INFO: Venda ID {venda_id} registrada na tabela de exclusões com sucesso")
             return True
             
@@ -382,51 +2417,40 @@ class Database:
             print(f"ERRO ao registrar exclusão de venda {venda_id}: {e}")
             return False
     
+    @escrita
     def excluir_venda(self, venda_id):
         """Exclui uma venda específica sem registrar a exclusão (deve ser chamado após registrar_exclusao_venda)"""
         cursor = self.conn.cursor()
+        cliente_id = self.obter_id_cliente_por_venda(venda_id)
         
         # Excluir a venda diretamente, sem chamar registrar_exclusao_venda novamente
         # pois isso já deve ter sido feito pelo método que está chamando esta função
         cursor.execute("DELETE FROM vendas WHERE id = ?", (venda_id,))
         
-        self.conn.commit()
+        self._confirmar()
         cursor.close()
+        self._publicar(VendaExcluida(cliente_id, venda_id))
         return True
     
+    @escrita
     def atualizar_venda(self, venda_id, produto, quantidade, valor):
         """Atualiza os dados de uma venda"""
         cursor = self.conn.cursor()
+        valor = Dinheiro.de_reais(valor)
+        valor_total = valor * int(quantidade)
         
-        # Verificar qual é o nome da coluna de preço (usando o cache)
-        colunas = [col[1] for col in self.verificar_estrutura_tabela('vendas')]
-        valor_total = quantidade * valor
-        
-        # Não exibir mensagens repetitivas, apenas usar as colunas corretas
-        if 'preco' in colunas:
-            cursor.execute("""
-                UPDATE vendas 
-                SET produto = ?, quantidade = ?, preco = ?, valor_total = ? 
-                WHERE id = ?
-            """, (produto, quantidade, valor, valor_total, venda_id))
-        elif 'valor_unitario' in colunas:
-            cursor.execute("""
-                UPDATE vendas 
-                SET produto = ?, quantidade = ?, valor_unitario = ?, valor_total = ? 
-                WHERE id = ?
-            """, (produto, quantidade, valor, valor_total, venda_id))
-        else:
-            # Fallback: tentar usar valor apenas, sem exibir mensagem (já exibimos na inicialização)
-            cursor.execute("""
-                UPDATE vendas 
-                SET produto = ?, quantidade = ?, valor = ? 
-                WHERE id = ?
-            """, (produto, quantidade, valor, venda_id))
+        cursor.execute("""
+            UPDATE vendas 
+            SET produto = ?, quantidade = ?, valor_unitario = ?, valor_total = ? 
+            WHERE id = ?
+        """, (produto, quantidade, valor, valor_total, venda_id))
         
-        self.conn.commit()
+        self._confirmar()
         cursor.close()
+        self._publicar(VendaAlterada(self.obter_id_cliente_por_venda(venda_id), venda_id))
         return True
     
+    @escrita
     def atualizar_notas_cliente(self, cliente_id, notas):
         """Atualiza as notas de um cliente"""
         cursor = self.conn.cursor()
@@ -435,17 +2459,20 @@ class Database:
             SET nota = ? 
             WHERE id = ?
         """, (notas, cliente_id))
-        self.conn.commit()
+        self._confirmar()
         cursor.close()
+        self._publicar(ClienteAlterado(cliente_id))
         return True
     
+    @leitura
     def obter_ultima_venda(self, cliente_id):
         """
         Retorna a última venda de um cliente específico
         """
         cursor = self.conn.cursor()
         cursor.execute('''
-        SELECT id, data_venda, produto, quantidade, preco, valor_total 
+        SELECT id, data_venda, produto, quantidade,
+               valor_unitario AS "valor_unitario [dinheiro]", valor_total AS "valor_total [dinheiro]"
         FROM vendas 
         WHERE cliente_id = ? 
         ORDER BY data_venda DESC
@@ -453,62 +2480,105 @@ class Database:
         ''', (cliente_id,))
         return cursor.fetchone()
     
+    @leitura
     def obter_total_vendas_cliente(self, cliente_id):
         """
         Calcula o total de todas as vendas de um cliente
         """
         cursor = self.conn.cursor()
         cursor.execute('''
-        SELECT SUM(valor_total) 
+        SELECT SUM(valor_total) AS "total [dinheiro]"
         FROM vendas 
         WHERE cliente_id = ?
         ''', (cliente_id,))
         resultado = cursor.fetchone()[0]
-        return resultado if resultado else 0.0
+        return resultado if resultado else Dinheiro(0)
     
+    @leitura
     def obter_id_cliente(self, nome_cliente):
         """
         Obtém o ID de um cliente a partir do nome
+        
+        A comparação ignora acentos, maiúsculas e espaços extras; se houver mais
+        de um cliente com o mesmo nome normalizado, o nome exato tem preferência.
         """
         cursor = self.conn.cursor()
-        cursor.execute('SELECT id FROM clientes WHERE nome = ?', (nome_cliente,))
+        cursor.execute(
+            'SELECT id FROM clientes WHERE nome_normalizado = ? ORDER BY nome = ? DESC, id LIMIT 1',
+            (normalizar_nome(nome_cliente), nome_cliente)
+        )
         resultado = cursor.fetchone()
         return resultado[0] if resultado else None
     
-    def fazer_backup(self, caminho_destino):
+    @instrumentado('Database.fazer_backup')
+    def fazer_backup(self, caminho_destino, progresso=None):
         """
         Cria uma cópia de backup do banco de dados atual
+        
+        Usa a API de backup do SQLite em passos de PAGINAS_POR_PASSO_BACKUP páginas,
+        com conexões próprias: a conexão em uso pelo sistema continua aberta e as
+        escritas podem continuar durante a cópia. Pode ser chamado de qualquer thread.
+        
+        Args:
+            caminho_destino: Arquivo de destino do backup
+            progresso: Função chamada com a porcentagem concluída (opcional)
         """
+        caminho_temporario = caminho_destino + '.tmp'
         try:
             # Garantir que o diretório de destino existe
             os.makedirs(os.path.dirname(caminho_destino), exist_ok=True)
             
-            # Fecha a conexão para garantir que todas as operações foram concluídas
-            self.conn.close()
+            def informar_progresso(status, restantes, total):
+                if progresso and total:
+                    progresso(int((total - restantes) * 100 / total))
             
-            # Copia o arquivo para o destino
-            shutil.copy2(self.database_path, caminho_destino)
+            origem = sqlite3.connect(self.database_path)
+            destino = sqlite3.connect(caminho_temporario)
+            try:
+                origem.backup(destino, pages=self.PAGINAS_POR_PASSO_BACKUP,
+                              progress=informar_progresso, sleep=0.005)
+            finally:
+                destino.close()
+                origem.close()
             
-            # Reabre a conexão
-            self.conn = sqlite3.connect(self.database_path)
+            # Só substitui o destino quando a cópia estiver completa
+            os.replace(caminho_temporario, caminho_destino)
+            if progresso:
+                progresso(100)
             
             print(f"Backup criado com sucesso em: {caminho_destino}")
             return True, "Backup criado com sucesso!"
         except Exception as e:
-            # Reabre a conexão em caso de erro
-            self.conn = sqlite3.connect(self.database_path)
+            if os.path.exists(caminho_temporario):
+                os.remove(caminho_temporario)
             print(f"Erro ao criar backup: {str(e)}")
             return False, f"Erro ao criar backup: {str(e)}"
     
+    @instrumentado('Database.restaurar_backup')
     def restaurar_backup(self, caminho_backup):
         """
         Restaura o banco de dados a partir de um arquivo de backup
+        
+        Args:
+            caminho_backup: Arquivo .db de backup, ou o ID/manifesto de um
+                            snapshot do repositório de backups
         """
+        arquivo_snapshot = None
         try:
+            # Snapshot do repositório: reconstruir o arquivo antes de restaurar
+            snapshot_id = self.repositorio_backup.resolver_snapshot(caminho_backup)
+            if snapshot_id:
+                arquivo_snapshot = os.path.join(self.backups_dir, f"restauracao_{snapshot_id}.db")
+                self.repositorio_backup.restaurar_snapshot(snapshot_id, arquivo_snapshot)
+                caminho_backup = arquivo_snapshot
+            
             # Verifica se o arquivo de backup existe
             if not os.path.exists(caminho_backup):
                 return False, "Arquivo de backup não encontrado!"
             
+            # Encerra a thread de escrita e o pool de leitura
+            self._parar_motor_wal()
+            
             # Fecha a conexão atual
             self.conn.close()
             
@@ -518,21 +2588,38 @@ class Database:
                 backup_seguranca = os.path.join(os.path.dirname(self.database_path), f"sistema_fiado.db.bak_{timestamp}")
                 shutil.copy2(self.database_path, backup_seguranca)
             
+            # Arquivos WAL/SHM antigos não podem ser aplicados sobre o backup restaurado
+            for sufixo in ('-wal', '-shm'):
+                if os.path.exists(self.database_path + sufixo):
+                    os.remove(self.database_path + sufixo)
+            
             # Substitui o arquivo atual pelo backup
             shutil.copy2(caminho_backup, self.database_path)
             
             # Reconecta ao banco de dados
-            self.conn = sqlite3.connect(self.database_path)
+            self.conn = self._abrir_conexao()
+            
+            # O backup pode ser de uma versão anterior do esquema
+            self.aplicar_migracoes()
+            self.cache_resultados.incrementar_versao()
+            
+            self._reiniciar_conexoes_auxiliares()
+            self.eventos.publicar(BancoRecarregado())
             
             return True, "Banco de dados restaurado com sucesso!"
         except Exception as e:
             # Tenta reconectar ao banco de dados original em caso de erro
             try:
-                self.conn = sqlite3.connect(self.database_path)
+                self.conn = self._abrir_conexao()
+                self._reiniciar_conexoes_auxiliares()
             except:
                 pass
             return False, f"Erro ao restaurar backup: {str(e)}"
+        finally:
+            if arquivo_snapshot and os.path.exists(arquivo_snapshot):
+                os.remove(arquivo_snapshot)
     
+    @leitura
     def obter_id_cliente_por_venda(self, venda_id):
         """
         Obtém o ID do cliente de uma venda específica
@@ -542,6 +2629,7 @@ class Database:
         resultado = cursor.fetchone()
         return resultado[0] if resultado else None
     
+    @escrita
     def atualizar_cliente(self, cliente_id, nome, telefone):
         """
         Atualiza o nome e telefone de um cliente
@@ -549,31 +2637,72 @@ class Database:
         cursor = self.conn.cursor()
         cursor.execute('''
         UPDATE clientes 
-        SET nome = ?, telefone = ?
+        SET nome = ?, telefone = ?, nome_normalizado = ?, telefone_e164 = ?
         WHERE id = ?
-        ''', (nome, telefone, cliente_id))
-        self.conn.commit()
+        ''', (nome, telefone, normalizar_nome(nome), telefone_e164(telefone), cliente_id))
+        self._confirmar()
+        self._publicar(ClienteAlterado(cliente_id))
     
-    def fazer_backup_automatico(self):
+    @instrumentado('Database.fazer_backup_automatico')
+    def fazer_backup_automatico(self, progresso=None):
         """
-        Cria um backup automático do banco de dados na pasta 'database/backups'
+        Grava um snapshot incremental do banco de dados no repositório de backups
+        
+        Uma cópia consistente é feita com fazer_backup e em seguida dividida em
+        blocos; apenas os blocos alterados desde o último snapshot são gravados.
         """
+        caminho_temporario = None
         try:
-            # Garantir que a pasta de backups existe
-            if not os.path.exists(self.backups_dir):
-                os.makedirs(self.backups_dir)
-                print(f"Pasta backups criada em: {self.backups_dir}")
+            caminho_temporario = self.caminho_backup_automatico() + '.snapshot'
+            
+            # Cópia online consistente (90% do progresso)
+            sucesso, mensagem = self.fazer_backup(
+                caminho_temporario,
+                (lambda p: progresso(p * 9 // 10)) if progresso else None
+            )
+            if not sucesso:
+                return False, mensagem
             
-            # Gera nome do arquivo com timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            caminho_destino = os.path.join(self.backups_dir, f"backup_{timestamp}.db")
+            manifesto = self.repositorio_backup.criar_snapshot(caminho_temporario)
+            if progresso:
+                progresso(100)
             
-            # Realiza o backup
-            return self.fazer_backup(caminho_destino)
+            kb_novos = manifesto['bytes_novos'] / 1024
+            return True, f"Snapshot {manifesto['id']} criado ({manifesto['blocos_novos']} blocos novos, {kb_novos:.1f} KB)"
         except Exception as e:
             print(f"Erro ao criar backup automático: {str(e)}")
             return False, f"Erro ao criar backup automático: {str(e)}"
+        finally:
+            if caminho_temporario and os.path.exists(caminho_temporario):
+                os.remove(caminho_temporario)
+    
+    def consulta_relatorio_vendas(self, data_inicio=None, data_fim=None, cliente_id=None):
+        """
+        Consulta base do relatório de vendas, terminando em WHERE (sem ORDER BY)
+        
+        Usada por gerar_relatorio_vendas, pela versão paginada e pelo modelo da
+        tabela (modelos_tabela), para que os filtros sejam sempre os mesmos.
+        
+        Returns:
+            tuple: (sql, parâmetros)
+        """
+        sql = '''
+        SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_total AS "valor_total [dinheiro]", v.data_venda
+        FROM vendas v
+        JOIN clientes c ON v.cliente_id = c.id
+        WHERE 1=1
+        '''
+        # Filtro de período (data_fim sem horário inclui o dia inteiro)
+        filtros, params = self._filtro_periodo('v.data_venda', data_inicio, data_fim)
+        for filtro in filtros:
+            sql += f" AND {filtro}"
+        if cliente_id:
+            sql += " AND v.cliente_id = ?"
+            params.append(cliente_id)
+        return sql, params
     
+    @em_cache
+    @leitura
     def gerar_relatorio_vendas(self, data_inicio=None, data_fim=None, cliente_id=None):
         """
         Gera um relatório de vendas por período e/ou cliente
@@ -588,31 +2717,7 @@ class Database:
         """
         cursor = self.conn.cursor()
         
-        # Base da consulta SQL
-        sql = '''
-        SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_total, v.data_venda
-        FROM vendas v
-        JOIN clientes c ON v.cliente_id = c.id
-        WHERE 1=1
-        '''
-        
-        # Parâmetros para a consulta
-        params = []
-        
-        # Adiciona filtro de data inicial
-        if data_inicio:
-            sql += " AND v.data_venda >= ?"
-            params.append(data_inicio)
-        
-        # Adiciona filtro de data final
-        if data_fim:
-            sql += " AND v.data_venda <= ?"
-            params.append(data_fim)
-        
-        # Adiciona filtro de cliente
-        if cliente_id:
-            sql += " AND v.cliente_id = ?"
-            params.append(cliente_id)
+        sql, params = self.consulta_relatorio_vendas(data_inicio, data_fim, cliente_id)
         
         # Ordena por data
         sql += " ORDER BY v.data_venda DESC"
@@ -621,26 +2726,57 @@ class Database:
         cursor.execute(sql, params)
         return cursor.fetchall()
     
-    def gerar_relatorio_clientes_devedores(self):
+    @leitura
+    def gerar_relatorio_vendas_paginado(self, data_inicio=None, data_fim=None, cliente_id=None,
+                                        after_data_venda=None, after_id=None, limite=None):
         """
-        Gera um relatório de clientes com valores pendentes
+        Versão paginada de gerar_relatorio_vendas
         
+        Args:
+            data_inicio, data_fim, cliente_id: Mesmos filtros de gerar_relatorio_vendas
+            after_data_venda, after_id: Token retornado pela página anterior (opcional)
+            limite: Linhas por página (padrão: LIMITE_PAGINA)
+            
         Returns:
-            Lista de clientes com o total devido por cada um
+            tuple: (vendas da página, token (data_venda, id) da próxima página ou None)
         """
-        cursor = self.conn.cursor()
+        sql, params = self.consulta_relatorio_vendas(data_inicio, data_fim, cliente_id)
+        apos = (after_data_venda, after_id) if after_id is not None else None
+        return self.consultar_pagina(
+            sql, params, 'v.data_venda', 'v.id', apos, limite, indice_ordem=5, indice_id=0
+        )
+    
+    def consulta_clientes_devedores(self):
+        """
+        Consulta base dos clientes com saldo devedor, terminando em WHERE (sem ORDER BY)
         
+        Returns:
+            tuple: (sql, parâmetros)
+        """
         sql = '''
-        SELECT c.id, c.nome, c.telefone, SUM(v.valor_total) as total_devido
-        FROM clientes c
-        JOIN vendas v ON c.id = v.cliente_id
-        GROUP BY c.id
-        ORDER BY total_devido DESC
+        SELECT c.id, c.nome, c.telefone, s.saldo AS "total_devido [dinheiro]"
+        FROM contas_clientes s
+        JOIN clientes c ON c.id = s.cliente_id
+        WHERE s.saldo > 0
         '''
+        return sql, []
+    
+    @em_cache
+    @leitura
+    def gerar_relatorio_clientes_devedores(self):
+        """
+        Gera um relatório de clientes com valores pendentes
+        
+        Returns:
+            Lista de clientes com o saldo devedor (vendas - pagamentos) de cada um
+        """
+        cursor = self.conn.cursor()
         
-        cursor.execute(sql)
+        sql, params = self.consulta_clientes_devedores()
+        cursor.execute(sql + " ORDER BY s.saldo DESC", params)
         return cursor.fetchall()
     
+    @leitura
     def cliente_tem_vendas(self, cliente_id):
         """
         Verifica se o cliente possui vendas registradas
@@ -653,6 +2789,7 @@ class Database:
         resultado = cursor.fetchone()[0]
         return resultado > 0
     
+    @escrita
     def excluir_cliente(self, cliente_id):
         """
         Exclui um cliente do banco de dados apenas se não tiver vendas vinculadas
@@ -676,49 +2813,121 @@ class Database:
             if tem_vendas:
                 return False, "Não é possível excluir o cliente porque ele possui vendas registradas. Remova as vendas primeiro."
             
-            # Se não tiver vendas, pode excluir o cliente
+            # Se não tiver vendas, pode excluir o cliente (os pagamentos ficam como estornos no livro)
+            cursor.execute('DELETE FROM pagamentos WHERE cliente_id = ?', (cliente_id,))
             cursor.execute('DELETE FROM clientes WHERE id = ?', (cliente_id,))
-            self.conn.commit()
+            self._confirmar()
+            self._publicar(ClienteExcluido(cliente_id))
             
             return True, "Cliente excluído com sucesso."
                 
         except Exception as e:
-            self.conn.rollback()
+            self._desfazer()
             return False, f"Erro ao excluir cliente: {str(e)}"
     
+    @escrita
     def excluir_vendas_cliente(self, cliente_id):
         """
         Remove todas as vendas associadas a um cliente, mas mantém o cliente cadastrado
-        """
-        cursor = self.conn.cursor()
         
-        # Primeiro obter todas as vendas do cliente
-        cursor.execute('SELECT id FROM vendas WHERE cliente_id = ?', (cliente_id,))
-        vendas = cursor.fetchall()
+        As vendas vão para o histórico de exclusões (ver arquivar_vendas).
+        
+        Returns:
+            tuple: (sucesso, mensagem) de arquivar_vendas
+        """
+        sucesso, mensagem = self.arquivar_vendas(cliente_id=cliente_id)
+        if not sucesso:
+            print(f"ERRO ao excluir vendas do cliente {cliente_id}: {mensagem}")
+        return sucesso, mensagem
+    
+    @escrita
+    def arquivar_vendas(self, cliente_id=None, data_inicio=None, data_fim=None):
+        """
+        Move vendas para o histórico de exclusões (vendas_excluidas) em uma única transação
         
-        # Registrar cada venda no histórico antes de excluir
-        for venda in vendas:
-            venda_id = venda[0]
-            self.registrar_exclusao_venda(venda_id)
+        Usa um INSERT ... SELECT e um DELETE com o mesmo filtro, em vez de uma
+        consulta e um commit por venda. Serve tanto para zerar a conta de um
+        cliente quanto para limpar um período antigo.
         
-        # Excluir as vendas associadas ao cliente
-        cursor.execute('DELETE FROM vendas WHERE cliente_id = ?', (cliente_id,))
+        Args:
+            cliente_id: Apenas as vendas deste cliente (opcional)
+            data_inicio: Primeiro dia do período, 'AAAA-MM-DD' (opcional)
+            data_fim: Último dia do período, inclusive (opcional)
+            
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        filtros, params = self._filtro_periodo('v.data_venda', data_inicio, data_fim)
+        if cliente_id is not None:
+            filtros.append("v.cliente_id = ?")
+            params.append(cliente_id)
+        if not filtros:
+            return False, "Informe um cliente ou um período para arquivar"
+        where = " AND ".join(filtros)
         
-        self.conn.commit()
+        try:
+            with self.transacao():
+                cursor = self.conn.cursor()
+                cursor.execute(f"SELECT DISTINCT v.cliente_id FROM vendas v WHERE {where}", params)
+                clientes = [linha[0] for linha in cursor.fetchall()]
+                
+                # LEFT JOIN: vendas de clientes já removidos também ficam no histórico
+                cursor.execute(f'''
+                INSERT INTO vendas_excluidas
+                (venda_id, cliente_id, cliente_nome, produto, quantidade, valor_total, data_venda)
+                SELECT v.id, v.cliente_id, c.nome, v.produto, v.quantidade, v.valor_total, v.data_venda
+                FROM vendas v
+                LEFT JOIN clientes c ON c.id = v.cliente_id
+                WHERE {where}
+                ''', params)
+                arquivadas = cursor.rowcount
+                cursor.execute(f"DELETE FROM vendas WHERE id IN (SELECT v.id FROM vendas v WHERE {where})", params)
+                
+                for cliente in clientes:
+                    self._publicar(VendasClienteExcluidas(cliente))
+            return True, f"{arquivadas} venda(s) movida(s) para o histórico de exclusões"
+        except Exception as e:
+            print(f"ERRO ao arquivar vendas: {e}")
+            return False, f"Erro ao arquivar vendas: {str(e)}"
     
-    def exportar_dados_csv(self, caminho):
+    @leitura
+    def exportar_dados_csv(self, caminho, progresso=None):
         """
         Exporta os dados completos de clientes e vendas para um arquivo CSV
+        
+        As linhas são lidas em lotes e gravadas conforme chegam: o uso de memória
+        não depende do tamanho da loja. Com modo_wal, tudo vem de uma única
+        leitura consistente do banco (ver _lotes_exportacao).
+        
+        Args:
+            caminho: Arquivo de destino (.csv é acrescentado se faltar)
+            progresso: Função chamada com a porcentagem concluída (opcional)
         """
+        import csv
+        
+        # Gerar nome do arquivo com data/hora se não for especificado
+        if not caminho.lower().endswith('.csv'):
+            caminho += '.csv'
+        
+        cursor = self.conn.cursor()
+        # Clientes e vendas lidos do mesmo instante do banco. Só com WAL: no journal
+        # padrão a transação de leitura bloquearia as escritas até o fim da exportação
+        iniciou_transacao = self.modo_wal and not self.conn.in_transaction
         try:
-            import csv
-            from datetime import datetime
+            if iniciou_transacao:
+                cursor.execute("BEGIN")
             
-            # Gerar nome do arquivo com data/hora se não for especificado
-            if not caminho.lower().endswith('.csv'):
-                caminho += '.csv'
+            # Total de linhas (para o progresso) vem da tabela de saldos
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM clientes),
+                       (SELECT COALESCE(SUM(quantidade_vendas), 0) FROM saldos_clientes)
+            """)
+            total_linhas = sum(cursor.fetchone()) or 1
+            escritas = 0
+            ultimo_progresso = -1
             
-            with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+            with open(caminho, 'w', newline='', encoding='utf-8',
+                      buffering=self.BUFFER_EXPORTACAO) as arquivo:
                 writer = csv.writer(arquivo)
                 
                 # Escrever cabeçalho
@@ -726,116 +2935,156 @@ class Database:
                 writer.writerow([f'Data de exportação: {datetime.now().strftime("%d/%m/%Y %H:%M")}'])
                 writer.writerow([])
                 
-                # Seção de clientes
+                # Seção de clientes: uma consulta com o total de cada cliente
                 writer.writerow(['CLIENTES'])
                 writer.writerow(['ID', 'Nome', 'Telefone', 'Total em Vendas', 'Data de Cadastro'])
-                
-                cursor = self.conn.cursor()
-                clientes = self.listar_clientes()
-                
-                for cliente in clientes:
-                    cliente_id = cliente[0]
-                    nome = cliente[1]
-                    telefone = cliente[2] or ""
-                    data_cadastro = cliente[4]
-                    
-                    # Calcular total em vendas
-                    total = self.obter_total_vendas_cliente(cliente_id)
-                    
-                    writer.writerow([cliente_id, nome, telefone, f"R$ {total:.2f}", data_cadastro])
+                lotes = self._lotes_exportacao(cursor, '''
+                SELECT c.id, c.nome, c.telefone, COALESCE(s.total, 0), c.data_cadastro
+                FROM clientes c
+                LEFT JOIN saldos_clientes s ON s.cliente_id = c.id
+                WHERE 1=1
+                ''', 'c.nome', 'c.id', indice_ordem=1, indice_id=0, decrescente=False)
+                for lote in lotes:
+                    writer.writerows(
+                        [cliente_id, nome, telefone or "", f"R$ {centavos_para_texto(total)}", data_cadastro]
+                        for cliente_id, nome, telefone, total, data_cadastro in lote
+                    )
+                    escritas += len(lote)
+                    ultimo_progresso = self._informar_progresso(progresso, escritas, total_linhas, ultimo_progresso)
                 
                 writer.writerow([])
                 
                 # Seção de vendas
                 writer.writerow(['VENDAS'])
                 writer.writerow(['ID', 'Cliente', 'Produto', 'Quantidade', 'Valor Unitário', 'Valor Total', 'Data'])
-                
-                # Obter todas as vendas
-                cursor.execute('''
-                SELECT v.id, c.nome, v.produto, v.quantidade, v.preco, v.valor_total, v.data_venda
+                # Valores lidos em centavos, sem o conversor "[dinheiro]" (muito mais rápido aqui)
+                lotes = self._lotes_exportacao(cursor, '''
+                SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_unitario, v.valor_total, v.data_venda
                 FROM vendas v
                 JOIN clientes c ON v.cliente_id = c.id
-                ORDER BY v.data_venda DESC
-                ''')
-                
-                vendas = cursor.fetchall()
-                
-                for venda in vendas:
-                    venda_id = venda[0]
-                    cliente_nome = venda[1]
-                    produto = venda[2]
-                    quantidade = venda[3]
-                    valor_unitario = venda[4]
-                    valor_total = venda[5]
-                    data = venda[6]
-                    
-                    writer.writerow([
-                        venda_id, 
-                        cliente_nome, 
-                        produto, 
-                        quantidade, 
-                        f"R$ {valor_unitario:.2f}", 
-                        f"R$ {valor_total:.2f}", 
-                        data
-                    ])
-                
-                return True, "Dados exportados com sucesso para CSV!"
-                
+                WHERE 1=1
+                ''', 'v.data_venda', 'v.id', indice_ordem=6, indice_id=0, decrescente=True)
+                for lote in lotes:
+                    writer.writerows(
+                        [venda_id, cliente_nome, produto, quantidade,
+                         f"R$ {centavos_para_texto(valor_unitario)}", f"R$ {centavos_para_texto(valor_total)}", data]
+                        for venda_id, cliente_nome, produto, quantidade, valor_unitario, valor_total, data in lote
+                    )
+                    escritas += len(lote)
+                    ultimo_progresso = self._informar_progresso(progresso, escritas, total_linhas, ultimo_progresso)
+            
+            if progresso:
+                progresso(100)
+            return True, "Dados exportados com sucesso para CSV!"
+        
         except Exception as e:
             return False, f"Erro ao exportar dados: {str(e)}"
+        finally:
+            if iniciou_transacao and self.conn.in_transaction:
+                self.conn.rollback()
+            cursor.close()
+    
+    def _lotes_exportacao(self, cursor, sql, coluna_ordem, coluna_id, indice_ordem, indice_id, decrescente):
+        """
+        Linhas de uma consulta base de consultar_pagina, em lotes de LOTE_EXPORTACAO
+        
+        Com modo_wal, uma única consulta lida com fetchmany dentro da transação de
+        leitura de exportar_dados_csv. Sem WAL, uma consulta aberta mantém o banco
+        bloqueado para escrita; cada lote é então uma página por chave
+        (consultar_pagina) já encerrada quando o lote é gravado, e as escritas
+        da interface podem ocorrer entre os lotes.
+        """
+        if self.modo_wal:
+            direcao = 'DESC' if decrescente else 'ASC'
+            cursor.execute(f"{sql} ORDER BY {coluna_ordem} {direcao}, {coluna_id} {direcao}")
+            while True:
+                lote = cursor.fetchmany(self.LOTE_EXPORTACAO)
+                if not lote:
+                    return
+                yield lote
+        apos = None
+        while True:
+            lote, apos = self.consultar_pagina(sql, [], coluna_ordem, coluna_id, apos, self.LOTE_EXPORTACAO,
+                                               indice_ordem, indice_id, decrescente)
+            if lote:
+                yield lote
+            if apos is None:
+                return
     
+    @staticmethod
+    def _informar_progresso(progresso, feitas, total, ultimo):
+        """Chama progresso apenas quando a porcentagem muda"""
+        if not progresso:
+            return ultimo
+        porcentagem = min(99, feitas * 100 // total)
+        if porcentagem != ultimo:
+            progresso(porcentagem)
+        return porcentagem
+    
+    def iniciar_exportacao_csv(self, caminho):
+        """
+        Inicia a exportação CSV em segundo plano
+        
+        Returns:
+            ExportacaoEmSegundoPlano com os sinais progresso(int) e concluido(bool, str)
+        """
+        # A exportação roda em outra thread: as leituras usam o pool de conexões
+        self.habilitar_leitura_concorrente()
+        return ExportacaoEmSegundoPlano(self, caminho).iniciar()
+
+    @leitura
+    def exportar_dados_colunar(self, destino, data_inicio=None, data_fim=None, progresso=None):
+        """
+        Exporta as vendas no formato colunar (exportacao_colunar.py), um arquivo por mês
+
+        Para análise em ferramentas externas ou arquivamento: cada mês pode ser
+        lido sozinho com LeitorColunar. Exportar de novo um período substitui
+        apenas os meses desse período.
+
+        Args:
+            destino: Pasta da exportação (criada se não existir)
+            data_inicio, data_fim: Período das vendas (opcional)
+            progresso: Função chamada com a porcentagem concluída (opcional)
+
+        Returns:
+            tuple: (sucesso, mensagem)
+        """
+        from exportacao_colunar import exportar_vendas
+
+        os.makedirs(destino, exist_ok=True)
+        iniciou_transacao = not self.conn.in_transaction
+        try:
+            if iniciou_transacao:
+                self.conn.execute("BEGIN")
+            manifesto = exportar_vendas(self.conn, destino, data_inicio, data_fim, progresso,
+                                        lote=self.LOTE_EXPORTACAO)
+            return True, f"Vendas exportadas em {len(manifesto['particoes'])} partição(ões) mensal(is)!"
+        except Exception as e:
+            return False, f"Erro ao exportar dados: {str(e)}"
+        finally:
+            if iniciou_transacao and self.conn.in_transaction:
+                self.conn.rollback()
+
     def __del__(self):
         """
         Fecha a conexão com o banco de dados quando o objeto é destruído
         """
-        if hasattr(self, 'conn') and self.conn:
-            self.conn.close()
+        if getattr(self, '_conn', None):
+            self.fechar()
     
+    @leitura
     def obter_cliente(self, cliente_id):
-        """Obtém um cliente pelo ID de forma adaptável à estrutura existente"""
+        """Obtém um cliente pelo ID: (id, nome, telefone, nota, data_cadastro)"""
         cursor = self.conn.cursor()
-        
-        # Usar o cache para evitar consultas repetitivas
-        colunas = [col[1] for col in self.verificar_estrutura_tabela('clientes')]
-        
-        # Construir uma consulta SQL que se adapta às colunas existentes
-        # Não mostrar mensagens repetitivas, apenas construir a consulta correta
-        colunas_seguras = [col for col in ['id', 'nome', 'telefone', 'nota', 'notas', 'data_cadastro'] if col in colunas]
-        consulta = f"SELECT {', '.join(colunas_seguras)} FROM clientes WHERE id = ?"
-        
-        try:
-            cursor.execute(consulta, (cliente_id,))
-            cliente = cursor.fetchone()
-            
-            # Se temos 'notas' em vez de 'nota', adaptar o resultado para o formato esperado
-            if cliente and 'notas' in colunas_seguras and 'nota' not in colunas_seguras:
-                # Criar uma lista com os valores
-                valores = list(cliente)
-                # Encontrar o índice da coluna 'notas'
-                idx_notas = colunas_seguras.index('notas')
-                # Inserir o valor na posição onde o código espera a coluna 'nota' (posição 3)
-                if len(valores) <= 3:
-                    valores.append(cliente[idx_notas])
-                else:
-                    valores[3] = cliente[idx_notas]
-                cliente = tuple(valores)
-            
-            cursor.close()
-            return cliente
-        except sqlite3.OperationalError as e:
-            print(f"Erro na consulta SQL: {e}")
-            # Fallback para uma consulta básica
-            try:
-                cursor.execute("SELECT id, nome, telefone, '' FROM clientes WHERE id = ?", (cliente_id,))
-                cliente = cursor.fetchone()
-                cursor.close()
-                return cliente
-            except Exception as e2:
-                print(f"Erro no fallback: {e2}")
-                cursor.close()
-                # Retornar uma tupla com valores padrão
-                return (cliente_id, "", "", "")
+        cursor.execute(
+            "SELECT id, nome, telefone, nota, data_cadastro FROM clientes WHERE id = ?",
+            (cliente_id,)
+        )
+        cliente = cursor.fetchone()
+        cursor.close()
+        return cliente
     
+    @escrita
     def remover_venda(self, venda_id):
         """Método legado - Agora apenas chama excluir_venda depois de registrar a exclusão"""
         print(f"INFO: Método legado remover_venda chamado para venda ID {venda_id}")
@@ -844,11 +3093,15 @@ class Database:
         self.registrar_exclusao_venda(venda_id)
         
         # Excluir a venda
+        cliente_id = self.obter_id_cliente_por_venda(venda_id)
         cursor = self.conn.cursor()
         cursor.execute('DELETE FROM vendas WHERE id = ?', (venda_id,))
-        self.conn.commit()
+        self._confirmar()
+        self._publicar(VendaExcluida(cliente_id, venda_id))
     
     # Métodos para a HomeView
+    @em_cache
+    @leitura
     def contar_clientes(self):
         """Retorna o número total de clientes cadastrados"""
         try:
@@ -860,28 +3113,28 @@ class Database:
             print(f"Erro ao contar clientes: {str(e)}")
             return 0
     
+    @em_cache
+    @leitura
     def calcular_total_vendas(self):
         """Retorna o valor total de todas as vendas"""
-        cursor = self.conn.cursor()
         try:
-            cursor.execute("SELECT SUM(valor_total) FROM vendas")
-            total = cursor.fetchone()[0]
-            return total if total is not None else 0
+            return self.obter_totais_periodo()[0]
         except Exception as e:
             print(f"Erro ao calcular total de vendas: {str(e)}")
-            return 0
+            return Dinheiro(0)
     
+    @em_cache
+    @leitura
     def contar_produtos_vendidos(self):
         """Retorna a quantidade total de produtos vendidos"""
-        cursor = self.conn.cursor()
         try:
-            cursor.execute("SELECT SUM(quantidade) FROM vendas")
-            total = cursor.fetchone()[0]
-            return int(total) if total is not None else 0
+            return int(self.obter_totais_periodo()[1])
         except Exception as e:
             print(f"Erro ao contar produtos vendidos: {str(e)}")
             return 0
             
+    @em_cache
+    @leitura
     def listar_produtos_registrados(self):
         """Retorna lista de produtos únicos com quantidade total vendida e valor total"""
         cursor = self.conn.cursor()
@@ -889,9 +3142,9 @@ class Database:
             cursor.execute("""
                 SELECT 
                     produto, 
-                    SUM(quantidade) as total_quantidade,
-                    SUM(valor_total) as total_valor
-                FROM vendas 
+                    SUM(quantidade_itens) as total_quantidade,
+                    SUM(total) AS "total_valor [dinheiro]"
+                FROM resumo_diario_produtos 
                 GROUP BY produto
                 ORDER BY total_quantidade DESC
             """)
@@ -900,11 +3153,51 @@ class Database:
             print(f"Erro ao listar produtos registrados: {str(e)}")
             return []
             
+    @em_cache
+    @leitura
     def contar_pendencias(self):
         """Retorna o número de clientes com pendências"""
-        devedores = self.gerar_relatorio_clientes_devedores()
-        return len(devedores)
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT COUNT(*)
+                FROM contas_clientes s
+                JOIN clientes c ON c.id = s.cliente_id
+                WHERE s.saldo > 0
+            """)
+            return cursor.fetchone()[0]
+        except Exception as e:
+            print(f"Erro ao contar pendências: {str(e)}")
+            return 0
+        finally:
+            cursor.close()
+    
+    def consulta_vendas_excluidas(self, data_inicio=None, data_fim=None, cliente_id=None):
+        """
+        Consulta base do histórico de vendas excluídas, terminando em WHERE (sem ORDER BY)
+        
+        O período filtra data_exclusao; basta uma das datas para limitar um lado.
+        
+        Returns:
+            tuple: (sql, parâmetros)
+        """
+        sql = """
+            SELECT 
+                id, venda_id, cliente_nome, produto, quantidade, 
+                valor_total AS "valor_total [dinheiro]", data_venda, data_exclusao
+            FROM vendas_excluidas
+            WHERE 1=1
+        """
+        filtros, params = self._filtro_periodo('data_exclusao', data_inicio, data_fim)
+        for filtro in filtros:
+            sql += f" AND {filtro}"
+        if cliente_id:
+            sql += " AND cliente_id = ?"
+            params.append(cliente_id)
+        return sql, params
     
+    @em_cache
+    @leitura
     def obter_vendas_excluidas(self, data_inicio=None, data_fim=None, cliente_id=None):
         """
         Obtém as vendas excluídas com filtros opcionais de período e cliente
@@ -918,27 +3211,13 @@ class Database:
             count = cursor.fetchone()[0]
             print(f"INFO: Encontrados {count} registros na tabela vendas_excluidas")
             
-            query = """
-                SELECT 
-                    id, venda_id, cliente_nome, produto, quantidade, 
-                    valor_total, data_venda, data_exclusao
-                FROM vendas_excluidas
-                WHERE 1=1
-            """
-            
-            params = []
+            query, params = self.consulta_vendas_excluidas(data_inicio, data_fim, cliente_id)
             
-            # Adicionar filtros se fornecidos
-            if data_inicio and data_fim:
-                query += " AND date(data_exclusao) BETWEEN ? AND ?"
-                params.extend([data_inicio, data_fim])
-                print(f"DEBUG: Aplicando filtro de data de {data_inicio} até {data_fim}")
+            if data_inicio or data_fim:
+                print(f"DEBUG: Aplicando filtro de data de {data_inicio or '-'} até {data_fim or '-'}")
             else:
                 print("DEBUG: Sem filtro de data, mostrando todos os registros")
-                
             if cliente_id:
-                query += " AND cliente_id = ?"
-                params.append(cliente_id)
                 print(f"DEBUG: Aplicando filtro de cliente ID {cliente_id}")
                 
             query += " ORDER BY data_exclusao DESC"
@@ -964,6 +3243,31 @@ class Database:
             cursor.close()
             return []
     
+    @leitura
+    def obter_vendas_excluidas_paginado(self, data_inicio=None, data_fim=None, cliente_id=None,
+                                        after_data_exclusao=None, after_id=None, limite=None):
+        """
+        Versão paginada de obter_vendas_excluidas (sem as mensagens de diagnóstico)
+        
+        Args:
+            data_inicio, data_fim, cliente_id: Mesmos filtros de obter_vendas_excluidas
+            after_data_exclusao, after_id: Token retornado pela página anterior (opcional)
+            limite: Linhas por página (padrão: LIMITE_PAGINA)
+            
+        Returns:
+            tuple: (vendas excluídas da página, token (data_exclusao, id) da próxima página ou None)
+        """
+        sql, params = self.consulta_vendas_excluidas(data_inicio, data_fim, cliente_id)
+        apos = (after_data_exclusao, after_id) if after_id is not None else None
+        try:
+            return self.consultar_pagina(
+                sql, params, 'data_exclusao', 'id', apos, limite, indice_ordem=7, indice_id=0
+            )
+        except Exception as e:
+            print(f"ERRO ao obter vendas excluídas: {e}")
+            return [], None
+    
+    @escrita
     def limpar_vendas_excluidas(self):
         """
         Remove todos os registros da tabela de vendas excluídas
@@ -980,7 +3284,8 @@ class Database:
             
             # Limpar a tabela
             cursor.execute("DELETE FROM vendas_excluidas")
-            self.conn.commit()
+            self._confirmar()
+            self._publicar(HistoricoExclusoesLimpo())
             
             cursor.close()
             return True, f"Histórico de {count} vendas excluídas foi limpo com sucesso!"
@@ -988,41 +3293,196 @@ class Database:
             print(f"ERRO ao limpar vendas excluídas: {e}")
             return False, f"Erro ao limpar histórico: {str(e)}"
     
-    def obter_clientes_com_pagamentos_pendentes(self, valor_minimo=0):
+    # Faixas do relatório de idade das dívidas: (título, dias mínimos, dias máximos ou None)
+    FAIXAS_IDADE_DIVIDA = (
+        ('ate_30', 0, 30),
+        ('de_31_a_60', 31, 60),
+        ('de_61_a_90', 61, 90),
+        ('acima_90', 91, None),
+    )
+    
+    @staticmethod
+    def _referencia_idade(data_referencia=None):
+        """
+        Data de referência da idade das dívidas, no formato gravado no banco
+        
+        Só com a data (ou sem data: hoje, em UTC, o fuso de data_venda) vale o
+        último segundo do dia: as faixas contam dias de calendário, e a
+        referência fica igual o dia inteiro, então o resultado pode vir do cache.
+        """
+        if not data_referencia:
+            data_referencia = datetime.now(timezone.utc).date()
+        # Fim exclusivo do período menos um segundo: o próprio horário, se informado
+        fim = datetime.strptime(limites_periodo(None, data_referencia)[1], "%Y-%m-%d %H:%M:%S")
+        return (fim - timedelta(seconds=1)).strftime("%Y-%m-%d %H:%M:%S")
+    
+    def _sql_idade_dividas(self, referencia, cliente_id=None, dias_minimos=0, valor_minimo=0):
+        """
+        Consulta por cliente devedor: (id, nome, telefone, saldo, valor em aberto
+        de cada faixa de FAIXAS_IDADE_DIVIDA, dias da venda em aberto mais antiga,
+        telefone_e164)
+        
+        Os pagamentos quitam as vendas mais antigas primeiro (FIFO): o saldo do
+        cliente corresponde às vendas mais recentes. Uma janela acumula as vendas
+        em ordem de data, e cada venda fica em aberto pelo que o saldo ainda cobre
+        depois das vendas mais novas que ela (total do cliente - acumulado).
+        A janela segue a ordem do índice (cliente_id, data_venda), então as vendas
+        dos clientes com saldo são lidas uma vez, sem ordenação. As faixas comparam
+        data_venda com datas de corte calculadas aqui, sem converter cada linha.
+        
+        Args:
+            referencia: Data de referência já resolvida (ver _referencia_idade)
+            
+        Returns:
+            tuple: (sql, parâmetros)
+        """
+        momento = datetime.strptime(referencia, "%Y-%m-%d %H:%M:%S")
+        
+        def corte(dias):
+            """Vendas com data_venda > corte(d) têm menos de d dias completos"""
+            return (momento - timedelta(days=dias)).strftime("%Y-%m-%d %H:%M:%S")
+        
+        faixas = []
+        params_faixas = []
+        for titulo, minimo, maximo in self.FAIXAS_IDADE_DIVIDA:
+            condicoes = []
+            if minimo > 0:
+                condicoes.append("data_venda <= ?")
+                params_faixas.append(corte(minimo))
+            if maximo is not None:
+                condicoes.append("data_venda > ?")
+                params_faixas.append(corte(maximo + 1))
+            faixas.append(f"SUM(CASE WHEN {' AND '.join(condicoes) or '1'} THEN aberto ELSE 0 END) AS {titulo}")
+        titulos = ", ".join(titulo for titulo, _, _ in self.FAIXAS_IDADE_DIVIDA)
+        filtro_cliente = "AND d.cliente_id = ?" if cliente_id is not None else ""
+        # Subconsultas (e não CTEs) para o plano mostrar só buscas em índice nas tabelas
+        sql = f'''
+        SELECT c.id, c.nome, c.telefone, saldo, {titulos},
+               CAST(julianday(?) - julianday(mais_antiga) AS INTEGER) AS dias_mais_antiga,
+               c.telefone_e164
+        FROM (
+            SELECT cliente_id, saldo, {", ".join(faixas)}, MIN(data_venda) AS mais_antiga
+            FROM (
+                SELECT v.cliente_id, d.saldo, v.data_venda,
+                       MIN(v.valor_total,
+                           MAX(0, d.saldo - (s.total - SUM(v.valor_total) OVER acumulado))) AS aberto
+                FROM contas_clientes d
+                JOIN saldos_clientes s ON s.cliente_id = d.cliente_id
+                JOIN vendas v ON v.cliente_id = d.cliente_id
+                WHERE d.saldo > 0 AND d.saldo >= ? {filtro_cliente}
+                WINDOW acumulado AS (PARTITION BY v.cliente_id ORDER BY v.data_venda, v.id
+                                     ROWS UNBOUNDED PRECEDING)
+            )
+            WHERE aberto > 0
+            GROUP BY cliente_id
+            HAVING MIN(data_venda) <= ?
+        )
+        JOIN clientes c ON c.id = cliente_id
+        '''
+        params = [referencia] + params_faixas + [Dinheiro.de_reais(valor_minimo)]
+        if cliente_id is not None:
+            params.append(cliente_id)
+        params.append(corte(dias_minimos))
+        return sql, params
+    
+    def gerar_relatorio_idade_dividas(self, cliente_id=None, dias_minimos=0, valor_minimo=0,
+                                      data_referencia=None):
+        """
+        Relatório de idade das dívidas (30/60/90 dias) por cliente
+        
+        Args:
+            cliente_id: Apenas este cliente (opcional)
+            dias_minimos: Apenas clientes com alguma venda em aberto há pelo menos
+                          esse número de dias (padrão: 0, todos os devedores)
+            valor_minimo: Saldo devedor mínimo em reais (padrão: 0)
+            data_referencia: Data em relação à qual a idade é calculada (padrão: hoje;
+                             só com a data, conta o dia inteiro). Os saldos são
+                             sempre os atuais
+            
+        Returns:
+            Lista de tuplas (id, nome, telefone, saldo, ate_30, de_31_a_60, de_61_a_90,
+            acima_90, dias da venda em aberto mais antiga), do maior saldo para o menor
+        """
+        # A referência é resolvida antes do cache e faz parte da chave: um resultado
+        # calculado "agora" não é devolvido depois que as dívidas envelheceram
+        return self._relatorio_idade_dividas(cliente_id, dias_minimos, valor_minimo,
+                                             self._referencia_idade(data_referencia))
+    
+    @em_cache
+    @leitura
+    def _relatorio_idade_dividas(self, cliente_id, dias_minimos, valor_minimo, referencia):
+        """gerar_relatorio_idade_dividas com a data de referência já resolvida"""
+        sql, params = self._sql_idade_dividas(referencia, cliente_id, dias_minimos, valor_minimo)
+        faixas = ", ".join(f'{titulo} AS "{titulo} [dinheiro]"' for titulo, _, _ in self.FAIXAS_IDADE_DIVIDA)
+        sql = f'''
+        SELECT id, nome, telefone, saldo AS "saldo [dinheiro]", {faixas}, dias_mais_antiga
+        FROM ({sql})
+        ORDER BY saldo DESC, id
+        '''
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except Exception as e:
+            print(f"ERRO ao gerar relatório de idade das dívidas: {e}")
+            return []
+        finally:
+            cursor.close()
+    
+    def obter_clientes_com_pagamentos_pendentes(self, valor_minimo=0, dias_minimos=0):
         """
         Obtém a lista de clientes com pagamentos pendentes com informações para contato
         
         Args:
             valor_minimo: Valor mínimo em reais para filtrar os clientes (padrão: 0)
+            dias_minimos: Apenas clientes com alguma venda em aberto há pelo menos
+                          esse número de dias, para campanhas de cobrança (padrão: 0)
             
         Returns:
-            Lista de tuplas (id, nome, telefone, total_devido)
+            Lista de tuplas (id, nome, telefone, total_devido, telefone_e164), com o
+            saldo devedor (vendas - pagamentos), apenas de clientes com telefone
+            válido. Os envios pelo WhatsApp usam telefone_e164 diretamente
         """
+        # Só o filtro por dias depende do relógio (ver gerar_relatorio_idade_dividas)
+        referencia = self._referencia_idade() if dias_minimos else None
+        return self._clientes_com_pagamentos_pendentes(valor_minimo, dias_minimos, referencia)
+    
+    @em_cache
+    @leitura
+    def _clientes_com_pagamentos_pendentes(self, valor_minimo, dias_minimos, referencia):
+        """obter_clientes_com_pagamentos_pendentes com a data de referência já resolvida"""
         cursor = self.conn.cursor()
         
         try:
-            sql = '''
-            SELECT c.id, c.nome, c.telefone, SUM(v.valor_total) as total_devido
-            FROM clientes c
-            JOIN vendas v ON c.id = v.cliente_id
-            GROUP BY c.id
-            HAVING total_devido >= ?
-            ORDER BY total_devido DESC
-            '''
-            
-            cursor.execute(sql, (valor_minimo,))
-            clientes_devedores = cursor.fetchall()
-            
-            # Filtrar apenas clientes com telefone cadastrado
-            clientes_com_telefone = [cliente for cliente in clientes_devedores if cliente[2] and cliente[2].strip()]
+            if dias_minimos:
+                # Mesmo critério de gerar_relatorio_idade_dividas (pagamentos quitam as vendas mais antigas)
+                sql, params = self._sql_idade_dividas(referencia, dias_minimos=dias_minimos,
+                                                      valor_minimo=valor_minimo)
+                sql = f'''
+                SELECT id, nome, telefone, saldo AS "total_devido [dinheiro]", telefone_e164
+                FROM ({sql})
+                WHERE telefone_e164 IS NOT NULL
+                ORDER BY saldo DESC
+                '''
+            else:
+                sql = '''
+                SELECT c.id, c.nome, c.telefone, s.saldo AS "total_devido [dinheiro]", c.telefone_e164
+                FROM contas_clientes s
+                JOIN clientes c ON c.id = s.cliente_id
+                WHERE s.saldo > 0 AND s.saldo >= ? AND c.telefone_e164 IS NOT NULL
+                ORDER BY s.saldo DESC
+                '''
+                params = [Dinheiro.de_reais(valor_minimo)]
             
-            return clientes_com_telefone
+            cursor.execute(sql, params)
+            return cursor.fetchall()
         except Exception as e:
             print(f"ERRO ao obter clientes com pagamentos pendentes: {e}")
             return []
         finally:
             cursor.close()
     
+    @escrita
     def registrar_notificacao(self, cliente_id, valor_pendente, observacao=None, tipo='sistema'):
         """
         Registra uma notificação enviada a um cliente sobre pagamento pendente
@@ -1042,17 +3502,20 @@ class Database:
             cursor.execute('''
             INSERT INTO notificacoes_pagamento (cliente_id, valor_pendente, observacao, status, tipo)
             VALUES (?, ?, ?, 'enviada', ?)
-            ''', (cliente_id, valor_pendente, observacao, tipo))
+            ''', (cliente_id, Dinheiro.de_reais(valor_pendente) if valor_pendente is not None else None,
+                  observacao, tipo))
             
-            self.conn.commit()
+            self._confirmar()
+            self._publicar(NotificacaoRegistrada(cliente_id))
             return True
         except Exception as e:
             print(f"ERRO ao registrar notificação: {e}")
-            self.conn.rollback()
+            self._desfazer()
             return False
         finally:
             cursor.close()
     
+    @leitura
     def obter_historico_notificacoes(self, cliente_id=None, dias=30):
         """
         Obtém o histórico de notificações enviadas
@@ -1068,13 +3531,18 @@ class Database:
         
         try:
             sql = '''
-            SELECT n.id, c.nome, n.data_notificacao, n.valor_pendente, n.status, n.observacao, n.tipo
+            SELECT n.id, c.nome, n.data_notificacao, n.valor_pendente AS "valor_pendente [dinheiro]",
+                   n.status, n.observacao, n.tipo
             FROM notificacoes_pagamento n
             JOIN clientes c ON n.cliente_id = c.id
-            WHERE date(n.data_notificacao) >= date('now', ?)
+            WHERE 1=1
             '''
             
-            params = [f'-{dias} days']
+            # Desde o início do dia, 'dias' dias atrás (UTC, como as datas gravadas)
+            desde = (datetime.now(timezone.utc) - timedelta(days=dias)).date()
+            filtros, params = self._filtro_periodo('n.data_notificacao', desde, None)
+            for filtro in filtros:
+                sql += f" AND {filtro}"
             
             if cliente_id:
                 sql += " AND n.cliente_id = ?"
@@ -0,0 +1,112 @@
+import os
+from datetime import datetime
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox)
+
+from instrumentacao import INSTRUMENTACAO
+
+class DiagnosticoDialog(QDialog):
+    """Painel oculto (Ctrl+Shift+D) com os tempos medidos pela instrumentação"""
+    COLUNAS = (
+        ('operacao', "Operação"),
+        ('chamadas', "Chamadas"),
+        ('erros', "Erros"),
+        ('total_ms', "Total (ms)"),
+        ('media_ms', "Média (ms)"),
+        ('p50_ms', "p50 (ms)"),
+        ('p95_ms', "p95 (ms)"),
+        ('maximo_ms', "Máximo (ms)"),
+        ('linhas', "Linhas"),
+    )
+
+    def __init__(self, pasta_exportacao, cache=None, parent=None):
+        super().__init__(parent)
+        self.pasta_exportacao = pasta_exportacao
+        self.cache = cache
+        self.setObjectName("DiagnosticoDialog")
+        self.setWindowTitle("Diagnóstico de desempenho")
+        self.resize(1000, 600)
+        self.setStyleSheet("""
+            #DiagnosticoDialog {
+                background-color: #23272f;
+            }
+            QLabel {
+                color: #bdc3c7;
+                font-size: 10pt;
+            }
+            QPushButton {
+                min-height: 32px;
+                border-radius: 8px;
+                padding: 6px 15px;
+                background-color: #3498db;
+                color: white;
+                border: none;
+            }
+            QPushButton:hover {
+                background-color: #2980b9;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        self.info_label = QLabel()
+        layout.addWidget(self.info_label)
+
+        self.tabela = QTableWidget(0, len(self.COLUNAS))
+        self.tabela.setHorizontalHeaderLabels([titulo for _, titulo in self.COLUNAS])
+        self.tabela.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tabela.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabela.setSortingEnabled(True)
+        layout.addWidget(self.tabela)
+
+        botoes = QHBoxLayout()
+        for texto, acao in (("Atualizar", self.carregar),
+                            ("Zerar contadores", self.zerar),
+                            ("Exportar JSON", lambda: self.exportar('json')),
+                            ("Exportar CSV", lambda: self.exportar('csv')),
+                            ("Fechar", self.close)):
+            botao = QPushButton(texto)
+            botao.clicked.connect(acao)
+            botoes.addWidget(botao)
+        layout.addLayout(botoes)
+
+        self.carregar()
+
+    def carregar(self):
+        resumo = INSTRUMENTACAO.resumo()
+        self.tabela.setSortingEnabled(False)
+        self.tabela.setRowCount(len(resumo))
+        for linha, item in enumerate(resumo):
+            for coluna, (chave, _) in enumerate(self.COLUNAS):
+                celula = QTableWidgetItem()
+                # Números como dado (e não texto) para a ordenação funcionar
+                celula.setData(Qt.DisplayRole, item[chave])
+                self.tabela.setItem(linha, coluna, celula)
+        self.tabela.setSortingEnabled(True)
+        texto = (f"Medições desde {INSTRUMENTACAO.inicio.strftime('%d/%m/%Y %H:%M:%S')} "
+                 f"- {len(resumo)} operações")
+        if self.cache is not None:
+            cache = self.cache.estatisticas()
+            texto += (f"\nCache de consultas: {cache['acertos']} acertos, {cache['falhas']} falhas "
+                      f"({cache['taxa_acertos']:.0%}), {cache['entradas']} resultados guardados, "
+                      f"{cache['descartes']} descartados por tamanho")
+        self.info_label.setText(texto)
+
+    def zerar(self):
+        INSTRUMENTACAO.limpar()
+        if self.cache is not None:
+            self.cache.limpar()
+        self.carregar()
+
+    def exportar(self, formato):
+        nome = f"diagnostico_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{formato}"
+        caminho = os.path.join(self.pasta_exportacao, nome)
+        try:
+            if formato == 'json':
+                INSTRUMENTACAO.exportar_json(caminho)
+            else:
+                INSTRUMENTACAO.exportar_csv(caminho)
+            QMessageBox.information(self, "Diagnóstico", f"Dados exportados para:\n{caminho}")
+        except Exception as e:
+            QMessageBox.critical(self, "Diagnóstico", f"Erro ao exportar: {str(e)}")
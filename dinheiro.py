@@ -0,0 +1,142 @@
+import sqlite3
+from decimal import Decimal, ROUND_HALF_UP
+
+class Dinheiro:
+    """
+    Valor monetário em centavos inteiros.
+
+    Os valores são guardados no banco como INTEGER (centavos) e devolvidos pelo
+    Database como Dinheiro. Para manter compatibilidade com o código que já
+    trabalhava com float em reais, Dinheiro aceita operações com int/float
+    (interpretados como reais) e é formatado como o float correspondente:
+    f"R$ {valor:.2f}" continua funcionando.
+    """
+    __slots__ = ('centavos',)
+
+    def __init__(self, centavos=0):
+        self.centavos = int(centavos)
+
+    @classmethod
+    def de_reais(cls, valor):
+        """Converte um valor em reais (int, float, str ou Decimal) para Dinheiro"""
+        if isinstance(valor, Dinheiro):
+            return valor
+        if valor is None:
+            return cls(0)
+        if isinstance(valor, str):
+            valor = valor.replace('R$', '').strip().replace(',', '.')
+        centavos = (Decimal(str(valor)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+        return cls(centavos)
+
+    @property
+    def reais(self):
+        """Valor exato em reais como Decimal"""
+        return Decimal(self.centavos) / 100
+
+    def _centavos_de(self, outro):
+        if isinstance(outro, Dinheiro):
+            return outro.centavos
+        if isinstance(outro, (int, float, Decimal)):
+            return Dinheiro.de_reais(outro).centavos
+        return None
+
+    def __float__(self):
+        return self.centavos / 100
+
+    def __format__(self, especificacao):
+        if not especificacao:
+            return str(self)
+        return format(float(self), especificacao)
+
+    def __str__(self):
+        return f"{self.reais:.2f}"
+
+    def __repr__(self):
+        return f"Dinheiro('{self}')"
+
+    def __bool__(self):
+        return self.centavos != 0
+
+    def __hash__(self):
+        return hash(float(self))
+
+    def __round__(self, casas=None):
+        return round(float(self), casas)
+
+    def __neg__(self):
+        return Dinheiro(-self.centavos)
+
+    def __abs__(self):
+        return Dinheiro(abs(self.centavos))
+
+    def __add__(self, outro):
+        centavos = self._centavos_de(outro)
+        if centavos is None:
+            return NotImplemented
+        return Dinheiro(self.centavos + centavos)
+
+    __radd__ = __add__
+
+    def __sub__(self, outro):
+        centavos = self._centavos_de(outro)
+        if centavos is None:
+            return NotImplemented
+        return Dinheiro(self.centavos - centavos)
+
+    def __rsub__(self, outro):
+        centavos = self._centavos_de(outro)
+        if centavos is None:
+            return NotImplemented
+        return Dinheiro(centavos - self.centavos)
+
+    def __mul__(self, fator):
+        if isinstance(fator, int):
+            return Dinheiro(self.centavos * fator)
+        if isinstance(fator, (float, Decimal)):
+            centavos = (Decimal(self.centavos) * Decimal(str(fator))).quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+            return Dinheiro(centavos)
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, divisor):
+        if isinstance(divisor, Dinheiro):
+            return self.centavos / divisor.centavos
+        return float(self) / divisor
+
+    def _comparar(self, outro, operacao):
+        centavos = self._centavos_de(outro)
+        if centavos is None:
+            return NotImplemented
+        return operacao(self.centavos, centavos)
+
+    def __eq__(self, outro):
+        return self._comparar(outro, lambda a, b: a == b)
+
+    def __lt__(self, outro):
+        return self._comparar(outro, lambda a, b: a < b)
+
+    def __le__(self, outro):
+        return self._comparar(outro, lambda a, b: a <= b)
+
+    def __gt__(self, outro):
+        return self._comparar(outro, lambda a, b: a > b)
+
+    def __ge__(self, outro):
+        return self._comparar(outro, lambda a, b: a >= b)
+
+def centavos_para_texto(centavos):
+    """
+    Formata centavos inteiros como "12.34" sem criar um Dinheiro
+
+    Usado em exportações de muitas linhas, que leem a coluna sem o conversor.
+    """
+    sinal = '-' if centavos < 0 else ''
+    centavos = abs(centavos)
+    return f"{sinal}{centavos // 100}.{centavos % 100:02d}"
+
+# Dinheiro é gravado como centavos inteiros; colunas marcadas com "[dinheiro]"
+# no nome (ex.: SUM(valor_total) AS "total [dinheiro]") voltam como Dinheiro
+# em conexões abertas com detect_types=sqlite3.PARSE_COLNAMES.
+sqlite3.register_adapter(Dinheiro, lambda valor: valor.centavos)
+sqlite3.register_converter('dinheiro', lambda valor: Dinheiro(Decimal(valor.decode())))
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+# Eventos publicados pelo Database após cada alteração confirmada
+
+@dataclass(frozen=True)
+class ClienteAdicionado:
+    cliente_id: int
+
+@dataclass(frozen=True)
+class ClienteAlterado:
+    cliente_id: int
+
+@dataclass(frozen=True)
+class ClienteExcluido:
+    cliente_id: int
+
+@dataclass(frozen=True)
+class VendaAdicionada:
+    cliente_id: int
+    venda_id: int
+
+@dataclass(frozen=True)
+class VendasAdicionadas:
+    """Várias vendas gravadas de uma vez (adicionar_vendas_lote)"""
+    cliente_id: int
+    vendas_ids: tuple
+
+@dataclass(frozen=True)
+class VendaAlterada:
+    cliente_id: int
+    venda_id: int
+
+@dataclass(frozen=True)
+class VendaExcluida:
+    cliente_id: int
+    venda_id: int
+
+@dataclass(frozen=True)
+class VendasClienteExcluidas:
+    cliente_id: int
+
+@dataclass(frozen=True)
+class HistoricoExclusoesLimpo:
+    pass
+
+@dataclass(frozen=True)
+class NotificacaoRegistrada:
+    cliente_id: int
+
+@dataclass(frozen=True)
+class PagamentoRegistrado:
+    cliente_id: int
+    pagamento_id: int
+
+@dataclass(frozen=True)
+class PagamentoExcluido:
+    cliente_id: int
+    pagamento_id: int
+
+@dataclass(frozen=True)
+class BancoRecarregado:
+    """O banco foi restaurado ou recalculado: tudo deve ser recarregado"""
+    pass
+
+EVENTOS_VENDAS = (VendaAdicionada, VendasAdicionadas, VendaAlterada, VendaExcluida, VendasClienteExcluidas)
+EVENTOS_CLIENTES = (ClienteAdicionado, ClienteAlterado, ClienteExcluido)
+EVENTOS_PAGAMENTOS = (PagamentoRegistrado, PagamentoExcluido)
+
+class Inscricao:
+    """Inscrição de um callback no BarramentoEventos"""
+    def __init__(self, callback, tipos, atraso_ms):
+        self.callback = callback
+        self.tipos = tipos
+        self.atraso_ms = atraso_ms
+        self.pendentes = []
+        self.timer = None
+        if atraso_ms:
+            self.timer = QTimer()
+            self.timer.setSingleShot(True)
+            self.timer.timeout.connect(self.entregar)
+
+    def interessa(self, evento):
+        return self.tipos is None or isinstance(evento, self.tipos) or isinstance(evento, BancoRecarregado)
+
+    def receber(self, evento):
+        self.pendentes.append(evento)
+        if self.timer is None:
+            self.entregar()
+        else:
+            # Cada evento novo adia a entrega: uma rajada vira um único callback
+            self.timer.start(self.atraso_ms)
+
+    def entregar(self):
+        eventos, self.pendentes = self.pendentes, []
+        if not eventos:
+            return
+        try:
+            self.callback(eventos)
+        except Exception as e:
+            print(f"ERRO ao processar eventos do banco: {e}")
+
+    def cancelar(self):
+        if self.timer:
+            self.timer.stop()
+        self.pendentes = []
+
+class BarramentoEventos(QObject):
+    """
+    Distribui os eventos de alteração do banco para as telas.
+
+    publicar() pode ser chamado de qualquer thread (no modo WAL as escritas
+    rodam na thread de escrita); os callbacks sempre rodam na thread da
+    interface e recebem a lista de eventos acumulados no intervalo de atraso.
+    """
+    _evento_publicado = Signal(object)
+
+    ATRASO_PADRAO_MS = 150
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._inscricoes = []
+        self._evento_publicado.connect(self._distribuir)
+
+    def inscrever(self, callback, tipos=None, atraso_ms=None):
+        """
+        Registra um callback para receber eventos
+
+        Args:
+            callback: Função chamada com a lista de eventos recebidos
+            tipos: Classe ou tupla de classes de evento (padrão: todos).
+                   BancoRecarregado é sempre entregue.
+            atraso_ms: Intervalo para agrupar eventos em sequência
+                       (padrão: ATRASO_PADRAO_MS; 0 entrega cada evento na hora)
+
+        Returns:
+            Inscricao, que pode ser passada para cancelar_inscricao
+        """
+        if atraso_ms is None:
+            atraso_ms = self.ATRASO_PADRAO_MS
+        if tipos is not None and not isinstance(tipos, tuple):
+            tipos = (tipos,)
+        inscricao = Inscricao(callback, tipos, atraso_ms)
+        self._inscricoes.append(inscricao)
+        return inscricao
+
+    def cancelar_inscricao(self, inscricao):
+        inscricao.cancelar()
+        if inscricao in self._inscricoes:
+            self._inscricoes.remove(inscricao)
+
+    def publicar(self, evento):
+        """Publica um evento (de qualquer thread)"""
+        self._evento_publicado.emit(evento)
+
+    def _distribuir(self, evento):
+        for inscricao in list(self._inscricoes):
+            if inscricao.interessa(evento):
+                inscricao.receber(evento)
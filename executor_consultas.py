@@ -0,0 +1,154 @@
+from concurrent.futures import Future
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+class PedidoConsulta:
+    """Uma consulta enviada ao ExecutorConsultas"""
+    __slots__ = ('canal', 'geracao', 'chave', 'funcao', 'args', 'kwargs', 'future', 'callbacks')
+
+    def __init__(self, canal, geracao, chave, funcao, args, kwargs):
+        self.canal = canal
+        self.geracao = geracao
+        self.chave = chave
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        # Pares (ao_concluir, ao_falhar) de todos os pedidos agrupados neste
+        self.callbacks = []
+
+class _TarefaConsulta(QRunnable):
+    def __init__(self, executor, pedido):
+        super().__init__()
+        self.executor = executor
+        self.pedido = pedido
+
+    def run(self):
+        self.executor._executar_pedido(self.pedido)
+
+class ExecutorConsultas(QObject):
+    """
+    Executa consultas do Database fora da thread da interface.
+
+    Cada pedido pertence a um canal (normalmente um por view ou por tabela da
+    view). Um pedido novo em um canal torna obsoletos os anteriores do mesmo
+    canal: os que ainda não começaram são cancelados e o resultado dos que já
+    estavam rodando é descartado. Pedidos idênticos (mesmo canal, função e
+    argumentos) enquanto o primeiro ainda não terminou são agrupados em uma
+    única execução.
+
+    Os resultados chegam na thread da interface, pelos callbacks ou pelos
+    sinais concluida/falhou. Apenas métodos de leitura devem ser enviados; as
+    escritas continuam sendo feitas pelos métodos @escrita do Database.
+    """
+    concluida = Signal(str, object)  # canal, resultado
+    falhou = Signal(str, str)  # canal, mensagem de erro
+    _pedido_finalizado = Signal(object)
+
+    MAX_THREADS = 2
+
+    def __init__(self, db, max_threads=None, parent=None):
+        """
+        Args:
+            db: Instância do Database
+            max_threads: Consultas executadas ao mesmo tempo (padrão: MAX_THREADS)
+            parent: QObject pai (opcional)
+        """
+        super().__init__(parent)
+        self.db = db
+        # Sem isso, no modo tradicional as leituras usariam a conexão da thread principal
+        db.habilitar_leitura_concorrente()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or self.MAX_THREADS)
+        self._geracoes = {}
+        self._pendentes = {}
+        self._pedido_finalizado.connect(self._entregar)
+
+    def consultar(self, canal, funcao, *args, ao_concluir=None, ao_falhar=None, **kwargs):
+        """
+        Agenda uma consulta em segundo plano
+
+        Deve ser chamado da thread da interface.
+
+        Args:
+            canal: Nome do canal (ex.: 'relatorio_vendas')
+            funcao: Método de leitura do Database (ex.: db.gerar_relatorio_vendas)
+            *args, **kwargs: Argumentos da função
+            ao_concluir: Chamado com o resultado, na thread da interface (opcional)
+            ao_falhar: Chamado com a exceção, na thread da interface (opcional)
+
+        Returns:
+            Future com o resultado (cancelado se o pedido ficar obsoleto antes de começar)
+        """
+        try:
+            chave = (canal, funcao, args, tuple(sorted(kwargs.items())))
+            hash(chave)
+        except TypeError:
+            # Argumentos não hasheáveis: executar sem agrupar
+            chave = None
+
+        pedido = self._pendentes.get(chave) if chave is not None else None
+        if pedido is not None and pedido.geracao == self._geracoes.get(canal, 0):
+            pedido.callbacks.append((ao_concluir, ao_falhar))
+            return pedido.future
+
+        self._tornar_obsoletos(canal)
+        pedido = PedidoConsulta(canal, self._geracoes[canal], chave, funcao, args, kwargs)
+        pedido.callbacks.append((ao_concluir, ao_falhar))
+        if chave is not None:
+            self._pendentes[chave] = pedido
+        self.pool.start(_TarefaConsulta(self, pedido))
+        return pedido.future
+
+    def cancelar(self, canal):
+        """Descarta os pedidos do canal (ex.: quando o usuário sai da tela)"""
+        self._tornar_obsoletos(canal)
+
+    def encerrar(self, timeout_ms=5000):
+        """Cancela o que ainda não começou e aguarda as consultas em andamento"""
+        for canal in list(self._geracoes):
+            self._tornar_obsoletos(canal)
+        self.pool.clear()
+        self.pool.waitForDone(timeout_ms)
+
+    def _tornar_obsoletos(self, canal):
+        self._geracoes[canal] = self._geracoes.get(canal, 0) + 1
+        for chave, pedido in list(self._pendentes.items()):
+            if pedido.canal == canal:
+                pedido.future.cancel()
+                del self._pendentes[chave]
+
+    def _executar_pedido(self, pedido):
+        # Roda em uma thread do pool
+        if not pedido.future.set_running_or_notify_cancel():
+            return
+        try:
+            resultado = pedido.funcao(*pedido.args, **pedido.kwargs)
+        except Exception as e:
+            pedido.future.set_exception(e)
+        else:
+            pedido.future.set_result(resultado)
+        self._pedido_finalizado.emit(pedido)
+
+    def _entregar(self, pedido):
+        # Roda na thread da interface (conexão enfileirada)
+        if pedido.chave is not None and self._pendentes.get(pedido.chave) is pedido:
+            del self._pendentes[pedido.chave]
+        if pedido.geracao != self._geracoes.get(pedido.canal, 0):
+            return
+
+        erro = pedido.future.exception()
+        for ao_concluir, ao_falhar in pedido.callbacks:
+            try:
+                if erro is None and ao_concluir:
+                    ao_concluir(pedido.future.result())
+                elif erro is not None and ao_falhar:
+                    ao_falhar(erro)
+            except Exception as e:
+                print(f"ERRO no retorno da consulta '{pedido.canal}': {e}")
+
+        if erro is None:
+            self.concluida.emit(pedido.canal, pedido.future.result())
+        else:
+            print(f"ERRO na consulta em segundo plano '{pedido.canal}': {erro}")
+            self.falhou.emit(pedido.canal, str(erro))
@@ -0,0 +1,365 @@
+"""
+Formato colunar do Sistema Fiado para análise de vendas (arquivos .fcol).
+
+Uma exportação é uma pasta particionada por mês:
+
+    destino/
+        manifesto.json
+        vendas/ano=2025/mes=03.fcol
+        vendas/ano=2025/mes=04.fcol
+
+Cada arquivo .fcol guarda as colunas separadamente, em blocos de até
+LINHAS_POR_BLOCO linhas comprimidos com zlib. Inteiros ficam em arrays
+binários little-endian de 64 bits (valores em centavos e datas em segundos
+desde 1970); produto e cliente_nome são codificados por dicionário (cada
+arquivo guarda a lista de valores distintos e as linhas guardam só o índice).
+Os metadados ficam em um rodapé JSON no final do arquivo, como no Parquet:
+
+    FCOL1\\n | blocos... | rodapé JSON | tamanho do rodapé (uint32 LE) | FCOL1\\n
+
+Não há dependências externas: leitura e escrita usam apenas array, zlib e json.
+"""
+import os
+import sys
+import json
+import zlib
+import struct
+from array import array
+from datetime import datetime, timezone
+
+from normalizacao import limites_periodo
+
+MAGICO = b'FCOL1\n'
+VERSAO_FORMATO = 1
+LINHAS_POR_BLOCO = 65536
+# Nível 1: quase o mesmo tamanho do nível 6 nesses dados, com um terço do tempo
+NIVEL_COMPRESSAO = 1
+
+# (nome, tipo) na ordem das colunas da consulta de exportação.
+# 'int' = array de int64; 'dicionario' = índices int32 para a lista de valores
+COLUNAS_VENDAS = (
+    ('id', 'int'),
+    ('cliente_id', 'int'),
+    ('cliente_nome', 'dicionario'),
+    ('produto', 'dicionario'),
+    ('quantidade', 'int'),
+    ('valor_unitario_centavos', 'int'),
+    ('valor_total_centavos', 'int'),
+    ('data_venda_epoch', 'int'),
+)
+
+_CODIGO_ARRAY = {'int': 'q', 'dicionario': 'l'}
+
+def _para_bytes(valores):
+    if sys.byteorder == 'big':
+        valores = array(valores.typecode, valores)
+        valores.byteswap()
+    return valores.tobytes()
+
+def _de_bytes(codigo, dados):
+    valores = array(codigo)
+    valores.frombytes(dados)
+    if sys.byteorder == 'big':
+        valores.byteswap()
+    return valores
+
+def epoch_para_texto(segundos):
+    """Converte o valor de data_venda_epoch de volta ao texto gravado no banco"""
+    return datetime.fromtimestamp(segundos, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+class EscritorParticao:
+    """Grava um arquivo .fcol, recebendo as linhas aos poucos"""
+    def __init__(self, caminho, colunas=COLUNAS_VENDAS):
+        self.caminho = caminho
+        self.temporario = caminho + '.tmp'
+        self.colunas = colunas
+        self.arquivo = open(self.temporario, 'wb')
+        self.arquivo.write(MAGICO)
+        self.linhas = 0
+        self.blocos = {nome: [] for nome, _ in colunas}
+        self.dicionarios = {nome: {} for nome, tipo in colunas if tipo == 'dicionario'}
+        self.estatisticas = {nome: [None, None] for nome, tipo in colunas if tipo == 'int'}
+        self.somas = {nome: 0 for nome, tipo in colunas if tipo == 'int'}
+        self._novo_buffer()
+
+    def _novo_buffer(self):
+        self.buffer = [array(_CODIGO_ARRAY[tipo]) for _, tipo in self.colunas]
+
+    def adicionar(self, linhas):
+        """Acrescenta linhas (tuplas na ordem de colunas; valores extras no fim são ignorados)"""
+        inicio = 0
+        while inicio < len(linhas):
+            espaco = LINHAS_POR_BLOCO - len(self.buffer[0])
+            trecho = linhas[inicio:inicio + espaco]
+            # Transpõe o trecho: uma sequência por coluna
+            valores_colunas = list(zip(*trecho))
+            for posicao, (nome, tipo) in enumerate(self.colunas):
+                valores = valores_colunas[posicao]
+                if tipo == 'dicionario':
+                    dicionario = self.dicionarios[nome]
+                    for valor in set(valores).difference(dicionario):
+                        dicionario[valor] = len(dicionario)
+                    valores = [dicionario[valor] for valor in valores]
+                elif None in valores:
+                    valores = [valor or 0 for valor in valores]
+                self.buffer[posicao].extend(valores)
+            self.linhas += len(trecho)
+            inicio += len(trecho)
+            if len(self.buffer[0]) >= LINHAS_POR_BLOCO:
+                self._gravar_bloco()
+
+    def _gravar_bloco(self):
+        quantidade = len(self.buffer[0])
+        if not quantidade:
+            return
+        for posicao, (nome, tipo) in enumerate(self.colunas):
+            valores = self.buffer[posicao]
+            dados = zlib.compress(_para_bytes(valores), NIVEL_COMPRESSAO)
+            self.blocos[nome].append({
+                'posicao': self.arquivo.tell(),
+                'tamanho': len(dados),
+                'linhas': quantidade,
+            })
+            self.arquivo.write(dados)
+            if tipo == 'int':
+                minimo, maximo = self.estatisticas[nome]
+                self.estatisticas[nome] = [
+                    min(valores) if minimo is None else min(minimo, min(valores)),
+                    max(valores) if maximo is None else max(maximo, max(valores)),
+                ]
+                self.somas[nome] += sum(valores)
+        self._novo_buffer()
+
+    def fechar(self):
+        """Grava o último bloco e o rodapé; o arquivo só aparece com o nome final aqui"""
+        self._gravar_bloco()
+        rodape = json.dumps({
+            'versao': VERSAO_FORMATO,
+            'linhas': self.linhas,
+            'colunas': [
+                {
+                    'nome': nome,
+                    'tipo': tipo,
+                    'blocos': self.blocos[nome],
+                    'minimo': self.estatisticas[nome][0] if tipo == 'int' else None,
+                    'maximo': self.estatisticas[nome][1] if tipo == 'int' else None,
+                }
+                for nome, tipo in self.colunas
+            ],
+            # Valores na ordem dos índices
+            'dicionarios': {nome: list(valores) for nome, valores in self.dicionarios.items()},
+        }, ensure_ascii=False).encode('utf-8')
+        self.arquivo.write(rodape)
+        self.arquivo.write(struct.pack('<I', len(rodape)))
+        self.arquivo.write(MAGICO)
+        self.arquivo.close()
+        os.replace(self.temporario, self.caminho)
+
+    def descartar(self):
+        self.arquivo.close()
+        if os.path.exists(self.temporario):
+            os.remove(self.temporario)
+
+class ArquivoColunar:
+    """Leitura de um arquivo .fcol (apenas o rodapé é lido ao abrir)"""
+    def __init__(self, caminho):
+        self.caminho = caminho
+        with open(caminho, 'rb') as f:
+            if f.read(len(MAGICO)) != MAGICO:
+                raise ValueError(f"{caminho} não é um arquivo colunar do Sistema Fiado")
+            f.seek(-(len(MAGICO) + 4), os.SEEK_END)
+            tamanho_rodape = struct.unpack('<I', f.read(4))[0]
+            if f.read(len(MAGICO)) != MAGICO:
+                raise ValueError(f"{caminho} está incompleto ou corrompido")
+            f.seek(-(len(MAGICO) + 4 + tamanho_rodape), os.SEEK_END)
+            self.rodape = json.loads(f.read(tamanho_rodape).decode('utf-8'))
+        if self.rodape['versao'] > VERSAO_FORMATO:
+            raise ValueError(f"Versão do formato não suportada: {self.rodape['versao']}")
+        self.linhas = self.rodape['linhas']
+        self.colunas = {coluna['nome']: coluna for coluna in self.rodape['colunas']}
+
+    def nomes_colunas(self):
+        return [coluna['nome'] for coluna in self.rodape['colunas']]
+
+    def ler_coluna(self, nome, decodificar=True):
+        """
+        Lê uma coluna inteira
+
+        Args:
+            nome: Nome da coluna
+            decodificar: Para colunas com dicionário, devolve os textos em vez dos índices
+
+        Returns:
+            array('q') para colunas inteiras; lista de textos (ou array de índices)
+            para colunas com dicionário
+        """
+        coluna = self.colunas[nome]
+        valores = array(_CODIGO_ARRAY[coluna['tipo']])
+        with open(self.caminho, 'rb') as f:
+            for bloco in coluna['blocos']:
+                f.seek(bloco['posicao'])
+                valores.extend(_de_bytes(valores.typecode, zlib.decompress(f.read(bloco['tamanho']))))
+        if coluna['tipo'] == 'dicionario' and decodificar:
+            dicionario = self.rodape['dicionarios'][nome]
+            return [dicionario[indice] for indice in valores]
+        return valores
+
+    def ler(self, colunas=None):
+        """Lê várias colunas: dict {nome: valores}"""
+        return {nome: self.ler_coluna(nome) for nome in (colunas or self.nomes_colunas())}
+
+    def minimo_maximo(self, nome):
+        coluna = self.colunas[nome]
+        return coluna['minimo'], coluna['maximo']
+
+class LeitorColunar:
+    """
+    Leitor de uma exportação colunar particionada por mês
+
+    Exemplo:
+        leitor = LeitorColunar(pasta)
+        for periodo, dados in leitor.ler_periodo('2024-01', '2024-12', ['produto', 'valor_total_centavos']):
+            ...
+    """
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, 'manifesto.json'), 'r', encoding='utf-8') as f:
+            self.manifesto = json.load(f)
+
+    def particoes(self):
+        """Lista de dicts {periodo 'AAAA-MM', arquivo, linhas, ...} em ordem cronológica"""
+        return sorted(self.manifesto['particoes'].values(), key=lambda p: p['periodo'])
+
+    def abrir(self, periodo):
+        particao = self.manifesto['particoes'][periodo]
+        return ArquivoColunar(os.path.join(self.diretorio, particao['arquivo']))
+
+    def ler_periodo(self, inicio=None, fim=None, colunas=None):
+        """
+        Lê apenas as partições entre os meses inicio e fim ('AAAA-MM', inclusive)
+
+        Returns:
+            Gerador de (periodo, {coluna: valores})
+        """
+        for particao in self.particoes():
+            periodo = particao['periodo']
+            if (inicio and periodo < inicio) or (fim and periodo > fim):
+                continue
+            yield periodo, self.abrir(periodo).ler(colunas)
+
+    def linhas(self, inicio=None, fim=None):
+        """Itera as vendas como dicts (valores em centavos, data_venda também em texto)"""
+        for periodo, dados in self.ler_periodo(inicio, fim):
+            nomes = list(dados)
+            for valores in zip(*(dados[nome] for nome in nomes)):
+                linha = dict(zip(nomes, valores))
+                linha['data_venda'] = epoch_para_texto(linha['data_venda_epoch'])
+                yield linha
+
+# Consulta de exportação: colunas na ordem de COLUNAS_VENDAS
+SQL_VENDAS = '''
+    SELECT v.id, v.cliente_id, c.nome, v.produto, v.quantidade, v.valor_unitario, v.valor_total,
+           CAST(strftime('%s', v.data_venda) AS INTEGER), substr(v.data_venda, 1, 7)
+    FROM vendas v
+    LEFT JOIN clientes c ON c.id = v.cliente_id
+    WHERE 1=1
+'''
+
+def exportar_vendas(conexao, destino, data_inicio=None, data_fim=None, progresso=None, lote=5000):
+    """
+    Exporta as vendas para o formato colunar, uma partição por mês
+
+    Partições já existentes no destino são mantidas; as dos meses exportados
+    são substituídas. Prefira Database.exportar_dados_colunar, que escolhe a
+    conexão correta.
+
+    Args:
+        conexao: Conexão sqlite3 aberta
+        destino: Pasta da exportação
+        data_inicio, data_fim: Período (opcional; data_fim sem horário inclui o dia inteiro)
+        progresso: Função chamada com a porcentagem concluída (opcional)
+        lote: Linhas lidas por fetchmany
+
+    Returns:
+        dict: Manifesto da exportação
+    """
+    sql = SQL_VENDAS
+    params = []
+    inicio, fim = limites_periodo(data_inicio, data_fim)
+    if inicio:
+        sql += " AND v.data_venda >= ?"
+        params.append(inicio)
+    if fim:
+        sql += " AND v.data_venda < ?"
+        params.append(fim)
+    sql += " ORDER BY v.data_venda, v.id"
+
+    caminho_manifesto = os.path.join(destino, 'manifesto.json')
+    if os.path.exists(caminho_manifesto):
+        with open(caminho_manifesto, 'r', encoding='utf-8') as f:
+            manifesto = json.load(f)
+    else:
+        manifesto = {'versao': VERSAO_FORMATO, 'tabela': 'vendas', 'particoes': {}}
+
+    cursor = conexao.cursor()
+    total = 0
+    if progresso:
+        cursor.execute(f"SELECT COUNT(*) FROM ({sql})", params)
+        total = cursor.fetchone()[0] or 1
+
+    escritor = None
+    periodo_atual = None
+    lidas = 0
+
+    def fechar_particao():
+        escritor.fechar()
+        manifesto['particoes'][periodo_atual] = {
+            'periodo': periodo_atual,
+            'arquivo': os.path.relpath(escritor.caminho, destino).replace(os.sep, '/'),
+            'linhas': escritor.linhas,
+            'valor_total_centavos': escritor.somas['valor_total_centavos'],
+            'data_minima': epoch_para_texto(escritor.estatisticas['data_venda_epoch'][0]),
+            'data_maxima': epoch_para_texto(escritor.estatisticas['data_venda_epoch'][1]),
+        }
+
+    try:
+        cursor.execute(sql, params)
+        while True:
+            linhas = cursor.fetchmany(lote)
+            if not linhas:
+                break
+            inicio_trecho = 0
+            for posicao, linha in enumerate(linhas):
+                if linha[8] != periodo_atual:
+                    # Linhas ordenadas por data: uma partição termina quando o mês muda
+                    if escritor:
+                        escritor.adicionar(linhas[inicio_trecho:posicao])
+                        fechar_particao()
+                    periodo_atual = linha[8]
+                    ano, mes = periodo_atual.split('-')
+                    pasta = os.path.join(destino, 'vendas', f"ano={ano}")
+                    os.makedirs(pasta, exist_ok=True)
+                    escritor = EscritorParticao(os.path.join(pasta, f"mes={mes}.fcol"))
+                    inicio_trecho = posicao
+            escritor.adicionar(linhas[inicio_trecho:])
+            lidas += len(linhas)
+            if progresso:
+                progresso(min(99, lidas * 100 // total))
+        if escritor:
+            fechar_particao()
+            escritor = None
+    except BaseException:
+        if escritor:
+            escritor.descartar()
+        raise
+    finally:
+        cursor.close()
+
+    manifesto['gerado_em'] = datetime.now().isoformat(timespec='seconds')
+    temporario = caminho_manifesto + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho_manifesto)
+    if progresso:
+        progresso(100)
+    return manifesto
@@ -0,0 +1,191 @@
+"""
+Importação de cadernos de fiado em CSV.
+
+O arquivo precisa de um cabeçalho com as colunas (nomes sem diferença de
+maiúsculas/acentos; separador vírgula ou ponto e vírgula):
+
+    cliente, produto, quantidade, valor_unitario   (obrigatórias)
+    telefone, data                                 (opcionais)
+
+Valores aceitam "12,50", "1.234,56" ou "R$ 12.50"; datas aceitam
+"31/12/2024", "31/12/2024 14:30" ou "2024-12-31 14:30:00", na hora local (são
+gravadas em UTC, como as demais datas do banco). Clientes que ainda
+não existem são cadastrados. Tudo é gravado em uma única transação: um erro em
+qualquer linha não grava nada.
+
+Uso pela linha de comando:
+
+    python importacao.py caderno.csv [--simular]
+"""
+import csv
+import sys
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from normalizacao import normalizar_nome, hora_local_para_utc, FORMATO_DATA_BANCO
+
+# Nome normalizado do cabeçalho -> campo
+COLUNAS = {
+    'cliente': 'cliente', 'nome': 'cliente', 'nome do cliente': 'cliente',
+    'telefone': 'telefone', 'celular': 'telefone',
+    'produto': 'produto', 'descricao': 'produto', 'item': 'produto',
+    'quantidade': 'quantidade', 'qtd': 'quantidade', 'qtde': 'quantidade',
+    'valor_unitario': 'valor_unitario', 'valor unitario': 'valor_unitario',
+    'valor': 'valor_unitario', 'preco': 'valor_unitario',
+    'data': 'data', 'data_venda': 'data', 'data da venda': 'data',
+}
+OBRIGATORIAS = ('cliente', 'produto', 'quantidade', 'valor_unitario')
+
+FORMATOS_DATA = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+                 "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+
+class ErroImportacao(ValueError):
+    """Linha inválida no arquivo importado"""
+    def __init__(self, linha, mensagem):
+        super().__init__(f"Linha {linha}: {mensagem}")
+        self.linha = linha
+
+def converter_valor(texto):
+    """Converte "1.234,56", "12,50" ou "R$ 12.50" para Decimal em reais"""
+    texto = (texto or '').replace('R$', '').replace(' ', '').strip()
+    if ',' in texto:
+        # Formato brasileiro: ponto separa milhares e vírgula separa centavos
+        texto = texto.replace('.', '').replace(',', '.')
+    try:
+        return Decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f"número inválido: {texto or '(vazio)'}")
+
+def converter_data(texto):
+    """Converte a data (hora local) para o formato gravado em vendas.data_venda, em UTC (None se vazia)"""
+    texto = (texto or '').strip()
+    if not texto:
+        return None
+    for formato in FORMATOS_DATA:
+        try:
+            momento = datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+        return hora_local_para_utc(momento).strftime(FORMATO_DATA_BANCO)
+    raise ValueError(f"data inválida: {texto}")
+
+def ler_caderno(caminho):
+    """
+    Lê e valida o arquivo CSV
+
+    Returns:
+        dict {nome normalizado: {'nome': str, 'telefone': str, 'itens': [(produto, quantidade, valor, data)]}},
+        na ordem em que os clientes aparecem
+
+    Raises:
+        ErroImportacao: Na primeira linha inválida
+    """
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as arquivo:
+        amostra = arquivo.read(4096)
+        arquivo.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t')
+        except csv.Error:
+            dialeto = csv.excel
+        leitor = csv.reader(arquivo, dialeto)
+
+        cabecalho = next(leitor, None)
+        if not cabecalho:
+            raise ErroImportacao(1, "arquivo vazio")
+        campos = [COLUNAS.get(normalizar_nome(coluna)) for coluna in cabecalho]
+        faltando = [coluna for coluna in OBRIGATORIAS if coluna not in campos]
+        if faltando:
+            raise ErroImportacao(1, f"colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+        clientes = {}
+        for numero, valores in enumerate(leitor, start=2):
+            if not any(valor.strip() for valor in valores):
+                continue
+            registro = {campo: valor.strip() for campo, valor in zip(campos, valores) if campo}
+            nome = registro.get('cliente')
+            produto = registro.get('produto')
+            if not nome or not produto:
+                raise ErroImportacao(numero, "cliente e produto são obrigatórios")
+            try:
+                quantidade = converter_valor(registro.get('quantidade'))
+                valor = converter_valor(registro.get('valor_unitario'))
+                data = converter_data(registro.get('data'))
+            except ValueError as e:
+                raise ErroImportacao(numero, str(e))
+            if not quantidade.is_finite() or quantidade != quantidade.to_integral_value():
+                raise ErroImportacao(numero, f"quantidade deve ser um número inteiro: {registro.get('quantidade')}")
+            quantidade = int(quantidade)
+            if quantidade <= 0 or valor < 0:
+                raise ErroImportacao(numero, "quantidade e valor devem ser positivos")
+
+            # "João Silva" e "joao  silva" são o mesmo cliente (mesmo critério de obter_id_cliente)
+            cliente = clientes.setdefault(normalizar_nome(nome), {'nome': nome, 'telefone': '', 'itens': []})
+            cliente['telefone'] = cliente['telefone'] or registro.get('telefone', '')
+            cliente['itens'].append((produto, quantidade, valor, data))
+        return clientes
+
+def importar_caderno(db, caminho, progresso=None):
+    """
+    Importa um caderno de fiado em CSV para o banco
+
+    Args:
+        db: Database
+        caminho: Arquivo CSV
+        progresso: Função chamada com a porcentagem concluída (opcional)
+
+    Returns:
+        tuple: (sucesso, mensagem)
+    """
+    try:
+        clientes = ler_caderno(caminho)
+    except (ErroImportacao, OSError, csv.Error) as e:
+        return False, f"Erro ao ler o arquivo: {e}"
+    if not clientes:
+        return False, "Nenhuma venda encontrada no arquivo"
+
+    total_vendas = 0
+    novos_clientes = 0
+    try:
+        with db.transacao():
+            for posicao, dados in enumerate(clientes.values(), start=1):
+                cliente_id = db.obter_id_cliente(dados['nome'])
+                if cliente_id is None:
+                    cliente_id = db.adicionar_cliente(dados['nome'], dados['telefone'])
+                    novos_clientes += 1
+                total_vendas += len(db.adicionar_vendas_lote(cliente_id, dados['itens']))
+                if progresso:
+                    progresso(posicao * 100 // len(clientes))
+    except Exception as e:
+        return False, f"Erro ao importar: {e}. Nenhuma venda foi gravada."
+    return True, (f"{total_vendas} vendas importadas para {len(clientes)} clientes "
+                  f"({novos_clientes} novos)")
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Importa um caderno de fiado (CSV) para o Sistema Fiado")
+    parser.add_argument('arquivo', help="Arquivo CSV")
+    parser.add_argument('--simular', action='store_true', help="Apenas valida o arquivo, sem gravar")
+    args = parser.parse_args()
+
+    if args.simular:
+        try:
+            clientes = ler_caderno(args.arquivo)
+        except (ErroImportacao, OSError, csv.Error) as e:
+            print(f"[IMPORTACAO] Erro ao ler o arquivo: {e}")
+            sys.exit(1)
+        vendas = sum(len(dados['itens']) for dados in clientes.values())
+        print(f"[IMPORTACAO] Arquivo válido: {vendas} vendas de {len(clientes)} clientes")
+        return
+
+    from database import Database
+    db = Database(backup_automatico=False)
+    try:
+        sucesso, mensagem = importar_caderno(db, args.arquivo)
+    finally:
+        db.fechar()
+    print(f"[IMPORTACAO] {mensagem}")
+    if not sucesso:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
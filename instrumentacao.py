@@ -0,0 +1,193 @@
+import csv
+import json
+import threading
+import time
+import functools
+import inspect
+from contextlib import contextmanager
+from datetime import datetime
+
+# Limites superiores (em ms) das faixas do histograma de latência
+FAIXAS_LATENCIA_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+class EstatisticaOperacao:
+    """Contadores de uma operação medida (método do banco, carga de tela, chamada HTTP)"""
+    __slots__ = ('nome', 'chamadas', 'erros', 'tempo_total', 'tempo_minimo',
+                 'tempo_maximo', 'linhas', 'histograma')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.chamadas = 0
+        self.erros = 0
+        self.tempo_total = 0.0
+        self.tempo_minimo = None
+        self.tempo_maximo = 0.0
+        self.linhas = 0
+        # Uma posição por faixa de FAIXAS_LATENCIA_MS e uma para acima da última
+        self.histograma = [0] * (len(FAIXAS_LATENCIA_MS) + 1)
+
+    def registrar(self, duracao, linhas=None, erro=False):
+        self.chamadas += 1
+        if erro:
+            self.erros += 1
+        self.tempo_total += duracao
+        self.tempo_maximo = max(self.tempo_maximo, duracao)
+        self.tempo_minimo = duracao if self.tempo_minimo is None else min(self.tempo_minimo, duracao)
+        if linhas:
+            self.linhas += linhas
+        duracao_ms = duracao * 1000
+        for posicao, limite in enumerate(FAIXAS_LATENCIA_MS):
+            if duracao_ms <= limite:
+                self.histograma[posicao] += 1
+                break
+        else:
+            self.histograma[-1] += 1
+
+    def percentil(self, fracao):
+        """Estimativa do percentil pelo histograma (limite superior da faixa, em ms)"""
+        alvo = self.chamadas * fracao
+        acumulado = 0
+        for posicao, quantidade in enumerate(self.histograma):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                if posicao < len(FAIXAS_LATENCIA_MS):
+                    return FAIXAS_LATENCIA_MS[posicao]
+                return round(self.tempo_maximo * 1000, 1)
+        return 0
+
+    def como_dict(self):
+        return {
+            'operacao': self.nome,
+            'chamadas': self.chamadas,
+            'erros': self.erros,
+            'total_ms': round(self.tempo_total * 1000, 3),
+            'media_ms': round(self.tempo_total * 1000 / self.chamadas, 3) if self.chamadas else 0,
+            'minimo_ms': round((self.tempo_minimo or 0) * 1000, 3),
+            'maximo_ms': round(self.tempo_maximo * 1000, 3),
+            'p50_ms': self.percentil(0.5),
+            'p95_ms': self.percentil(0.95),
+            'linhas': self.linhas,
+            'histograma': {
+                **{f"<={limite}ms": quantidade for limite, quantidade in zip(FAIXAS_LATENCIA_MS, self.histograma)},
+                f">{FAIXAS_LATENCIA_MS[-1]}ms": self.histograma[-1],
+            },
+        }
+
+def contar_linhas(resultado):
+    """Quantidade de linhas de um resultado (lista, ou página (linhas, token))"""
+    if isinstance(resultado, list):
+        return len(resultado)
+    if isinstance(resultado, tuple) and len(resultado) == 2 and isinstance(resultado[0], list):
+        return len(resultado[0])
+    return None
+
+class Instrumentacao:
+    """
+    Registro de tempos de execução do sistema.
+
+    Seguro para uso em várias threads. Os dados ficam em memória e podem ser
+    exportados para JSON/CSV ou vistos no painel de diagnóstico (Ctrl+Shift+D).
+    """
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._estatisticas = {}
+        self.ativa = True
+        self.inicio = datetime.now()
+
+    def registrar(self, nome, duracao, linhas=None, erro=False):
+        if not self.ativa:
+            return
+        with self._trava:
+            estatistica = self._estatisticas.get(nome)
+            if estatistica is None:
+                estatistica = self._estatisticas[nome] = EstatisticaOperacao(nome)
+            estatistica.registrar(duracao, linhas, erro)
+
+    @contextmanager
+    def medir(self, nome):
+        """
+        Mede o bloco. O dict retornado aceita 'linhas' para registrar as linhas lidas:
+
+            with INSTRUMENTACAO.medir('exportacao') as medicao:
+                medicao['linhas'] = total
+        """
+        medicao = {'linhas': None}
+        inicio = time.perf_counter()
+        erro = False
+        try:
+            yield medicao
+        except BaseException:
+            erro = True
+            raise
+        finally:
+            self.registrar(nome, time.perf_counter() - inicio, medicao['linhas'], erro)
+
+    def executar(self, nome, funcao, *args, **kwargs):
+        """Executa a função medindo o tempo e as linhas retornadas"""
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException:
+            self.registrar(nome, time.perf_counter() - inicio, erro=True)
+            raise
+        self.registrar(nome, time.perf_counter() - inicio, contar_linhas(resultado))
+        return resultado
+
+    def resumo(self):
+        """Lista de dicts com as estatísticas, da operação mais demorada para a menos"""
+        with self._trava:
+            dados = [estatistica.como_dict() for estatistica in self._estatisticas.values()]
+        return sorted(dados, key=lambda item: item['total_ms'], reverse=True)
+
+    def limpar(self):
+        with self._trava:
+            self._estatisticas.clear()
+        self.inicio = datetime.now()
+
+    def exportar_json(self, caminho):
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump({
+                'inicio': self.inicio.isoformat(timespec='seconds'),
+                'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                'faixas_ms': list(FAIXAS_LATENCIA_MS),
+                'operacoes': self.resumo(),
+            }, f, ensure_ascii=False, indent=2)
+        return caminho
+
+    def exportar_csv(self, caminho):
+        colunas = ['operacao', 'chamadas', 'erros', 'total_ms', 'media_ms', 'minimo_ms',
+                   'maximo_ms', 'p50_ms', 'p95_ms', 'linhas']
+        faixas = [f"<={limite}ms" for limite in FAIXAS_LATENCIA_MS] + [f">{FAIXAS_LATENCIA_MS[-1]}ms"]
+        with open(caminho, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(colunas + faixas)
+            for item in self.resumo():
+                writer.writerow([item[coluna] for coluna in colunas] +
+                                [item['histograma'][faixa] for faixa in faixas])
+        return caminho
+
+INSTRUMENTACAO = Instrumentacao()
+
+def instrumentado(nome):
+    """Decorador que mede cada chamada da função sob o nome informado"""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def wrapper(*args, **kwargs):
+            return INSTRUMENTACAO.executar(nome, funcao, *args, **kwargs)
+        return wrapper
+    return decorador
+
+def instrumentar_metodos(objeto, prefixo_metodos, nome_grupo):
+    """
+    Substitui, na instância, os métodos cujo nome começa com o prefixo por
+    versões medidas (usado nas telas: carregar_clientes, carregar_relatorio_vendas...)
+
+    Só métodos de verdade são substituídos: sinais do Qt também são chamáveis
+    (ex.: HomeView.atualizar_sistema) e precisam continuar com connect/emit.
+    """
+    for atributo in dir(objeto):
+        if not atributo.startswith(prefixo_metodos):
+            continue
+        metodo = getattr(objeto, atributo, None)
+        if inspect.ismethod(metodo) and not hasattr(metodo, '__wrapped__'):
+            setattr(objeto, atributo, instrumentado(f"{nome_grupo}.{atributo}")(metodo))
@@ -1,31 +1,29 @@
 # VERSAO_SISTEMA = '1.0.8'
 import sys
+from tempo_inicializacao import RELATORIO_INICIALIZACAO
+# Com --tempo-inicializacao, mede também as importações abaixo
+if '--tempo-inicializacao' in sys.argv:
+    RELATORIO_INICIALIZACAO.ativar()
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QLabel, QStackedWidget,
                              QFrame, QSizePolicy, QFileDialog, QMessageBox)
 from PySide6.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, QPoint, Property, QRect, QEvent, QTimer
 from PySide6.QtNetwork import QLocalServer, QLocalSocket
 from PySide6.QtGui import QFont, QIcon, QPixmap
-import subprocess
 import time
-import requests
 import os
 import logging
 import json
+import importlib
 
 from database import Database
-from views.cliente_view import ClienteView
-from views.lista_clientes_view import ListaClientesView
-from views.venda_view import VendaView
-from views.historico_vendas_view import HistoricoVendasView
-from views.relatorio_view import RelatorioView
-from views.config_view import ConfigView
-from views.home_view import HomeView
-from views.detalhe_cliente_view import DetalheClienteView
-from views.notificacoes_view import NotificacoesView
-from views.whatsapp_bot_view import WhatsAppBotView
+from migracoes import ErroMigracao
+from executor_consultas import ExecutorConsultas
+from instrumentacao import INSTRUMENTACAO, instrumentar_metodos
+from eventos import (EVENTOS_VENDAS, EVENTOS_CLIENTES, EVENTOS_PAGAMENTOS, VendaExcluida, VendasClienteExcluidas,
+                     HistoricoExclusoesLimpo, NotificacaoRegistrada, BancoRecarregado)
 from styles import STYLE
-from updater import UpdateChecker, UpdateDialog, UpdateProgressDialog
+# As views, o updater, requests e subprocess são importados apenas quando usados
 
 # Sempre gravar o log em %LOCALAPPDATA%/Sistema Fiado
 log_dir = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'Sistema Fiado')
@@ -56,6 +54,7 @@ class WhatsAppBot:
         self.reconnect_timer = None
 
     def start(self):
+        import subprocess
         try:
             # Caminho para o arquivo server.js
             server_path = os.path.join(os.path.dirname(__file__), 'whatsapp_bot', 'server.js')
@@ -144,6 +143,7 @@ class WhatsAppBot:
                     pass
 
     def _wait_for_server(self):
+        import requests
         max_retries = 30
         retry_count = 0
         
@@ -191,6 +191,7 @@ class WhatsAppBot:
         return False
 
     def stop(self):
+        import subprocess
         if self.process:
             try:
                 logger.info("\n")
@@ -217,6 +218,7 @@ class WhatsAppBot:
         return self.start()
 
     def check_status(self):
+        import requests
         try:
             response = requests.get(f'http://localhost:{self.port}/api/status')
             if response.status_code == 200:
@@ -226,6 +228,14 @@ class WhatsAppBot:
             pass
         return False
 
+def ler_configuracoes():
+    """Lê o config.json do sistema (retorna um dicionário vazio se não existir)"""
+    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+    if os.path.exists(config_path):
+        with open(config_path, 'r') as f:
+            return json.load(f)
+    return {}
+
 # Função utilitária para carregar ícones
 def icon_path(name):
     return os.path.join(os.path.dirname(__file__), 'icons', name)
@@ -294,24 +304,30 @@ class SistemaFiado(QMainWindow):
             pass
         self.current_version = version
         super().__init__(flags=Qt.FramelessWindowHint)
-        self.db = Database()
+        try:
+            modo_wal = ler_configuracoes().get('modo_wal', False)
+        except Exception as e:
+            logger.error(f"Erro ao ler configurações do banco: {str(e)}")
+            modo_wal = False
+        # O timer de backup automático só é iniciado depois que a janela aparece
+        self.db = Database(modo_wal=modo_wal, backup_automatico=False)
+        RELATORIO_INICIALIZACAO.marcar("Banco de dados aberto")
+        # Consultas pesadas das views rodam fora da thread da interface
+        self.executor_consultas = ExecutorConsultas(self.db, parent=self)
         self.init_ui()
+        RELATORIO_INICIALIZACAO.marcar("Interface montada")
         self.carregar_configuracoes()
         # ATENÇÃO: Mantenha version.json, installer.iss (AppVersion) e releases do GitHub SEMPRE sincronizados!
-        # Inicializar verificador de atualizações
-        self.update_checker = UpdateChecker(self.current_version)
-        self.update_checker.update_available.connect(self.show_update_dialog)
-        self.update_checker.update_error.connect(self.show_update_error)
-        self.update_checker.download_progress.connect(self.update_progress)
-        self.update_checker.download_complete.connect(self.install_update)
+        # O verificador de atualizações é criado na primeira verificação
+        self.update_checker = None
         # Controle para não buscar atualização mais de uma vez
         self._att_checked = False
     
     def closeEvent(self, event):
         """Evento chamado quando o programa está sendo fechado"""
         try:
-            # Fazer backup do banco de dados
-            sucesso, mensagem = self.db.fazer_backup_automatico()
+            # Fazer backup do banco de dados (ou concluir o que já está em andamento)
+            sucesso, mensagem = self.db.backup_ao_fechar()
             if sucesso:
                 print(f"Backup realizado com sucesso ao fechar o programa: {mensagem}")
             else:
@@ -319,22 +335,23 @@ class SistemaFiado(QMainWindow):
         except Exception as e:
             print(f"Erro ao fazer backup ao fechar o programa: {str(e)}")
         
+        # Aguardar as consultas em andamento e encerrar as conexões com o banco
+        self.executor_consultas.encerrar()
+        self.db.fechar()
+        
         # Aceitar o evento de fechamento
         event.accept()
     
     def carregar_configuracoes(self):
         """Carrega as configurações salvas"""
         try:
-            config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    # Encontrar e configurar a visibilidade dos botões
-                    for button in self.findChildren(QPushButton):
-                        if button.text() == "Bot de WhatsApp":
-                            button.setVisible(not config.get('ocultar_whatsapp', False))
-                        elif button.text() == "Notificações de Pagamento":
-                            button.setVisible(not config.get('ocultar_notificacoes', False))
+            config = ler_configuracoes()
+            # Encontrar e configurar a visibilidade dos botões
+            for button in self.findChildren(QPushButton):
+                if button.text() == "Bot de WhatsApp":
+                    button.setVisible(not config.get('ocultar_whatsapp', False))
+                elif button.text() == "Notificações de Pagamento":
+                    button.setVisible(not config.get('ocultar_notificacoes', False))
         except Exception as e:
             logger.error(f"Erro ao carregar configurações: {str(e)}")
     
@@ -540,30 +557,8 @@ class SistemaFiado(QMainWindow):
         
         self.stacked_widget = QStackedWidget()
         
-        # Inicializa as views
-        self.home_view = HomeView(self.db)
-        self.cliente_view = ClienteView(self.db)
-        self.lista_clientes_view = ListaClientesView(self.db)
-        self.venda_view = VendaView(self.db)
-        self.relatorio_view = RelatorioView(self.db)
-        self.historico_view = HistoricoVendasView(self.db)
-        self.config_view = ConfigView(self.db, self)
-        self.notificacoes_view = NotificacoesView(self.db)
-        self.whatsapp_bot_view = WhatsAppBotView()
-        
-        # Adiciona as views ao stacked widget (home_view como primeira)
-        self.stacked_widget.addWidget(self.home_view)
-        self.stacked_widget.addWidget(self.cliente_view)
-        self.stacked_widget.addWidget(self.lista_clientes_view)
-        self.stacked_widget.addWidget(self.venda_view)
-        self.stacked_widget.addWidget(self.relatorio_view)
-        self.stacked_widget.addWidget(self.historico_view)
-        self.stacked_widget.addWidget(self.config_view)
-        self.stacked_widget.addWidget(self.notificacoes_view)
-        self.stacked_widget.addWidget(self.whatsapp_bot_view)
-        
-        # Define a tela inicial como a primeira a ser exibida
-        self.stacked_widget.setCurrentWidget(self.home_view)
+        # Apenas a tela inicial é criada agora; as demais na primeira vez que forem abertas
+        self.mostrar_view('home_view')
         
         content_layout_inner.addWidget(self.stacked_widget)
         content_layout.addWidget(content_frame)
@@ -572,46 +567,24 @@ class SistemaFiado(QMainWindow):
         main_layout.addWidget(main_content, 1)  # 1 = esticar para preencher espaço
         
         # Conecta os botões
-        btn_novo_cliente.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.cliente_view))
-        btn_lista_clientes.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.lista_clientes_view))
-        btn_registrar_venda.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.venda_view))
-        btn_relatorios.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.relatorio_view))
-        btn_historico.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.historico_view))
-        btn_config.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.config_view))
-        btn_notificacoes.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.notificacoes_view))
-        btn_whatsapp_bot.clicked.connect(lambda: self.stacked_widget.setCurrentWidget(self.whatsapp_bot_view))
+        btn_novo_cliente.clicked.connect(lambda: self.mostrar_view('cliente_view'))
+        btn_lista_clientes.clicked.connect(lambda: self.mostrar_view('lista_clientes_view'))
+        btn_registrar_venda.clicked.connect(lambda: self.mostrar_view('venda_view'))
+        btn_relatorios.clicked.connect(lambda: self.mostrar_view('relatorio_view'))
+        btn_historico.clicked.connect(lambda: self.mostrar_view('historico_view'))
+        btn_config.clicked.connect(lambda: self.mostrar_view('config_view'))
+        btn_notificacoes.clicked.connect(lambda: self.mostrar_view('notificacoes_view'))
+        btn_whatsapp_bot.clicked.connect(lambda: self.mostrar_view('whatsapp_bot_view'))
         
         # Botão atualizar conectado à busca manual de atualização
         btn_atualizar.clicked.connect(self.check_for_updates)
         
-        # Configurar o sinal da home_view para atualizar outras views
-        self.home_view.atualizar_sistema.connect(self.atualizar_todas_views)
-        
         # Conectar o manipulador de eventos de teclado
         self.installEventFilter(self)
         
-        # Conectar o sinal venda_registrada para atualizar os relatórios
-        self.venda_view.venda_registrada.connect(self.relatorio_view.carregar_relatorio_vendas)
-        # Conectar o sinal venda_registrada para atualizar todas as telas de detalhes
-        self.venda_view.venda_registrada.connect(self.relatorio_view.atualizar_telas_detalhes)
-        # Conectar o sinal venda_registrada para atualizar o histórico de vendas
-        self.venda_view.venda_registrada.connect(self.historico_view.carregar_produtos_registrados)
-        
-        # Conectar o sinal venda_alterada do histórico para atualizar os relatórios
-        self.historico_view.venda_alterada.connect(self.relatorio_view.carregar_relatorio_vendas)
-        # Conectar o sinal venda_alterada para atualizar todas as telas de detalhes
-        self.historico_view.venda_alterada.connect(self.relatorio_view.atualizar_telas_detalhes)
-        # Conectar o sinal venda_alterada para atualizar o histórico de vendas
-        self.historico_view.venda_alterada.connect(self.historico_view.carregar_produtos_registrados)
-        self.historico_view.venda_alterada.connect(self.historico_view.carregar_vendas_excluidas)
-        
-        # Configurar o sinal da lista_clientes_view para atualizar relatórios quando um cliente for editado
-        self.lista_clientes_view.cliente_alterado.connect(self.relatorio_view.carregar_relatorio_vendas)
-        # Conectar o sinal cliente_alterado para atualizar todas as telas de detalhes
-        self.lista_clientes_view.cliente_alterado.connect(self.relatorio_view.atualizar_telas_detalhes)
-        
-        # Conectar o sinal notificacao_enviada da notificacoes_view para atualizar as views relevantes
-        self.notificacoes_view.notificacao_enviada.connect(self.home_view.atualizar_sistema)
+        # As telas são atualizadas pelos eventos publicados pelo banco a cada alteração,
+        # agrupados para que uma sequência de edições gere uma única atualização
+        self.db.eventos.inscrever(self.atualizar_views_por_eventos)
         
         # Após configurar todos os widgets, agora sim aplicamos o estilo
         self.setStyleSheet(STYLE)
@@ -648,43 +621,139 @@ class SistemaFiado(QMainWindow):
             # Ao pressionar ESC, mostrar a tela inicial
             self.mostrar_tela_inicial()
             return True
+        if (event.type() == QEvent.KeyPress and event.key() == Qt.Key_D
+                and event.modifiers() == (Qt.ControlModifier | Qt.ShiftModifier)):
+            # Atalho oculto: painel de diagnóstico de desempenho
+            self.mostrar_diagnostico()
+            return True
         return super().eventFilter(obj, event)
     
+    # Views do sistema: atributo -> (módulo, classe, argumentos do construtor)
+    VIEWS = {
+        'home_view': ('views.home_view', 'HomeView', ('db',)),
+        'cliente_view': ('views.cliente_view', 'ClienteView', ('db',)),
+        'lista_clientes_view': ('views.lista_clientes_view', 'ListaClientesView', ('db',)),
+        'venda_view': ('views.venda_view', 'VendaView', ('db',)),
+        'relatorio_view': ('views.relatorio_view', 'RelatorioView', ('db',)),
+        'historico_view': ('views.historico_vendas_view', 'HistoricoVendasView', ('db',)),
+        'config_view': ('views.config_view', 'ConfigView', ('db', 'janela')),
+        'notificacoes_view': ('views.notificacoes_view', 'NotificacoesView', ('db',)),
+        'whatsapp_bot_view': ('views.whatsapp_bot_view', 'WhatsAppBotView', ()),
+    }
+    
+    def obter_view(self, nome):
+        """
+        Retorna a view pelo nome do atributo, criando-a na primeira chamada
+        
+        Views ainda não criadas não existem como atributo da janela, então não
+        recebem atualizações: ao serem criadas já carregam os dados atuais.
+        """
+        view = getattr(self, nome, None)
+        if view is not None:
+            return view
+        
+        modulo, classe, argumentos = self.VIEWS[nome]
+        classe_view = getattr(importlib.import_module(modulo), classe)
+        valores = {'db': self.db, 'janela': self}
+        view = INSTRUMENTACAO.executar(
+            f"{classe}.__init__", classe_view, *[valores[argumento] for argumento in argumentos]
+        )
+        # Medir os métodos de carga de dados da tela
+        instrumentar_metodos(view, 'carregar_', classe)
+        instrumentar_metodos(view, 'atualizar_', classe)
+        setattr(self, nome, view)
+        self.stacked_widget.addWidget(view)
+        
+        if nome == 'home_view':
+            # Configurar o sinal da home_view para atualizar outras views
+            view.atualizar_sistema.connect(self.atualizar_todas_views)
+        return view
+    
+    def mostrar_view(self, nome):
+        """Exibe a view, criando-a se ainda não foi aberta"""
+        self.stacked_widget.setCurrentWidget(self.obter_view(nome))
+    
+    def mostrar_diagnostico(self):
+        """Abre o painel com os tempos medidos pela instrumentação"""
+        from diagnostico import DiagnosticoDialog
+        DiagnosticoDialog(log_dir, self.db.cache_resultados, self).exec()
+    
     def mostrar_tela_inicial(self):
         """Mostra a tela inicial e atualiza os dados"""
         self.stacked_widget.setCurrentWidget(self.home_view)
         # A atualização será feita pelo evento showEvent na HomeView
     
+    # (view, método de recarga completa, eventos que a afetam)
+    RECARGAS_POR_EVENTO = (
+        ('lista_clientes_view', 'carregar_clientes', EVENTOS_CLIENTES),
+        ('venda_view', 'carregar_clientes', EVENTOS_CLIENTES),
+        ('relatorio_view', 'carregar_relatorio_devedores', EVENTOS_VENDAS + EVENTOS_CLIENTES + EVENTOS_PAGAMENTOS),
+        ('relatorio_view', 'carregar_relatorio_vendas', EVENTOS_VENDAS + EVENTOS_CLIENTES),
+        ('relatorio_view', 'atualizar_telas_detalhes', EVENTOS_VENDAS + EVENTOS_CLIENTES),
+        ('historico_view', 'carregar_produtos_registrados', EVENTOS_VENDAS),
+        ('historico_view', 'carregar_vendas_excluidas', (VendaExcluida, VendasClienteExcluidas, HistoricoExclusoesLimpo)),
+        ('notificacoes_view', 'carregar_clientes_pendentes', EVENTOS_VENDAS + EVENTOS_CLIENTES + EVENTOS_PAGAMENTOS),
+        ('notificacoes_view', 'carregar_historico_notificacoes', (NotificacaoRegistrada,) + EVENTOS_CLIENTES),
+    )
+    
+    def atualizar_views_por_eventos(self, eventos):
+        """
+        Atualiza apenas as views afetadas pelos eventos recebidos do banco
+        
+        Views que implementam aplicar_eventos(eventos) recebem os eventos e
+        atualizam só as linhas afetadas; as demais executam, uma única vez,
+        cada recarga ligada aos tipos de evento recebidos.
+        """
+        recarregar_tudo = any(isinstance(evento, BancoRecarregado) for evento in eventos)
+        executados = set()
+        for nome_view, metodo, tipos in self.RECARGAS_POR_EVENTO:
+            view = getattr(self, nome_view, None)
+            if view is None:
+                continue
+            relevantes = [evento for evento in eventos if recarregar_tudo or isinstance(evento, tipos)]
+            if not relevantes:
+                continue
+            try:
+                if hasattr(view, 'aplicar_eventos'):
+                    if nome_view not in executados:
+                        view.aplicar_eventos(eventos)
+                        executados.add(nome_view)
+                elif (nome_view, metodo) not in executados:
+                    getattr(view, metodo)()
+                    executados.add((nome_view, metodo))
+            except Exception as e:
+                logger.error(f"Erro ao atualizar {nome_view}.{metodo}: {str(e)}")
+    
     def atualizar_todas_views(self):
-        """Atualiza todas as views do sistema"""
-        # Atualizar as views com os dados mais recentes
-        self.lista_clientes_view.carregar_clientes()
-        self.venda_view.carregar_clientes()
-        self.relatorio_view.carregar_relatorio_devedores()
-        self.relatorio_view.carregar_relatorio_vendas()
-        self.historico_view.carregar_produtos_registrados()
-        self.historico_view.carregar_vendas_excluidas()
-        self.notificacoes_view.carregar_clientes_pendentes()
-        self.notificacoes_view.carregar_historico_notificacoes()
-        
-        # Conectar ou reconectar os sinais para garantir que as atualizações ocorram
-        # Procurar por instâncias de DetalheClienteView em todos os widgets do stacked_widget
-        for i in range(self.stacked_widget.count()):
-            widget = self.stacked_widget.widget(i)
-            if isinstance(widget, DetalheClienteView):
-                # Reconectar o sinal venda_alterada do DetalheClienteView
-                try:
-                    widget.venda_alterada.disconnect()
-                except:
-                    pass
-                widget.venda_alterada.connect(self.relatorio_view.carregar_relatorio_vendas)
-                widget.venda_alterada.connect(self.relatorio_view.atualizar_telas_detalhes)
-                widget.venda_alterada.connect(self.historico_view.carregar_produtos_registrados)
-                widget.venda_alterada.connect(self.historico_view.carregar_vendas_excluidas)
-
+        """Atualiza todas as views já criadas com os dados mais recentes"""
+        for nome_view, metodo in (
+            ('lista_clientes_view', 'carregar_clientes'),
+            ('venda_view', 'carregar_clientes'),
+            ('relatorio_view', 'carregar_relatorio_devedores'),
+            ('relatorio_view', 'carregar_relatorio_vendas'),
+            ('historico_view', 'carregar_produtos_registrados'),
+            ('historico_view', 'carregar_vendas_excluidas'),
+            ('notificacoes_view', 'carregar_clientes_pendentes'),
+            ('notificacoes_view', 'carregar_historico_notificacoes'),
+        ):
+            view = getattr(self, nome_view, None)
+            if view is not None:
+                getattr(view, metodo)()
+
+    def obter_update_checker(self):
+        """Cria o verificador de atualizações na primeira utilização"""
+        if self.update_checker is None:
+            from updater import UpdateChecker
+            self.update_checker = UpdateChecker(self.current_version)
+            self.update_checker.update_available.connect(self.show_update_dialog)
+            self.update_checker.update_error.connect(self.show_update_error)
+            self.update_checker.download_progress.connect(self.update_progress)
+            self.update_checker.download_complete.connect(self.install_update)
+        return self.update_checker
+    
     def check_for_updates(self):
         """Verifica se há atualizações disponíveis"""
-        self.update_checker.check_for_updates()
+        self.obter_update_checker().check_for_updates()
 
     def show_update_dialog(self, version, date, changelog):
         """Mostra diálogo de atualização disponível"""
@@ -704,6 +773,7 @@ class SistemaFiado(QMainWindow):
                     break
         except Exception:
             self._update_url = None
+        from updater import UpdateDialog
         dialog = UpdateDialog(version, date, changelog, self)
         if dialog.exec():
             self.start_update_download()
@@ -717,11 +787,12 @@ class SistemaFiado(QMainWindow):
         if not hasattr(self, '_update_url') or not self._update_url:
             QMessageBox.critical(self, "Erro de Atualização", "URL do instalador não encontrada!")
             return
+        from updater import UpdateProgressDialog
         self.progress_dialog = UpdateProgressDialog(self)
         self.progress_dialog.canceled.connect(self.cancel_update)
         self.progress_dialog.show()
         # Iniciar o download
-        self.update_checker.download_update(self._update_url)
+        self.obter_update_checker().download_update(self._update_url)
 
     def update_progress(self, value):
         """Atualiza a barra de progresso"""
@@ -738,7 +809,7 @@ class SistemaFiado(QMainWindow):
                 pass
             self.progress_dialog.close()
         
-        if self.update_checker.install_update(update_file):
+        if self.obter_update_checker().install_update(update_file):
             QMessageBox.information(self, "Atualização", 
                 "A atualização será instalada agora. O programa será reiniciado.")
             self.close()
@@ -758,12 +829,61 @@ class SistemaFiado(QMainWindow):
         if not getattr(self, '_att_checked', False):
             self._att_checked = True
             QTimer.singleShot(10000, self.check_for_updates)
+            # Backup automático só depois que a janela já está na tela
+            QTimer.singleShot(0, self.db.configurar_backup_automatico)
+
+def exibir_tempo_inicializacao():
+    """Mostra e grava o relatório de inicialização (--tempo-inicializacao)"""
+    RELATORIO_INICIALIZACAO.marcar("Primeiro ciclo de eventos")
+    RELATORIO_INICIALIZACAO.desativar()
+    caminho = RELATORIO_INICIALIZACAO.gravar(log_dir)
+    print(RELATORIO_INICIALIZACAO.texto())
+    print(f"Relatório de inicialização gravado em: {caminho}")
 
 def main():
+    RELATORIO_INICIALIZACAO.marcar("Módulos importados")
     app = QApplication(sys.argv)
-    window = SistemaFiado()
+    RELATORIO_INICIALIZACAO.marcar("QApplication criada")
+    try:
+        window = SistemaFiado()
+    except ErroMigracao as e:
+        # Não abrir o sistema com o banco em uma versão intermediária
+        logger.error(str(e))
+        QMessageBox.critical(None, "Erro no Banco de Dados",
+                             f"{e}\n\nO sistema será fechado. Nenhum dado foi alterado por esta migração.")
+        sys.exit(1)
     window.showMaximized()
+    RELATORIO_INICIALIZACAO.marcar("Janela exibida")
+    if RELATORIO_INICIALIZACAO.ativo:
+        QTimer.singleShot(0, exibir_tempo_inicializacao)
+    if '--profile' in sys.argv:
+        sys.exit(executar_com_perfil(app))
     sys.exit(app.exec())
 
+def executar_com_perfil(app):
+    """
+    Executa a sessão inteira sob o cProfile (--profile)
+    
+    Ao fechar, grava na pasta de logs o perfil (.prof, para pstats/snakeviz),
+    um resumo das funções mais demoradas e os tempos da instrumentação.
+    """
+    import cProfile
+    import pstats
+    from datetime import datetime
+    
+    perfil = cProfile.Profile()
+    perfil.enable()
+    try:
+        codigo = app.exec()
+    finally:
+        perfil.disable()
+        base = os.path.join(log_dir, f"perfil_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        perfil.dump_stats(base + '.prof')
+        with open(base + '.txt', 'w', encoding='utf-8') as f:
+            pstats.Stats(perfil, stream=f).sort_stats('cumulative').print_stats(60)
+        INSTRUMENTACAO.exportar_json(base + '_instrumentacao.json')
+        logger.info(f"Perfil da sessão gravado em: {base}.prof")
+    return codigo
+
 if __name__ == "__main__":
     main() 
\ No newline at end of file
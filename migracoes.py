@@ -0,0 +1,82 @@
+"""
+Migrações numeradas do banco de dados.
+
+A versão do esquema fica em PRAGMA user_version. Na inicialização o Database
+lê essa versão e aplica, em ordem, apenas as migrações com número maior; em um
+banco já atualizado isso custa uma única consulta.
+
+Para alterar o esquema, acrescente uma nova função ao final de MIGRACOES com o
+próximo número. Nunca altere ou renumere uma migração já publicada.
+
+Cada migração roda em uma transação junto com a atualização de user_version
+(ver Database.aplicar_migracoes): os métodos que ela chama devem confirmar
+com db._confirmar(), nunca com conn.commit().
+"""
+
+class ErroMigracao(RuntimeError):
+    """Uma migração falhou; o banco continua na versão anterior a ela"""
+    def __init__(self, numero, descricao, erro):
+        super().__init__(f"Migração {numero} ({descricao}) falhou: {erro}")
+        self.numero = numero
+
+def migracao_estrutura_base(db):
+    """Cria as tabelas e corrige estruturas de versões antigas (antes do controle de versão)"""
+    db.criar_tabelas()
+    db.verificar_e_atualizar_estrutura()
+    db.verificar_tabela_vendas_excluidas()
+    db.verificar_tabela_notificacoes()
+    # As consultas do Database usam estas colunas diretamente, sem verificar a estrutura
+    colunas_clientes = [col[1] for col in db.conn.execute("PRAGMA table_info(clientes)")]
+    for coluna in ('nota', 'data_cadastro'):
+        if coluna not in colunas_clientes:
+            raise RuntimeError(f"coluna clientes.{coluna} não pôde ser criada")
+    tipos_vendas = {col[1]: col[2].upper() for col in db.conn.execute("PRAGMA table_info(vendas)")}
+    if 'valor_unitario' not in tipos_vendas or tipos_vendas.get('valor_total') != 'INTEGER':
+        raise RuntimeError("não foi possível converter os valores monetários para centavos")
+
+def migracao_saldos_clientes(db):
+    """Tabela saldos_clientes e triggers de manutenção"""
+    db.verificar_tabela_saldos_clientes()
+
+def migracao_indices(db):
+    """Índices secundários de Database.INDICES"""
+    db.criar_indices()
+
+def migracao_indice_busca(db):
+    """Índice FTS5 de clientes e produtos (ignorado se o SQLite não tiver FTS5)"""
+    db.verificar_indice_busca()
+
+def migracao_clientes_normalizados(db):
+    """Colunas nome_normalizado e telefone_e164 de clientes, com índices"""
+    db.verificar_colunas_normalizadas()
+
+def migracao_resumos_diarios(db):
+    """Tabelas de resumo diário por cliente e por produto"""
+    db.verificar_tabelas_resumo()
+
+def migracao_datas_padronizadas(db):
+    """Converte as colunas de data já gravadas para o formato 'AAAA-MM-DD HH:MM:SS'"""
+    db.padronizar_datas()
+
+def migracao_pagamentos(db):
+    """Pagamentos, livro de lançamentos e saldos por cliente com checkpoints"""
+    db.verificar_tabelas_lancamentos()
+
+def migracao_validacao_datas(db):
+    """Triggers que recusam datas fora do formato 'AAAA-MM-DD HH:MM:SS'"""
+    db.verificar_triggers_datas()
+
+# (número, descrição, função que recebe o Database)
+MIGRACOES = [
+    (1, "Estrutura base das tabelas", migracao_estrutura_base),
+    (2, "Saldos por cliente", migracao_saldos_clientes),
+    (3, "Índices secundários", migracao_indices),
+    (4, "Índice de busca de clientes e produtos", migracao_indice_busca),
+    (5, "Nome e telefone normalizados dos clientes", migracao_clientes_normalizados),
+    (6, "Resumos diários de vendas", migracao_resumos_diarios),
+    (7, "Datas em formato ordenável", migracao_datas_padronizadas),
+    (8, "Pagamentos e livro de lançamentos", migracao_pagamentos),
+    (9, "Validação do formato das datas", migracao_validacao_datas),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1][0]
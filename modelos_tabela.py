@@ -0,0 +1,208 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from dinheiro import Dinheiro
+
+class FonteConsulta:
+    """
+    Consulta do Database exibida por um ModeloTabelaBanco.
+
+    A consulta base termina em uma cláusula WHERE (sem ORDER BY); a ordenação e
+    a paginação por chave são acrescentadas por Database.consultar_pagina.
+    """
+    def __init__(self, db, sql, params, colunas, ordenaveis, ordem_padrao,
+                 coluna_id, indice_id, decrescente=True):
+        """
+        Args:
+            db: Instância do Database
+            sql: Consulta base
+            params: Parâmetros da consulta base
+            colunas: Lista de títulos, na ordem das colunas da consulta
+            ordenaveis: Dict {índice da coluna: expressão SQL} das colunas que podem
+                        ser ordenadas (apenas colunas cobertas por índice)
+            ordem_padrao: Índice da coluna usada na ordenação inicial
+            coluna_id: Expressão SQL do ID usado como desempate
+            indice_id: Posição do ID nas linhas retornadas
+            decrescente: Direção da ordenação inicial
+        """
+        self.db = db
+        self.sql = sql
+        self.params = list(params)
+        self.colunas = colunas
+        self.ordenaveis = ordenaveis
+        self.coluna_ordem = ordem_padrao
+        self.coluna_id = coluna_id
+        self.indice_id = indice_id
+        self.decrescente = decrescente
+
+    def ordenar(self, coluna, decrescente):
+        """Troca a ordenação; retorna False se a coluna não pode ser ordenada no SQL"""
+        if coluna not in self.ordenaveis:
+            return False
+        self.coluna_ordem = coluna
+        self.decrescente = decrescente
+        return True
+
+    def buscar_pagina(self, apos, limite):
+        """Retorna (linhas, token da próxima página ou None)"""
+        return self.db.consultar_pagina(
+            self.sql, self.params,
+            self.ordenaveis[self.coluna_ordem], self.coluna_id,
+            apos, limite,
+            indice_ordem=self.coluna_ordem, indice_id=self.indice_id,
+            decrescente=self.decrescente
+        )
+
+    def contar(self):
+        """Quantidade total de linhas da consulta"""
+        return self.db.contar_linhas_consulta(self.sql, self.params)
+
+def fonte_clientes(db):
+    """Clientes em ordem alfabética"""
+    return FonteConsulta(
+        db,
+        "SELECT id, nome, telefone, nota, data_cadastro FROM clientes WHERE 1=1", [],
+        ["ID", "Nome", "Telefone", "Notas", "Cadastro"],
+        {0: 'id', 1: 'nome'},
+        ordem_padrao=1, coluna_id='id', indice_id=0, decrescente=False
+    )
+
+def fonte_vendas_cliente(db, cliente_id):
+    """Vendas de um cliente, da mais recente para a mais antiga"""
+    return FonteConsulta(
+        db,
+        """
+        SELECT v.id, c.nome, v.produto, v.quantidade, v.valor_total AS "valor_total [dinheiro]", v.data_venda
+        FROM vendas v
+        JOIN clientes c ON v.cliente_id = c.id
+        WHERE v.cliente_id = ?
+        """, [cliente_id],
+        ["ID", "Cliente", "Produto", "Quantidade", "Valor Total", "Data"],
+        {0: 'v.id', 5: 'v.data_venda'},
+        ordem_padrao=5, coluna_id='v.id', indice_id=0
+    )
+
+def fonte_relatorio_vendas(db, data_inicio=None, data_fim=None, cliente_id=None):
+    """Vendas do período (consulta de Database.gerar_relatorio_vendas)"""
+    sql, params = db.consulta_relatorio_vendas(data_inicio, data_fim, cliente_id)
+    return FonteConsulta(
+        db, sql, params,
+        ["ID", "Cliente", "Produto", "Quantidade", "Valor Total", "Data"],
+        {0: 'v.id', 5: 'v.data_venda'},
+        ordem_padrao=5, coluna_id='v.id', indice_id=0
+    )
+
+def fonte_vendas_excluidas(db, data_inicio=None, data_fim=None, cliente_id=None):
+    """Histórico de vendas excluídas (consulta de Database.obter_vendas_excluidas)"""
+    sql, params = db.consulta_vendas_excluidas(data_inicio, data_fim, cliente_id)
+    return FonteConsulta(
+        db, sql, params,
+        ["ID", "Venda", "Cliente", "Produto", "Quantidade", "Valor Total", "Data da Venda", "Excluída em"],
+        {0: 'id', 7: 'data_exclusao'},
+        ordem_padrao=7, coluna_id='id', indice_id=0
+    )
+
+def fonte_clientes_devedores(db):
+    """Clientes com saldo devedor (vendas - pagamentos), do maior para o menor"""
+    sql, params = db.consulta_clientes_devedores()
+    return FonteConsulta(
+        db, sql, params,
+        ["ID", "Nome", "Telefone", "Total Devido"],
+        {3: 's.saldo'},
+        ordem_padrao=3, coluna_id='s.cliente_id', indice_id=0
+    )
+
+class ModeloTabelaBanco(QAbstractTableModel):
+    """
+    Modelo de tabela que carrega as linhas do banco sob demanda.
+
+    Só a primeira página é lida ao criar o modelo; as próximas são buscadas
+    pela view via canFetchMore/fetchMore conforme a rolagem. A ordenação é
+    feita no SQL (sort), recomeçando da primeira página.
+    """
+    TAMANHO_PAGINA = 200
+
+    def __init__(self, fonte, parent=None, tamanho_pagina=None):
+        super().__init__(parent)
+        self.fonte = fonte
+        self.tamanho_pagina = tamanho_pagina or self.TAMANHO_PAGINA
+        self._linhas = []
+        self._token = None
+        self._fim = False
+        self._total = None
+        self.recarregar()
+
+    def recarregar(self):
+        """Descarta as linhas carregadas e busca a primeira página novamente"""
+        self.beginResetModel()
+        self._linhas = []
+        self._token = None
+        self._fim = False
+        self._total = None
+        self._buscar_pagina()
+        self.endResetModel()
+
+    def _buscar_pagina(self):
+        linhas, self._token = self.fonte.buscar_pagina(self._token, self.tamanho_pagina)
+        self._fim = self._token is None
+        self._linhas.extend(linhas)
+        return linhas
+
+    def total_estimado(self):
+        """Total de linhas da consulta (calculado uma vez por recarga)"""
+        if self._total is None:
+            self._total = max(self.fonte.contar(), len(self._linhas))
+        return self._total
+
+    def linha(self, indice):
+        """Tupla original da linha (por exemplo, para obter o ID da venda)"""
+        return self._linhas[indice]
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._linhas)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.fonte.colunas)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._fim
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fim:
+            return
+        linhas, token = self.fonte.buscar_pagina(self._token, self.tamanho_pagina)
+        if linhas:
+            inicio = len(self._linhas)
+            self.beginInsertRows(QModelIndex(), inicio, inicio + len(linhas) - 1)
+            self._linhas.extend(linhas)
+            self.endInsertRows()
+        self._token = token
+        self._fim = token is None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        valor = self._linhas[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            if isinstance(valor, Dinheiro):
+                return f"R$ {valor:.2f}"
+            return "" if valor is None else str(valor)
+        if role == Qt.TextAlignmentRole and isinstance(valor, (int, float, Dinheiro)):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.UserRole:
+            return valor
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.fonte.colunas[section]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if self.fonte.ordenar(column, order == Qt.DescendingOrder):
+            self.recarregar()
@@ -0,0 +1,158 @@
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# PRAGMAs aplicados em cada conexão no modo WAL
+PRAGMAS_WAL = (
+    "PRAGMA synchronous = NORMAL",      # em WAL, NORMAL é seguro contra corrupção e evita fsync a cada commit
+    "PRAGMA cache_size = -16000",       # ~16 MB de cache de páginas por conexão
+    "PRAGMA mmap_size = 268435456",     # até 256 MB lidos via memória mapeada
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+def aplicar_pragmas_wal(conexao):
+    """Aplica os PRAGMAs de desempenho do modo WAL em uma conexão"""
+    for pragma in PRAGMAS_WAL:
+        conexao.execute(pragma)
+
+class EscritorSerializado:
+    """
+    Thread única responsável por todas as escritas no banco de dados.
+
+    As funções enviadas são executadas em ordem, uma por vez, recebendo como
+    primeiro argumento a conexão de escrita, que só é usada por esta thread.
+    """
+    def __init__(self, abrir_conexao, nome="EscritorBanco"):
+        """
+        Args:
+            abrir_conexao: Função sem argumentos que abre a conexão de escrita
+            nome: Nome da thread (aparece em logs e depuradores)
+        """
+        self._abrir_conexao = abrir_conexao
+        self._fila = queue.Queue()
+        self._pronto = threading.Event()
+        self._erro_inicial = None
+        self._thread = threading.Thread(target=self._processar_fila, name=nome, daemon=True)
+        self._thread.start()
+        self._pronto.wait()
+        if self._erro_inicial:
+            raise self._erro_inicial
+
+    def na_thread_escritora(self):
+        """Indica se o código atual já está rodando na thread de escrita"""
+        return threading.current_thread() is self._thread
+
+    def submeter(self, funcao, *args, **kwargs):
+        """
+        Enfileira uma função para a thread de escrita
+
+        Returns:
+            Future com o resultado da função
+        """
+        future = Future()
+        self._fila.put((future, funcao, args, kwargs))
+        return future
+
+    def executar(self, funcao, *args, **kwargs):
+        """Executa uma função na thread de escrita e aguarda o resultado"""
+        if self.na_thread_escritora():
+            raise RuntimeError("executar() chamado de dentro da thread de escrita")
+        return self.submeter(funcao, *args, **kwargs).result()
+
+    @contextmanager
+    def reservar(self):
+        """
+        Empresta a conexão de escrita para a thread atual até o fim do bloco
+
+        A thread de escrita fica parada (sem processar a fila) enquanto durar a
+        reserva, então nenhuma outra escrita se intercala com as do bloco.
+        Usado por Database.transacao.
+        """
+        if self.na_thread_escritora():
+            raise RuntimeError("reservar() chamado de dentro da thread de escrita")
+        conexao_pronta = Future()
+        liberar = threading.Event()
+
+        def aguardar(conexao):
+            conexao_pronta.set_result(conexao)
+            liberar.wait()
+
+        tarefa = self.submeter(aguardar)
+        conexao = conexao_pronta.result()
+        try:
+            yield conexao
+        finally:
+            liberar.set()
+            tarefa.result()
+
+    def encerrar(self, timeout=10):
+        """Processa o que já está na fila, fecha a conexão e encerra a thread"""
+        if self._thread.is_alive():
+            self._fila.put(None)
+            self._thread.join(timeout)
+
+    def _processar_fila(self):
+        try:
+            conexao = self._abrir_conexao()
+        except Exception as e:
+            self._erro_inicial = e
+            self._pronto.set()
+            return
+        self._pronto.set()
+
+        try:
+            while True:
+                item = self._fila.get()
+                if item is None:
+                    break
+                future, funcao, args, kwargs = item
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    resultado = funcao(conexao, *args, **kwargs)
+                except BaseException as e:
+                    # Nunca deixar uma transação pela metade para a próxima escrita
+                    if conexao.in_transaction:
+                        conexao.rollback()
+                    future.set_exception(e)
+                else:
+                    future.set_result(resultado)
+        finally:
+            conexao.close()
+
+class PoolLeitura:
+    """Pequeno pool de conexões somente-leitura compartilhado entre threads"""
+    def __init__(self, abrir_conexao, tamanho=3):
+        """
+        Args:
+            abrir_conexao: Função sem argumentos que abre uma conexão de leitura
+            tamanho: Quantidade de conexões mantidas abertas
+        """
+        self._livres = queue.LifoQueue()
+        self._conexoes = []
+        for _ in range(tamanho):
+            conexao = abrir_conexao()
+            self._conexoes.append(conexao)
+            self._livres.put(conexao)
+
+    @contextmanager
+    def emprestar(self, timeout=None):
+        """Empresta uma conexão do pool, devolvendo-a ao final do bloco"""
+        conexao = self._livres.get(timeout=timeout)
+        try:
+            yield conexao
+        finally:
+            if conexao.in_transaction:
+                conexao.rollback()
+            self._livres.put(conexao)
+
+    def fechar(self):
+        """Fecha todas as conexões do pool"""
+        for conexao in self._conexoes:
+            try:
+                conexao.close()
+            except Exception:
+                pass
+        self._conexoes = []
@@ -0,0 +1,138 @@
+"""
+Normalização de nomes, telefones e datas.
+
+Os valores normalizados são calculados uma vez, ao gravar o cliente, e ficam
+nas colunas clientes.nome_normalizado e clientes.telefone_e164. As mesmas
+funções são usadas pelos serviços de WhatsApp, para que o número enviado seja
+sempre o mesmo que está gravado no banco.
+
+As datas são gravadas como texto 'AAAA-MM-DD HH:MM:SS' em UTC (o formato e o
+fuso de CURRENT_TIMESTAMP), que ordena igual ao instante que representa. Datas
+sem fuso recebidas pelo banco já estão em UTC; datetimes com fuso são
+convertidos. Os filtros de período comparam a própria coluna com limites nesse
+formato, para usar o índice.
+"""
+import re
+import unicodedata
+from datetime import date, datetime, timedelta, timezone
+
+DDI_BRASIL = '55'
+
+FORMATO_DATA_BANCO = "%Y-%m-%d %H:%M:%S"
+
+_NAO_DIGITOS = re.compile(r'\D')
+_ESPACOS = re.compile(r'\s+')
+
+def normalizar_nome(nome):
+    """
+    Nome para comparação: sem acentos, sem diferença de maiúsculas e com
+    espaços simples ("  João  da SILVA " -> "joao da silva")
+    """
+    if not nome:
+        return ''
+    decomposto = unicodedata.normalize('NFKD', nome)
+    sem_acentos = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return _ESPACOS.sub(' ', sem_acentos).strip().casefold()
+
+def padronizar_telefone(telefone):
+    """
+    Padroniza e valida um número de telefone brasileiro para envio via WhatsApp.
+    - Remove caracteres não numéricos
+    - Garante DDI 55
+    - Garante DDD (2 dígitos)
+    - Aceita número com 8 ou 9 dígitos
+    - Para celulares, adiciona nono dígito se necessário
+    - Para fixos, aceita 8 dígitos
+
+    Returns:
+        str: Somente dígitos, com DDI (ex.: "5511912345678")
+
+    Raises:
+        ValueError: Se o número não for um telefone brasileiro válido
+    """
+    numero = _NAO_DIGITOS.sub('', telefone or '')
+    if not numero.startswith(DDI_BRASIL):
+        numero = DDI_BRASIL + numero
+    if len(numero) < 12 or len(numero) > 13:
+        # DDI (2) + DDD (2) + número (8 ou 9)
+        raise ValueError(f"Número inválido para WhatsApp: {numero}")
+    num = numero[4:]
+    # Se for celular (começa com 9, 8, 7 ou 6) e não tiver o nono dígito, adiciona
+    if len(num) == 8 and num[0] in '6789':
+        num = '9' + num
+        numero = numero[:4] + num
+    # Aceita tanto 8 quanto 9 dígitos após o DDD
+    if len(num) not in [8, 9]:
+        raise ValueError(f"Número inválido para WhatsApp: {numero}")
+    return numero
+
+def telefone_e164(telefone):
+    """
+    Telefone no formato E.164 ("(11) 91234-5678" -> "+5511912345678")
+
+    Returns:
+        str ou None se o telefone estiver vazio ou for inválido
+    """
+    try:
+        return '+' + padronizar_telefone(telefone)
+    except ValueError:
+        return None
+
+def _converter_limite(valor):
+    """Converte um limite de período; retorna (datetime, True se veio só a data)"""
+    if isinstance(valor, datetime):
+        return _em_utc(valor).replace(microsecond=0), False
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day), True
+    texto = str(valor).strip()
+    try:
+        momento = datetime.fromisoformat(texto)
+    except ValueError:
+        raise ValueError(f"Data inválida: {texto}")
+    return _em_utc(momento).replace(microsecond=0), len(texto) <= 10
+
+def _em_utc(momento):
+    """datetime sem fuso em UTC (os sem fuso já são considerados UTC)"""
+    if momento.tzinfo is None:
+        return momento
+    return momento.astimezone(timezone.utc).replace(tzinfo=None)
+
+def hora_local_para_utc(momento):
+    """Converte um datetime sem fuso na hora local do computador para UTC, sem fuso"""
+    return momento.astimezone(timezone.utc).replace(tzinfo=None)
+
+def padronizar_data(valor):
+    """
+    Data no formato gravado no banco ("2024-05-31T14:30" -> "2024-05-31 14:30:00")
+
+    Datas sem fuso são consideradas UTC; com fuso, são convertidas para UTC.
+
+    Raises:
+        ValueError: Se a data for inválida
+    """
+    return _converter_limite(valor)[0].strftime(FORMATO_DATA_BANCO)
+
+def limites_periodo(data_inicio=None, data_fim=None):
+    """
+    Limites de um período no formato gravado no banco, para filtros
+    "coluna >= inicio AND coluna < fim" (intervalo semiaberto)
+
+    Args:
+        data_inicio: Início do período (str 'AAAA-MM-DD[ HH:MM[:SS]]', date ou datetime), ou None
+        data_fim: Fim do período, inclusive: só com a data inclui o dia inteiro;
+                  com horário, inclui aquele segundo. Ou None
+
+    Returns:
+        tuple: (inicio, fim exclusivo), cada um str ou None
+
+    Raises:
+        ValueError: Se alguma data for inválida
+    """
+    inicio = fim = None
+    if data_inicio:
+        inicio = _converter_limite(data_inicio)[0].strftime(FORMATO_DATA_BANCO)
+    if data_fim:
+        momento, so_data = _converter_limite(data_fim)
+        momento += timedelta(days=1) if so_data else timedelta(seconds=1)
+        fim = momento.strftime(FORMATO_DATA_BANCO)
+    return inicio, fim
@@ -0,0 +1,264 @@
+import os
+import json
+import zlib
+import hashlib
+import threading
+from datetime import datetime
+
+class RepositorioBackup:
+    """
+    Repositório de backups incrementais do banco de dados.
+
+    Cada snapshot divide o arquivo do banco em blocos alinhados às páginas do
+    SQLite. Os blocos são endereçados pelo seu SHA-256 e gravados comprimidos
+    uma única vez em 'objetos/'; páginas que não mudaram entre snapshots não
+    ocupam espaço novo. Cada snapshot tem um manifesto JSON em 'snapshots/'
+    com a lista ordenada de blocos.
+    """
+    VERSAO_MANIFESTO = 1
+    # Tamanho alvo dos blocos (múltiplo do tamanho de página do banco)
+    TAMANHO_BLOCO = 64 * 1024
+    NIVEL_COMPRESSAO = 6
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.dir_objetos = os.path.join(diretorio, 'objetos')
+        self.dir_snapshots = os.path.join(diretorio, 'snapshots')
+        os.makedirs(self.dir_objetos, exist_ok=True)
+        os.makedirs(self.dir_snapshots, exist_ok=True)
+        # Impede a coleta de lixo de apagar blocos de um snapshot em gravação
+        self._trava = threading.Lock()
+
+    def _caminho_objeto(self, hash_bloco):
+        return os.path.join(self.dir_objetos, hash_bloco[:2], hash_bloco)
+
+    def _caminho_manifesto(self, snapshot_id):
+        return os.path.join(self.dir_snapshots, f"{snapshot_id}.json")
+
+    @staticmethod
+    def _tamanho_pagina(caminho_banco):
+        """Lê o tamanho de página do cabeçalho do arquivo SQLite"""
+        with open(caminho_banco, 'rb') as f:
+            cabecalho = f.read(100)
+        if len(cabecalho) < 18 or not cabecalho.startswith(b'SQLite format 3\x00'):
+            return 4096
+        tamanho = int.from_bytes(cabecalho[16:18], 'big')
+        # O valor 1 representa 65536 no formato do SQLite
+        return 65536 if tamanho == 1 else tamanho
+
+    def criar_snapshot(self, caminho_banco, progresso=None):
+        """
+        Grava um snapshot de um arquivo de banco de dados consistente
+
+        O arquivo deve ser uma cópia estável (por exemplo, gerada por
+        Database.fazer_backup); o banco em uso não deve ser passado aqui.
+
+        Args:
+            caminho_banco: Arquivo do banco de dados a ser guardado
+            progresso: Função chamada com a porcentagem concluída (opcional)
+
+        Returns:
+            dict: Manifesto do snapshot criado
+        """
+        with self._trava:
+            return self._criar_snapshot(caminho_banco, progresso)
+
+    def _criar_snapshot(self, caminho_banco, progresso):
+        tamanho_pagina = self._tamanho_pagina(caminho_banco)
+        tamanho_bloco = max(tamanho_pagina, self.TAMANHO_BLOCO - self.TAMANHO_BLOCO % tamanho_pagina)
+        tamanho_total = os.path.getsize(caminho_banco)
+
+        agora = datetime.now()
+        snapshot_id = agora.strftime("%Y%m%d_%H%M%S_%f")
+        hash_arquivo = hashlib.sha256()
+        blocos = []
+        blocos_novos = 0
+        bytes_novos = 0
+        lidos = 0
+
+        with open(caminho_banco, 'rb') as f:
+            while True:
+                dados = f.read(tamanho_bloco)
+                if not dados:
+                    break
+                hash_arquivo.update(dados)
+                hash_bloco = hashlib.sha256(dados).hexdigest()
+                blocos.append(hash_bloco)
+
+                caminho_objeto = self._caminho_objeto(hash_bloco)
+                if not os.path.exists(caminho_objeto):
+                    comprimido = zlib.compress(dados, self.NIVEL_COMPRESSAO)
+                    os.makedirs(os.path.dirname(caminho_objeto), exist_ok=True)
+                    temporario = caminho_objeto + '.tmp'
+                    with open(temporario, 'wb') as objeto:
+                        objeto.write(comprimido)
+                    os.replace(temporario, caminho_objeto)
+                    blocos_novos += 1
+                    bytes_novos += len(comprimido)
+
+                lidos += len(dados)
+                if progresso and tamanho_total:
+                    progresso(int(lidos * 100 / tamanho_total))
+
+        manifesto = {
+            'versao': self.VERSAO_MANIFESTO,
+            'id': snapshot_id,
+            'criado_em': agora.isoformat(timespec='seconds'),
+            'tamanho': tamanho_total,
+            'tamanho_bloco': tamanho_bloco,
+            'sha256': hash_arquivo.hexdigest(),
+            'blocos_novos': blocos_novos,
+            'bytes_novos': bytes_novos,
+            'blocos': blocos,
+        }
+        # O manifesto é gravado por último: snapshot sem manifesto não existe
+        temporario = self._caminho_manifesto(snapshot_id) + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(manifesto, f)
+        os.replace(temporario, self._caminho_manifesto(snapshot_id))
+        return manifesto
+
+    def carregar_manifesto(self, snapshot_id):
+        """Carrega o manifesto de um snapshot pelo ID"""
+        with open(self._caminho_manifesto(snapshot_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def listar_snapshots(self):
+        """
+        Lista os snapshots do repositório, do mais recente para o mais antigo
+
+        Returns:
+            Lista de tuplas (id, criado_em, tamanho, bytes_novos)
+        """
+        snapshots = []
+        for arquivo in os.listdir(self.dir_snapshots):
+            if not arquivo.endswith('.json'):
+                continue
+            try:
+                manifesto = self.carregar_manifesto(arquivo[:-5])
+            except Exception as e:
+                print(f"ALERTA: Manifesto de backup inválido {arquivo}: {e}")
+                continue
+            snapshots.append((manifesto['id'], manifesto['criado_em'],
+                              manifesto['tamanho'], manifesto['bytes_novos']))
+        snapshots.sort(key=lambda s: s[0], reverse=True)
+        return snapshots
+
+    def resolver_snapshot(self, referencia):
+        """
+        Converte uma referência (ID ou caminho do manifesto) no ID do snapshot
+
+        Returns:
+            str com o ID, ou None se a referência não for um snapshot deste repositório
+        """
+        if not referencia:
+            return None
+        if referencia.endswith('.json'):
+            # Caminho de um manifesto: precisa estar na pasta de snapshots deste repositório
+            pasta = os.path.normcase(os.path.dirname(os.path.abspath(referencia)))
+            if pasta != os.path.normcase(os.path.abspath(self.dir_snapshots)):
+                return None
+            snapshot_id = os.path.basename(referencia)[:-5]
+        elif os.path.basename(referencia) == referencia:
+            snapshot_id = referencia
+        else:
+            return None
+        if os.path.exists(self._caminho_manifesto(snapshot_id)):
+            return snapshot_id
+        return None
+
+    def restaurar_snapshot(self, snapshot_id, caminho_destino):
+        """
+        Reconstrói o arquivo do banco de dados de um snapshot
+
+        Raises:
+            ValueError: se algum bloco estiver corrompido ou o arquivo final não conferir
+        """
+        manifesto = self.carregar_manifesto(snapshot_id)
+        hash_arquivo = hashlib.sha256()
+        temporario = caminho_destino + '.tmp'
+        try:
+            with open(temporario, 'wb') as destino:
+                for hash_bloco in manifesto['blocos']:
+                    with open(self._caminho_objeto(hash_bloco), 'rb') as objeto:
+                        dados = zlib.decompress(objeto.read())
+                    if hashlib.sha256(dados).hexdigest() != hash_bloco:
+                        raise ValueError(f"Bloco corrompido no repositório de backup: {hash_bloco}")
+                    hash_arquivo.update(dados)
+                    destino.write(dados)
+            if hash_arquivo.hexdigest() != manifesto['sha256']:
+                raise ValueError(f"Snapshot {snapshot_id} não confere com o manifesto")
+            os.replace(temporario, caminho_destino)
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    def aplicar_retencao(self, recentes=4, diarios=7, semanais=4, mensais=12):
+        """
+        Aplica a política avô-pai-filho e remove os blocos que ficaram sem uso
+
+        Mantém os `recentes` últimos snapshots e o mais recente de cada um dos
+        últimos `diarios` dias, `semanais` semanas e `mensais` meses com snapshots.
+
+        Returns:
+            tuple: (snapshots removidos, blocos removidos)
+        """
+        with self._trava:
+            return self._aplicar_retencao(recentes, diarios, semanais, mensais)
+
+    def _aplicar_retencao(self, recentes, diarios, semanais, mensais):
+        snapshots = self.listar_snapshots()
+        manter = {s[0] for s in snapshots[:recentes]}
+
+        periodos = (
+            (diarios, lambda data: data.date()),
+            (semanais, lambda data: data.isocalendar()[:2]),
+            (mensais, lambda data: (data.year, data.month)),
+        )
+        for limite, chave_periodo in periodos:
+            vistos = set()
+            for snapshot_id, criado_em, _, _ in snapshots:
+                chave = chave_periodo(datetime.fromisoformat(criado_em))
+                if chave in vistos:
+                    continue
+                if len(vistos) >= limite:
+                    break
+                vistos.add(chave)
+                manter.add(snapshot_id)
+
+        removidos = 0
+        for snapshot_id, _, _, _ in snapshots:
+            if snapshot_id not in manter:
+                os.remove(self._caminho_manifesto(snapshot_id))
+                removidos += 1
+
+        return removidos, self._coletar_lixo()
+
+    def coletar_lixo(self):
+        """Remove os blocos que não são referenciados por nenhum snapshot"""
+        with self._trava:
+            return self._coletar_lixo()
+
+    def _coletar_lixo(self):
+        # Lê os manifestos diretamente, e não por listar_snapshots (que ignora os
+        # inválidos): blocos de um manifesto ilegível podem ainda ser necessários
+        referenciados = set()
+        for arquivo in os.listdir(self.dir_snapshots):
+            if not arquivo.endswith('.json'):
+                continue
+            try:
+                referenciados.update(self.carregar_manifesto(arquivo[:-5])['blocos'])
+            except Exception as e:
+                print(f"ALERTA: Coleta de lixo dos backups cancelada, manifesto inválido {arquivo}: {e}")
+                return 0
+
+        removidos = 0
+        for prefixo in os.listdir(self.dir_objetos):
+            pasta = os.path.join(self.dir_objetos, prefixo)
+            if not os.path.isdir(pasta):
+                continue
+            for arquivo in os.listdir(pasta):
+                if arquivo not in referenciados:
+                    os.remove(os.path.join(pasta, arquivo))
+                    removidos += 1
+        return removidos
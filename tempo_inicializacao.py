@@ -0,0 +1,89 @@
+import builtins
+import os
+import sys
+import time
+
+class RelatorioInicializacao:
+    """
+    Mede o tempo de inicialização do sistema (executar com --tempo-inicializacao).
+
+    Registra as etapas marcadas pelo main.py e, enquanto ativo, o tempo de cada
+    importação de módulo, no formato do `python -X importtime`: tempo próprio
+    e acumulado (com os submódulos) em microssegundos.
+    """
+    def __init__(self):
+        self.ativo = False
+        self.inicio = time.perf_counter()
+        self.etapas = []
+        self.importacoes = []
+        self._pilha = []
+        self._importar_original = None
+
+    def ativar(self):
+        """Começa a medir as importações feitas a partir de agora"""
+        if self.ativo:
+            return
+        self.ativo = True
+        self._importar_original = builtins.__import__
+        builtins.__import__ = self._importar
+
+    def desativar(self):
+        if self._importar_original:
+            builtins.__import__ = self._importar_original
+            self._importar_original = None
+
+    def marcar(self, etapa):
+        """Registra o fim de uma etapa da inicialização"""
+        if self.ativo:
+            self.etapas.append((etapa, time.perf_counter() - self.inicio))
+
+    def _importar(self, nome, globais=None, locais=None, lista=(), nivel=0):
+        # Apenas a primeira importação de cada módulo custa algo
+        if nivel or nome in sys.modules:
+            return self._importar_original(nome, globais, locais, lista, nivel)
+        entrada = [nome, 0.0]
+        self._pilha.append(entrada)
+        inicio = time.perf_counter()
+        try:
+            return self._importar_original(nome, globais, locais, lista, nivel)
+        finally:
+            acumulado = time.perf_counter() - inicio
+            self._pilha.pop()
+            if self._pilha:
+                self._pilha[-1][1] += acumulado
+            self.importacoes.append((len(self._pilha), nome, acumulado - entrada[1], acumulado))
+
+    def texto(self, limite_importacoes=30):
+        """Relatório legível com as etapas e as importações mais lentas"""
+        linhas = ["TEMPO DE INICIALIZAÇÃO", ""]
+        anterior = 0.0
+        for etapa, instante in self.etapas:
+            linhas.append(f"{instante * 1000:9.1f} ms  (+{(instante - anterior) * 1000:7.1f} ms)  {etapa}")
+            anterior = instante
+        linhas.append("")
+        linhas.append(f"Importações mais lentas (de {len(self.importacoes)}), em microssegundos:")
+        linhas.append("  próprio | acumulado | módulo")
+        principais = sorted(self.importacoes, key=lambda item: item[3], reverse=True)[:limite_importacoes]
+        for profundidade, nome, proprio, acumulado in principais:
+            linhas.append(f"{proprio * 1e6:9.0f} | {acumulado * 1e6:9.0f} | {'  ' * profundidade}{nome}")
+        return "\n".join(linhas)
+
+    def gravar(self, pasta):
+        """
+        Grava o relatório em tempo_inicializacao.txt e a lista completa de
+        importações em tempo_importacoes.txt (mesmo formato do -X importtime)
+
+        Returns:
+            str: Caminho do relatório gravado
+        """
+        os.makedirs(pasta, exist_ok=True)
+        caminho = os.path.join(pasta, 'tempo_inicializacao.txt')
+        with open(caminho, 'w', encoding='utf-8') as f:
+            f.write(self.texto())
+        with open(os.path.join(pasta, 'tempo_importacoes.txt'), 'w', encoding='utf-8') as f:
+            f.write("import time: self [us] | cumulative | imported package\n")
+            for profundidade, nome, proprio, acumulado in self.importacoes:
+                f.write(f"import time: {proprio * 1e6:9.0f} | {acumulado * 1e6:10.0f} | {'  ' * profundidade}{nome}\n")
+        return caminho
+
+RELATORIO_INICIALIZACAO = RelatorioInicializacao()
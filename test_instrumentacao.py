@@ -0,0 +1,62 @@
+import os
+import sys
+
+def log(message):
+    print(f"[INSTRUMENTACAO] {message}")
+
+def verificar_tela_instrumentada():
+    """
+    Instrumenta uma tela de exemplo como SistemaFiado.obter_view e confere que
+    os métodos foram medidos e que os sinais continuam sinais
+
+    Returns:
+        Lista de problemas encontrados (vazia se tudo estiver certo)
+    """
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from PySide6.QtCore import QObject, Signal
+    from instrumentacao import INSTRUMENTACAO, instrumentar_metodos
+
+    class TelaExemplo(QObject):
+        # Mesmo prefixo dos métodos medidos, como HomeView.atualizar_sistema
+        atualizar_sistema = Signal()
+
+        def carregar_dados(self):
+            return 'dados'
+
+        def atualizar_dados(self):
+            self.atualizar_sistema.emit()
+
+    tela = TelaExemplo()
+    instrumentar_metodos(tela, 'carregar_', 'TelaExemplo')
+    instrumentar_metodos(tela, 'atualizar_', 'TelaExemplo')
+
+    problemas = []
+    for metodo in ('carregar_dados', 'atualizar_dados'):
+        if not hasattr(getattr(tela, metodo), '__wrapped__'):
+            problemas.append(f"{metodo} não foi instrumentado")
+    if not hasattr(tela.atualizar_sistema, 'connect'):
+        problemas.append("o sinal atualizar_sistema foi substituído por uma função")
+        return problemas
+
+    recebidos = []
+    tela.atualizar_sistema.connect(lambda: recebidos.append(True))
+    tela.atualizar_dados()
+    if not recebidos:
+        problemas.append("o sinal atualizar_sistema não foi emitido")
+    if tela.carregar_dados() != 'dados':
+        problemas.append("carregar_dados instrumentado não retorna o resultado original")
+    if 'TelaExemplo.carregar_dados' not in {item['operacao'] for item in INSTRUMENTACAO.resumo()}:
+        problemas.append("a chamada de carregar_dados não foi medida")
+    return problemas
+
+def main():
+    log("Verificando a instrumentação dos métodos das telas...")
+    problemas = verificar_tela_instrumentada()
+    if problemas:
+        for problema in problemas:
+            log(f"PROBLEMA: {problema}")
+        sys.exit(1)
+    log("Métodos medidos e sinais preservados!")
+
+if __name__ == "__main__":
+    main()
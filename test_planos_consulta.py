@@ -0,0 +1,143 @@
+import os
+import sys
+import tempfile
+
+def log(message):
+    print(f"[PLANOS] {message}")
+
+# Métodos que, por definição, precisam ler todas as linhas de uma tabela
+# (agregados globais, exportação completa, manutenção de saldos).
+# Para eles o plano é exibido, mas uma varredura não é considerada falha.
+VARREDURAS_PERMITIDAS = {
+    'exportar_dados_csv',
+    'limpar_vendas_excluidas',
+    'reconstruir_saldos_clientes',
+    'verificar_saldos_clientes',
+    'reconstruir_contas_clientes',
+    'verificar_contas_clientes',
+}
+
+def criar_banco_temporario():
+    """Cria um Database isolado em uma pasta temporária com alguns dados de exemplo"""
+    # O Database sempre usa %LOCALAPPDATA%/Sistema Fiado
+    os.environ['LOCALAPPDATA'] = tempfile.mkdtemp(prefix='planos_fiado_')
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from database import Database
+
+    db = Database()
+    # Cada chamada precisa executar o SQL para o plano ser capturado
+    db.cache_resultados.habilitado = False
+    cliente_a = db.adicionar_cliente("Cliente A", "(11) 91111-1111", "")
+    cliente_b = db.adicionar_cliente("Cliente B", "(11) 92222-2222", "")
+    for i in range(20):
+        db.adicionar_venda(cliente_a, f"PRODUTO {i % 5}", 1 + i % 3, 2.5)
+        db.adicionar_venda(cliente_b, f"PRODUTO {i % 7}", 1, 10.0)
+    db.registrar_notificacao(cliente_a, 50.0, "teste")
+    db.registrar_pagamento(cliente_a, 5.0)
+    return db, cliente_a, cliente_b
+
+def consultas_do_sistema(db, cliente_a, cliente_b):
+    """Lista (nome do método, chamada) com todas as consultas do database.py"""
+    venda_id = db.listar_vendas_cliente(cliente_a)[0][0]
+    pasta = os.environ['LOCALAPPDATA']
+    return [
+        ('listar_clientes', lambda: db.listar_clientes()),
+        ('listar_clientes_paginado', lambda: db.listar_clientes_paginado("Cliente A", cliente_a, 10)),
+        ('obter_cliente', lambda: db.obter_cliente(cliente_a)),
+        ('obter_id_cliente', lambda: db.obter_id_cliente("Cliente A")),
+        ('obter_id_cliente_por_venda', lambda: db.obter_id_cliente_por_venda(venda_id)),
+        ('buscar_cliente_duplicado', lambda: db.buscar_cliente_duplicado("Cliente A", "(11) 91234-5678")),
+        ('buscar_clientes', lambda: db.buscar_clientes("clie")),
+        ('buscar_produtos', lambda: db.buscar_produtos("prod")),
+        ('obter_totais_periodo', lambda: db.obter_totais_periodo('2000-01-01', '2100-12-31')),
+        ('obter_totais_periodo (cliente)', lambda: db.obter_totais_periodo('2000-01-01', '2100-12-31', cliente_a)),
+        ('obter_produtos_mais_vendidos', lambda: db.obter_produtos_mais_vendidos('2000-01-01', '2100-12-31')),
+        ('obter_serie_vendas (mês)', lambda: db.obter_serie_vendas('2000-01-01', '2100-12-31', 'mes')),
+        ('listar_vendas_cliente', lambda: db.listar_vendas_cliente(cliente_a)),
+        ('listar_vendas_cliente_paginado', lambda: db.listar_vendas_cliente_paginado(cliente_a, '2100-01-01', 1000, 10)),
+        ('obter_total_vendas_cliente', lambda: db.obter_total_vendas_cliente(cliente_a)),
+        ('cliente_tem_vendas', lambda: db.cliente_tem_vendas(cliente_a)),
+        ('gerar_relatorio_vendas', lambda: db.gerar_relatorio_vendas('2000-01-01', '2100-12-31')),
+        ('gerar_relatorio_vendas (cliente)', lambda: db.gerar_relatorio_vendas('2000-01-01', '2100-12-31', cliente_b)),
+        ('gerar_relatorio_vendas_paginado', lambda: db.gerar_relatorio_vendas_paginado('2000-01-01', '2100-12-31', None, '2100-01-01', 1000, 10)),
+        ('gerar_relatorio_vendas_paginado (cliente)', lambda: db.gerar_relatorio_vendas_paginado(None, None, cliente_b, '2100-01-01', 1000, 10)),
+        ('gerar_relatorio_clientes_devedores', lambda: db.gerar_relatorio_clientes_devedores()),
+        ('contar_pendencias', lambda: db.contar_pendencias()),
+        ('obter_clientes_com_pagamentos_pendentes', lambda: db.obter_clientes_com_pagamentos_pendentes()),
+        ('obter_clientes_com_pagamentos_pendentes (dias)', lambda: db.obter_clientes_com_pagamentos_pendentes(dias_minimos=30)),
+        ('gerar_relatorio_idade_dividas', lambda: db.gerar_relatorio_idade_dividas()),
+        ('gerar_relatorio_idade_dividas (cliente)', lambda: db.gerar_relatorio_idade_dividas(cliente_a)),
+        ('contar_clientes', lambda: db.contar_clientes()),
+        ('calcular_total_vendas', lambda: db.calcular_total_vendas()),
+        ('contar_produtos_vendidos', lambda: db.contar_produtos_vendidos()),
+        ('listar_produtos_registrados', lambda: db.listar_produtos_registrados()),
+        ('obter_historico_notificacoes', lambda: db.obter_historico_notificacoes()),
+        ('obter_historico_notificacoes (cliente)', lambda: db.obter_historico_notificacoes(cliente_a)),
+        ('registrar_pagamento', lambda: db.registrar_pagamento(cliente_a, 1.0)),
+        ('obter_saldo_cliente', lambda: db.obter_saldo_cliente(cliente_a)),
+        ('obter_saldo_cliente (data)', lambda: db.obter_saldo_cliente(cliente_a, '2100-12-31')),
+        ('listar_pagamentos_cliente', lambda: db.listar_pagamentos_cliente(cliente_a)),
+        ('quitar_conta', lambda: db.quitar_conta(cliente_a)),
+        ('atualizar_venda', lambda: db.atualizar_venda(venda_id, "PRODUTO X", 2, 3.0)),
+        ('atualizar_cliente', lambda: db.atualizar_cliente(cliente_a, "Cliente A", "(11) 93333-3333")),
+        ('atualizar_notas_cliente', lambda: db.atualizar_notas_cliente(cliente_a, "nota")),
+        ('remover_venda', lambda: db.remover_venda(venda_id)),
+        ('excluir_vendas_cliente', lambda: db.excluir_vendas_cliente(cliente_b)),
+        ('obter_vendas_excluidas', lambda: db.obter_vendas_excluidas()),
+        ('obter_vendas_excluidas (cliente)', lambda: db.obter_vendas_excluidas(cliente_id=cliente_b)),
+        ('obter_vendas_excluidas (período)', lambda: db.obter_vendas_excluidas('2000-01-01', '2100-12-31')),
+        ('obter_vendas_excluidas_paginado', lambda: db.obter_vendas_excluidas_paginado('2000-01-01', '2100-12-31', None, '2100-01-01', 1000, 10)),
+        ('obter_vendas_excluidas_paginado (cliente)', lambda: db.obter_vendas_excluidas_paginado(None, None, cliente_b, '2100-01-01', 1000, 10)),
+        ('excluir_cliente', lambda: db.excluir_cliente(cliente_b)),
+        ('exportar_dados_csv', lambda: db.exportar_dados_csv(os.path.join(pasta, 'exportacao.csv'))),
+        ('reconstruir_saldos_clientes', lambda: db.reconstruir_saldos_clientes()),
+        ('verificar_saldos_clientes', lambda: db.verificar_saldos_clientes()),
+        ('reconstruir_contas_clientes', lambda: db.reconstruir_contas_clientes()),
+        ('verificar_contas_clientes', lambda: db.verificar_contas_clientes()),
+        ('limpar_vendas_excluidas', lambda: db.limpar_vendas_excluidas()),
+    ]
+
+def capturar_sql(db, chamada):
+    """Executa a chamada registrando todas as instruções SQL enviadas ao SQLite"""
+    instrucoes = []
+    db.conn.set_trace_callback(instrucoes.append)
+    try:
+        chamada()
+    finally:
+        db.conn.set_trace_callback(None)
+    # Apenas instruções com plano de execução (triggers aparecem como comentários "--")
+    return [
+        sql.strip() for sql in instrucoes
+        if sql.strip().split(None, 1)[0].upper() in ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT')
+    ]
+
+def verificar_planos(db, consultas):
+    """Retorna a lista de (método, sql, passo) com varreduras completas não permitidas"""
+    falhas = []
+    for nome, chamada in consultas:
+        for sql in capturar_sql(db, chamada):
+            passos, varreduras = db.analisar_plano_consulta(sql)
+            metodo = nome.split(' ')[0]
+            for passo in varreduras:
+                if metodo in VARREDURAS_PERMITIDAS:
+                    log(f"{nome}: varredura permitida -> {passo}")
+                else:
+                    falhas.append((nome, sql, passo))
+    return falhas
+
+def main():
+    log("Verificando planos de execução das consultas do database.py...")
+    db, cliente_a, cliente_b = criar_banco_temporario()
+    falhas = verificar_planos(db, consultas_do_sistema(db, cliente_a, cliente_b))
+
+    if falhas:
+        for nome, sql, passo in falhas:
+            log(f"PROBLEMA: {nome} faz varredura completa: {passo}")
+            log(f"  SQL: {' '.join(sql.split())}")
+        log(f"{len(falhas)} consulta(s) sem índice adequado")
+        sys.exit(1)
+
+    log("Todas as consultas usam índices!")
+
+if __name__ == "__main__":
+    main()
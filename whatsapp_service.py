@@ -5,6 +5,8 @@ from datetime import datetime
 import time
 import os
 
+from normalizacao import telefone_e164
+
 class WhatsAppService:
     """
     Serviço para enviar mensagens pelo WhatsApp Web.
@@ -20,12 +22,21 @@ class WhatsAppService:
         Remove todos os caracteres não-numéricos e adiciona o código do país (+55) se não estiver presente
         
         Args:
-            telefone: Número de telefone do cliente (pode conter formatação)
+            telefone: Número de telefone do cliente (pode conter formatação), ou
+                      clientes.telefone_e164, que é usado diretamente
             
         Returns:
             Número formatado para uso com WhatsApp
         """
-        # Remover todos os caracteres não-numéricos
+        if telefone and re.fullmatch(r'\+55\d{10,11}', telefone):
+            return telefone[1:]
+        
+        # Mesmo número usado pelo bot e gravado em clientes.telefone_e164
+        numero_e164 = telefone_e164(telefone)
+        if numero_e164:
+            return numero_e164[1:]
+        
+        # Número fora do padrão brasileiro: apenas remover a formatação
         numero_limpo = re.sub(r'\D', '', telefone)
         
         # Garantir que o número inclui o código do país (55 para Brasil)
@@ -14,6 +14,9 @@ from datetime import datetime
 import webbrowser
 import re
 
+from instrumentacao import INSTRUMENTACAO
+from normalizacao import padronizar_telefone
+
 # Configuração de logging
 log_dir = os.path.join(os.environ.get('LOCALAPPDATA', os.path.expanduser('~')), 'Sistema Fiado')
 os.makedirs(log_dir, exist_ok=True)
@@ -48,6 +51,13 @@ class WhatsAppServiceAPI:
         # Iniciar verificação/instalação em segundo plano
         self.iniciar_verificacao_automatica()
     
+    def _requisicao(self, metodo, caminho, **kwargs):
+        """Faz uma requisição HTTP ao servidor do bot, registrando o tempo na instrumentação"""
+        return INSTRUMENTACAO.executar(
+            f"WhatsAppAPI.{metodo.upper()} {caminho}",
+            requests.request, metodo, f"{self.base_url}{caminho}", **kwargs
+        )
+    
     def iniciar_verificacao_automatica(self):
         """Inicia a verificação automática de dependências em uma thread separada"""
         self.setup_thread = threading.Thread(target=self._verificar_instalar_dependencias, daemon=True)
@@ -488,7 +498,7 @@ server.listen(PORT, () => {
         try:
             # Verificar se o servidor já está rodando
             try:
-                response = requests.get(f"{self.base_url}/status", timeout=2)
+                response = self._requisicao('get', '/status', timeout=2)
                 if response.status_code == 200:
                     logger.info("Servidor bot já está rodando")
                     return True
@@ -557,7 +567,7 @@ server.listen(PORT, () => {
             
             while attempts < max_attempts:
                 try:
-                    response = requests.get(f"{self.base_url}/status", timeout=2)
+                    response = self._requisicao('get', '/status', timeout=2)
                     if response.status_code == 200:
                         logger.info("Servidor bot iniciado com sucesso!")
                         return True
@@ -579,11 +589,11 @@ server.listen(PORT, () => {
             
         try:
             # Inicializar o cliente WhatsApp no servidor
-            init_response = requests.post(f"{self.base_url}/initialize")
+            init_response = self._requisicao('post', '/initialize')
             init_response.raise_for_status()
             
             # Verificar status
-            status_response = requests.get(f"{self.base_url}/status")
+            status_response = self._requisicao('get', '/status')
             status_response.raise_for_status()
             status_data = status_response.json()
             
@@ -594,7 +604,7 @@ server.listen(PORT, () => {
                 
             # Se precisar de QR Code
             if status_data.get('hasQR', False):
-                qr_response = requests.get(f"{self.base_url}/qrcode")
+                qr_response = self._requisicao('get', '/qrcode')
                 qr_response.raise_for_status()
                 qr_data = qr_response.json()
                 return qr_data.get('qrCode'), "Escaneie o QR Code para conectar ao WhatsApp"
@@ -611,7 +621,7 @@ server.listen(PORT, () => {
     def verificar_status(self):
         """Verifica o status atual do bot"""
         try:
-            response = requests.get(f"{self.base_url}/status")
+            response = self._requisicao('get', '/status')
             response.raise_for_status()
             data = response.json()
             
@@ -634,7 +644,7 @@ server.listen(PORT, () => {
     def obter_qrcode(self):
         """Obtém o QR Code para autenticação"""
         try:
-            response = requests.get(f"{self.base_url}/qrcode")
+            response = self._requisicao('get', '/qrcode')
             if response.status_code == 200:
                 return response.json().get('qrCode')
             return None
@@ -644,36 +654,21 @@ server.listen(PORT, () => {
             
     def padronizar_numero(self, telefone):
         """
-        Padroniza e valida um número de telefone brasileiro para envio via WhatsApp.
-        - Remove caracteres não numéricos
-        - Garante DDI 55
-        - Garante DDD (2 dígitos)
-        - Aceita número com 8 ou 9 dígitos
-        - Para celulares, adiciona nono dígito se necessário
-        - Para fixos, aceita 8 dígitos
+        Padroniza e valida um número de telefone brasileiro para envio via WhatsApp
+        (regras em normalizacao.padronizar_telefone).
+
+        Números já gravados em E.164 (clientes.telefone_e164) são usados diretamente.
         """
-        numero = re.sub(r'\D', '', telefone)
-        if not numero.startswith('55'):
-            numero = '55' + numero
-        if len(numero) < 12 or len(numero) > 13:
-            # DDI (2) + DDD (2) + número (8 ou 9)
-            raise ValueError(f"Número inválido para WhatsApp: {numero}")
-        ddd = numero[2:4]
-        num = numero[4:]
-        # Se for celular (começa com 9, 8, 7 ou 6) e não tiver o nono dígito, adiciona
-        if len(num) == 8 and num[0] in '6789':
-            num = '9' + num
-            numero = numero[:4] + num
-        # Aceita tanto 8 quanto 9 dígitos após o DDD
-        if len(num) not in [8,9]:
-            raise ValueError(f"Número inválido para WhatsApp: {numero}")
-        return numero
+        if telefone and re.fullmatch(r'\+55\d{10,11}', telefone):
+            return telefone[1:]
+        return padronizar_telefone(telefone)
 
     def enviar_mensagem(self, telefone, mensagem):
         """
         Envia uma mensagem para o número de telefone especificado via API do bot
         Args:
-            telefone: Número de telefone do destinatário
+            telefone: Número de telefone do destinatário; clientes.telefone_e164
+                      (ex.: de obter_clientes_com_pagamentos_pendentes) é usado diretamente
             mensagem: Texto da mensagem a ser enviada
         Returns:
             bool: True se a mensagem foi enviada com sucesso, False caso contrário
@@ -697,8 +692,8 @@ server.listen(PORT, () => {
                 "phone": telefone_limpo,
                 "message": mensagem
             }
-            response = requests.post(
-                f"{self.base_url}/send-message", 
+            response = self._requisicao(
+                'post', '/send-message', 
                 json=dados
             )
             if response.status_code == 200:
@@ -719,7 +714,7 @@ server.listen(PORT, () => {
     def desconectar(self):
         """Desconecta do WhatsApp"""
         try:
-            response = requests.post(f"{self.base_url}/logout")
+            response = self._requisicao('post', '/logout')
             if response.status_code == 200:
                 self.connected = False
                 logger.info("Desconectado do WhatsApp com sucesso")
@@ -742,7 +737,7 @@ server.listen(PORT, () => {
                 "phone": telefone_limpo,
                 "message": "Mensagem de verificação automática. Favor ignorar."
             }
-            response = requests.post(f"{self.base_url}/send-message", json=dados)
+            response = self._requisicao('post', '/send-message', json=dados)
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success'):